@@ -0,0 +1,43 @@
+#!/bin/sh
+# Production entrypoint: verify migrations, then start the app server.
+#
+#   APP_SERVER      wsgi (default, gunicorn gthread workers) or asgi
+#                   (gunicorn with uvicorn workers, for the async views)
+#   WEB_CONCURRENCY worker processes (default 4)
+#   WEB_THREADS     threads per wsgi worker (default 4)
+#   DJANGO_MIGRATE  1 to apply migrations; otherwise unapplied ones abort
+set -e
+
+export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:-train_station.settings_production}"
+APP_SERVER="${APP_SERVER:-wsgi}"
+if [ "$APP_SERVER" = "asgi" ]; then
+    export DJANGO_CONN_MAX_AGE="${DJANGO_CONN_MAX_AGE:-0}"
+fi
+
+# Models without a migration are a build error, not something to fix at
+# start-up.
+python manage.py makemigrations --check --dry-run
+if [ "${DJANGO_MIGRATE:-0}" = "1" ]; then
+    python manage.py migrate --noinput
+else
+    python manage.py migrate --check
+fi
+python manage.py createcachetable
+python manage.py check --deploy --fail-level ERROR
+
+if [ "$APP_SERVER" = "asgi" ]; then
+    exec gunicorn train_station.asgi:application \
+        --worker-class uvicorn.workers.UvicornWorker \
+        --workers "${WEB_CONCURRENCY:-4}" \
+        --bind 0.0.0.0:8000 \
+        --preload \
+        --max-requests 1000 --max-requests-jitter 100
+fi
+
+exec gunicorn train_station.wsgi:application \
+    --worker-class gthread \
+    --workers "${WEB_CONCURRENCY:-4}" \
+    --threads "${WEB_THREADS:-4}" \
+    --bind 0.0.0.0:8000 \
+    --preload \
+    --max-requests 1000 --max-requests-jitter 100
@@ -6,7 +6,14 @@ from station.models import (TrainType,
                             Ticket,
                             Crew,
                             Journey,
-                            Route)
+                            DailyOccupancy,
+                            IdempotencyKey,
+                            Task,
+                            JourneySchedule,
+                            ScheduleException,
+                            Route,
+                            SeatHold,
+                            ThrottleCounter)
 
 admin.site.register(TrainType)
 admin.site.register(Train)
@@ -15,4 +22,11 @@ admin.site.register(Station)
 admin.site.register(Ticket)
 admin.site.register(Crew)
 admin.site.register(Journey)
+admin.site.register(JourneySchedule)
+admin.site.register(ScheduleException)
 admin.site.register(Route)
+admin.site.register(SeatHold)
+admin.site.register(ThrottleCounter)
+admin.site.register(DailyOccupancy)
+admin.site.register(IdempotencyKey)
+admin.site.register(Task)
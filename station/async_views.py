@@ -0,0 +1,190 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from station.filters import departure_window, filter_journeys
+from station.models import Crew, Ticket
+from station.pagination import JourneyPagination, OrderPagination
+from station.schedules import request_journeys_until
+from station.serializers import (
+    JourneyDetailSerializer,
+    JourneyListSerializer,
+    OrderListSerializer,
+    RouteListSerializer,
+)
+from station.views import JourneyViewSet, OrderViewSet, RouteViewSet
+
+
+class AsyncReadView(View):
+    """Async counterpart of a read-only DRF action.
+
+    Authentication, permissions and throttling run exactly as in DRF (in a
+    worker thread, since they may hit the database or cache), rows are
+    fetched with the async ORM and the response is rendered with DRF's
+    ``JSONRenderer``, so the body matches the sync endpoint byte for byte.
+    Serialization itself runs on the event loop: every relation it reads
+    must already be loaded, or Django raises ``SynchronousOnlyOperation``.
+    """
+
+    http_method_names = ["get"]
+    permission_classes = ()
+    serializer_class = None
+    pagination_class = None
+    # Prefetches run separately because aiterator() does not support them.
+    prefetch_related = ()
+    renderer = JSONRenderer()
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(
+            request,
+            authenticators=[
+                auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+            ],
+        )
+        self.request = request
+        try:
+            if request.method.lower() not in self.http_method_names:
+                raise exceptions.MethodNotAllowed(request.method)
+            await sync_to_async(self.initial)(request)
+            data = await self.get(request, *args, **kwargs)
+            status = 200
+        except Exception as exc:
+            data, status, headers = self.handle_exception(exc)
+            response = self.render(data, status)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+        return self.render(data, status)
+
+    def initial(self, request):
+        # The same checks APIView.initial() runs, minus content negotiation.
+        request.user
+        for permission in self.permission_classes:
+            permission = permission()
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, "message", None))
+        for throttle in api_settings.DEFAULT_THROTTLE_CLASSES:
+            throttle = throttle()
+            if not throttle.allow_request(request, self):
+                raise exceptions.Throttled(throttle.wait())
+
+    def handle_exception(self, exc):
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            authenticate_header = (
+                self.request.authenticators[0].authenticate_header(self.request)
+                if self.request.authenticators
+                else None
+            )
+            if authenticate_header:
+                exc.auth_header = authenticate_header
+            else:
+                exc.status_code = 403
+
+        response = exception_handler(exc, {"view": self, "request": self.request})
+        if response is None:
+            raise exc
+        return response.data, response.status_code, dict(response.items())
+
+    def render(self, data, status):
+        return HttpResponse(
+            self.renderer.render(data),
+            status=status,
+            content_type=self.renderer.media_type,
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("context", {"request": self.request, "view": self})
+        return self.serializer_class(*args, **kwargs)
+
+    async def fetch(self, queryset):
+        results = [obj async for obj in queryset.prefetch_related(None).aiterator()]
+        if results and self.prefetch_related:
+            await sync_to_async(prefetch_related_objects)(
+                results, *self.prefetch_related
+            )
+        return results
+
+    async def fetch_one(self, queryset, **lookup):
+        try:
+            obj = await queryset.prefetch_related(None).aget(**lookup)
+        except queryset.model.DoesNotExist:
+            # Same message as DRF's get_object_or_404().
+            raise Http404(
+                f"No {queryset.model._meta.object_name} matches the given query."
+            )
+        if self.prefetch_related:
+            await sync_to_async(prefetch_related_objects)(
+                [obj], *self.prefetch_related
+            )
+        return obj
+
+    async def list(self, queryset):
+        if self.pagination_class is None:
+            return self.get_serializer(await self.fetch(queryset), many=True).data
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_results(
+            await self.fetch(paginator.get_page_queryset(queryset, self.request))
+        )
+        data = self.get_serializer(page, many=True).data
+        return paginator.get_paginated_response(data).data
+
+
+class AsyncJourneyListView(AsyncReadView):
+    permission_classes = JourneyViewSet.permission_classes
+    serializer_class = JourneyListSerializer
+    pagination_class = JourneyPagination
+    prefetch_related = (Prefetch("crew", queryset=Crew.objects.order_by("pk")),)
+
+    async def get(self, request):
+        await sync_to_async(request_journeys_until)(
+            departure_window(request.query_params)[1]
+        )
+        queryset = filter_journeys(JourneyViewSet.queryset, request.query_params)
+        return await self.list(queryset)
+
+
+class AsyncJourneyDetailView(AsyncReadView):
+    permission_classes = JourneyViewSet.permission_classes
+    serializer_class = JourneyDetailSerializer
+    prefetch_related = ("tickets",)
+
+    async def get(self, request, pk):
+        queryset = filter_journeys(JourneyViewSet.queryset, request.query_params)
+        journey = await self.fetch_one(queryset, pk=pk)
+        return self.get_serializer(journey).data
+
+
+class AsyncRouteListView(AsyncReadView):
+    permission_classes = RouteViewSet.permission_classes
+    serializer_class = RouteListSerializer
+
+    async def get(self, request):
+        return await self.list(RouteViewSet.queryset.all())
+
+
+class AsyncOrderListView(AsyncReadView):
+    permission_classes = OrderViewSet.permission_classes
+    serializer_class = OrderListSerializer
+    pagination_class = OrderPagination
+    prefetch_related = (
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related(
+                "journey__route__source", "journey__route__destination"
+            ).order_by("pk"),
+        ),
+    )
+
+    async def get(self, request):
+        return await self.list(OrderViewSet.queryset.filter(user_id=request.user.id))
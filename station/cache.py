@@ -0,0 +1,189 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from rest_framework import mixins, status
+from rest_framework.response import Response
+
+VERSION_KEY = "station:version:{}"
+RESPONSE_KEY = "station:response:{}"
+STATS_KEY = "station:response-cache:{}:{}"
+
+
+def version_key(model) -> str:
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def model_versions(models, found=None) -> list:
+    """Return the version stamps of ``models``, creating missing ones.
+
+    Stamps are ``time.time_ns()`` values, so besides changing on every
+    write they also tell roughly when the model last changed. They are
+    read with one ``get_many``; ``found`` is the result of one that already
+    covered the version keys, for callers that fetch other keys with them.
+    """
+    keys = [version_key(model) for model in models]
+    if found is None:
+        found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def view_model_versions(view, models, *keys):
+    """Return the version stamps of ``models`` and the values of ``keys``.
+
+    Whatever a view instance (that is, a request) has read is kept, so
+    mixins that each need the stamps (ETags, the response cache) share a
+    single ``get_many``, together with the extra ``keys``.
+    """
+    reads = view.__dict__.setdefault("_cache_reads", {})
+    wanted = [*keys, *(version_key(model) for model in models)]
+    missing = [key for key in wanted if key not in reads]
+    if missing:
+        found = cache.get_many(missing)
+        reads.update((key, found.get(key)) for key in missing)
+    versions = model_versions(models, reads)
+    reads.update(zip((version_key(model) for model in models), versions))
+    return versions, reads
+
+
+def bump_model_version(model) -> None:
+    cache.set(version_key(model), time.time_ns(), timeout=None)
+
+
+def invalidate_now_and_on_commit(invalidate) -> None:
+    # Dropped again after commit, in case a request rebuilt the index from
+    # the old rows while the transaction was still open.
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def bump_versions(*models) -> None:
+    def bump():
+        for model in models:
+            bump_model_version(model)
+
+    invalidate_now_and_on_commit(bump)
+
+
+# Lookups are counted in process memory and added to the shared counters
+# every STATION_RESPONSE_CACHE_STATS_INTERVAL seconds; on the database
+# backend each add/incr is a transaction of its own.
+_lookups = Counter()
+_lookups_lock = threading.Lock()
+_lookups_flushed_at = time.monotonic()
+
+
+def record_cache_lookup(name: str, hit: bool) -> None:
+    with _lookups_lock:
+        _lookups[STATS_KEY.format(name, "hits" if hit else "misses")] += 1
+        age = time.monotonic() - _lookups_flushed_at
+        if age < settings.STATION_RESPONSE_CACHE_STATS_INTERVAL:
+            return
+    flush_cache_lookups()
+
+
+def flush_cache_lookups() -> None:
+    global _lookups_flushed_at
+    with _lookups_lock:
+        counts = dict(_lookups)
+        _lookups.clear()
+        _lookups_flushed_at = time.monotonic()
+    for key, count in counts.items():
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            # Evicted between add() and incr(); losing these counts is fine.
+            pass
+
+
+def response_cache_stats(names) -> dict:
+    """Hit and miss counts per cache name, this process's included."""
+    flush_cache_lookups()
+    names = list(names)
+    found = cache.get_many(
+        [STATS_KEY.format(name, kind) for name in names for kind in ("hits", "misses")]
+    )
+    return {
+        name: {
+            kind: found.get(STATS_KEY.format(name, kind), 0)
+            for kind in ("hits", "misses")
+        }
+        for name in names
+    }
+
+
+class ResponseCacheMixin:
+    """Serve read actions from the cache until one of ``cache_models`` changes.
+
+    Each response is stored with the version stamps of ``cache_models`` it
+    was built under; signals bump a stamp on each write, after which the
+    stored response no longer matches and is rebuilt. The stamps and the
+    response are read with a single ``get_many``.
+    """
+
+    cache_models = ()
+
+    @classmethod
+    def get_cache_name(cls) -> str:
+        return cls.__name__
+
+    def get_response_cache_key(self, request) -> str:
+        url = request.build_absolute_uri()
+        return RESPONSE_KEY.format(hashlib.sha256(url.encode()).hexdigest())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Read the stamps along with the stored response up front, before
+        # an ETag check (station.conditional) asks for the stamps.
+        if self.action in ("list", "retrieve") and not connection.in_atomic_block:
+            view_model_versions(
+                self, self.cache_models, self.get_response_cache_key(request)
+            )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        # Inside a transaction the rows read may still be rolled back, so
+        # they are neither served from nor stored in the shared cache.
+        if connection.in_atomic_block:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        versions, reads = view_model_versions(self, self.cache_models, key)
+        cached = reads[key]
+        hit = cached is not None and cached[0] == versions
+        record_cache_lookup(self.get_cache_name(), hit)
+        if hit:
+            response = Response(cached[1])
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key,
+                (versions, response.data),
+                settings.STATION_RESPONSE_CACHE_TIMEOUT,
+            )
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class CachedListModelMixin(ResponseCacheMixin, mixins.ListModelMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveModelMixin(ResponseCacheMixin, mixins.RetrieveModelMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,64 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+from station.cache import view_model_versions
+
+
+class ConditionalListMixin:
+    """Answer conditional ``list`` requests before anything is serialized.
+
+    The validator is built from the version stamps of ``conditional_models``
+    plus an optional marker of the listed rows (see ``get_list_marker``), so
+    an unchanged listing costs at most one aggregate query and a 304.
+    """
+
+    conditional_models = ()
+
+    def get_list_marker(self, queryset):
+        """Return ``(last_modified, marker)`` describing the listed rows."""
+        return None, ""
+
+    def get_list_validators(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        last_modified, marker = self.get_list_marker(queryset)
+        versions, _ = view_model_versions(self, self.conditional_models)
+
+        timestamps = [version / 1e9 for version in versions]
+        if last_modified is not None:
+            timestamps.append(last_modified.timestamp())
+        # HTTP dates have a one second resolution.
+        last_modified = int(max(timestamps)) if timestamps else None
+
+        source = "|".join(
+            [
+                ":".join(map(str, versions)),
+                str(marker),
+                request.accepted_renderer.format,
+                request.get_full_path(),
+            ]
+        )
+        etag = quote_etag(hashlib.sha256(source.encode()).hexdigest()[:32])
+        return etag, last_modified
+
+    def set_validators(self, response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_list_validators(request)
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return self.set_validators(response, etag, last_modified)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.set_validators(response, etag, last_modified)
+        return response
+
@@ -0,0 +1,77 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def parse_datetime_bound(params, name: str, upper: bool = False):
+    """Parse a date or datetime query parameter into an aware datetime.
+
+    Naive values are read in the current time zone (``TIME_ZONE``). A bare
+    date used as an upper bound covers that whole day, so the returned
+    value is the start of the next day and is meant to be compared with
+    ``<``.
+    """
+    value = params.get(name)
+    if not value:
+        return None
+
+    try:
+        day = parse_date(value)
+        moment = None if day else parse_datetime(value)
+    except ValueError:
+        moment = day = None
+    if moment is None and day is None:
+        raise ValidationError(
+            {name: "Expected a date (YYYY-MM-DD) or an ISO 8601 datetime."}
+        )
+
+    if day is not None:
+        if upper:
+            day += timedelta(days=1)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def departure_window(params):
+    """Return the half-open ``[start, end)`` departure window asked for."""
+    starts = [
+        parse_datetime_bound(params, "date"),
+        parse_datetime_bound(params, "from"),
+    ]
+    ends = [
+        parse_datetime_bound(params, "date", upper=True),
+        parse_datetime_bound(params, "to", upper=True),
+    ]
+    starts = [start for start in starts if start is not None]
+    ends = [end for end in ends if end is not None]
+    return (max(starts) if starts else None, min(ends) if ends else None)
+
+
+def created_window(params):
+    """Return the half-open ``[start, end)`` order creation window asked for."""
+    return (
+        parse_datetime_bound(params, "created_from"),
+        parse_datetime_bound(params, "created_to", upper=True),
+    )
+
+
+def filter_journeys(queryset, params):
+    # Plain range predicates on departure_time, never a ::date cast, so the
+    # (route_id, departure_time) index can serve the query.
+    start, end = departure_window(params)
+    if start is not None:
+        queryset = queryset.filter(departure_time__gte=start)
+    if end is not None:
+        queryset = queryset.filter(departure_time__lt=end)
+
+    route_id = params.get("route")
+    if route_id:
+        try:
+            queryset = queryset.filter(route_id=int(route_id))
+        except ValueError:
+            raise ValidationError({"route": "A valid integer is required."})
+    return queryset
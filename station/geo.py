@@ -0,0 +1,145 @@
+import heapq
+import math
+
+from station.local_index import ProcessLocalIndex
+from station.models import Station
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vector(latitude: float, longitude: float):
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (
+        math.cos(lat) * math.cos(lon),
+        math.cos(lat) * math.sin(lon),
+        math.sin(lat),
+    )
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+def km_to_chord(distance: float) -> float:
+    return 2 * math.sin(min(distance / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def great_circle_km(a, b) -> float:
+    """Distance between two objects with ``latitude`` and ``longitude``."""
+    return chord_to_km(
+        math.dist(
+            to_unit_vector(a.latitude, a.longitude),
+            to_unit_vector(b.latitude, b.longitude),
+        )
+    )
+
+
+class StationIndex:
+    """KD-tree over station coordinates.
+
+    Stations are stored as points on the unit sphere, where the straight
+    line (chord) distance grows with the great-circle distance, so plain
+    Euclidean KD-tree pruning gives exact geographic neighbours.
+    """
+
+    def __init__(self, stations):
+        points = [
+            (to_unit_vector(latitude, longitude), station_id)
+            for station_id, latitude, longitude in stations
+        ]
+        self.size = len(points)
+        self.root = self._build(points, 0)
+
+    @classmethod
+    def build(cls) -> "StationIndex":
+        return cls(Station.objects.values_list("pk", "latitude", "longitude"))
+
+    def _build(self, points, axis):
+        if not points:
+            return None
+        points.sort(key=lambda point: point[0][axis])
+        middle = len(points) // 2
+        next_axis = (axis + 1) % 3
+        return (
+            points[middle][0],
+            points[middle][1],
+            axis,
+            self._build(points[:middle], next_axis),
+            self._build(points[middle + 1:], next_axis),
+        )
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1):
+        """Return up to ``k`` ``(station_id, distance_km)`` pairs, closest first."""
+        target = to_unit_vector(latitude, longitude)
+        heap = []  # (-squared distance, station_id) of the k best so far
+
+        def visit(node):
+            if node is None:
+                return
+            point, station_id, axis, left, right = node
+            distance = _squared_distance(point, target)
+            if len(heap) < k:
+                heapq.heappush(heap, (-distance, station_id))
+            elif distance < -heap[0][0]:
+                heapq.heapreplace(heap, (-distance, station_id))
+
+            offset = target[axis] - point[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            if len(heap) < k or offset * offset < -heap[0][0]:
+                visit(far)
+
+        if k > 0:
+            visit(self.root)
+        return [
+            (station_id, chord_to_km(math.sqrt(-distance)))
+            for distance, station_id in sorted(heap, reverse=True)
+        ]
+
+    def within(self, latitude: float, longitude: float, radius_km: float):
+        """Return ``(station_id, distance_km)`` within ``radius_km``, closest first."""
+        target = to_unit_vector(latitude, longitude)
+        limit = km_to_chord(radius_km) ** 2
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            point, station_id, axis, left, right = node
+            distance = _squared_distance(point, target)
+            if distance <= limit:
+                found.append((distance, station_id))
+            offset = target[axis] - point[axis]
+            stack.append(left if offset < 0 else right)
+            if offset * offset <= limit:
+                stack.append(right if offset < 0 else left)
+        return [
+            (station_id, chord_to_km(math.sqrt(distance)))
+            for distance, station_id in sorted(found)
+        ]
+
+
+def _squared_distance(a, b) -> float:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+_station_index = ProcessLocalIndex(StationIndex.build, "STATION_INDEX_TTL")
+
+
+def get_station_index() -> StationIndex:
+    return _station_index.get()
+
+
+def invalidate_station_index() -> None:
+    _station_index.invalidate()
+
+
+def snap_to_station(latitude: float, longitude: float, max_distance_km=None):
+    """Return ``(station_id, distance_km)`` of the closest station, or ``None``."""
+    nearest = get_station_index().nearest(latitude, longitude, k=1)
+    if not nearest:
+        return None
+    if max_distance_km is not None and nearest[0][1] > max_distance_km:
+        return None
+    return nearest[0]
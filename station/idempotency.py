@@ -0,0 +1,93 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from station.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = f"This {IDEMPOTENCY_HEADER} was used for a different request."
+    default_code = "idempotency_key_reused"
+
+
+def request_fingerprint(request) -> str:
+    source = json.dumps(
+        [request.method, request.path, request.data], sort_keys=True, default=str
+    )
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def replay(record) -> HttpResponse:
+    response = HttpResponse(
+        bytes(record.content),
+        status=record.status_code,
+        content_type=record.content_type,
+    )
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+class IdempotentCreateMixin:
+    """Make ``create`` safe to retry with an ``Idempotency-Key`` header.
+
+    The key row is inserted in the transaction that creates the object and
+    gets the rendered response before commit. A retry sent while the first
+    request is still running blocks on the key's unique index until that
+    transaction ends, then replays the stored bytes. Failed requests store
+    nothing, so their retries run afresh. Keys are per user and kept for
+    ``IDEMPOTENCY_KEY_TTL`` seconds.
+    """
+
+    def create(self, request, *args, **kwargs):
+        return self.idempotent(super().create, request, *args, **kwargs)
+
+    def idempotent(self, handler, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return handler(request, *args, **kwargs)
+        if not 0 < len(key) <= IdempotencyKey._meta.get_field("key").max_length:
+            raise ValidationError(
+                {IDEMPOTENCY_HEADER: "Must be between 1 and 255 characters."}
+            )
+        fingerprint = request_fingerprint(request)
+        keys = IdempotencyKey.objects.filter(user_id=request.user.id, key=key)
+
+        with transaction.atomic():
+            keys.expired().delete()
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(
+                        user_id=request.user.id,
+                        key=key,
+                        fingerprint=fingerprint,
+                        expires_at=timezone.now()
+                        + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                    )
+            except IntegrityError:
+                record = keys.get()
+                if record.fingerprint != fingerprint:
+                    raise IdempotencyKeyReused()
+                return replay(record)
+
+            response = self.finalize_response(
+                request, handler(request, *args, **kwargs), *args, **kwargs
+            )
+            if not status.is_success(response.status_code):
+                transaction.set_rollback(True)
+                return response
+            response.render()
+            record.status_code = response.status_code
+            record.content_type = response.get("Content-Type", "")
+            record.content = response.content
+            record.save(update_fields=["status_code", "content_type", "content"])
+        return response
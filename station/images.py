@@ -0,0 +1,77 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from station.cache import bump_model_version
+from station.models import Train
+from station.tasks import enqueue_on_commit
+
+FORMAT_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+
+
+def variant_name(image_name: str, variant: str, image_format: str) -> str:
+    # The original is stored under a content hash, so are the variants.
+    stem, _ = os.path.splitext(image_name)
+    return f"{stem}-{variant}.{FORMAT_EXTENSIONS[image_format]}"
+
+
+def render_variant(image: Image.Image, size: int, image_format: str) -> bytes:
+    variant = image.copy()
+    variant.thumbnail((size, size), Image.LANCZOS)
+    if image_format == "JPEG" and variant.mode not in ("RGB", "L"):
+        variant = variant.convert("RGB")
+    buffer = io.BytesIO()
+    variant.save(buffer, image_format, quality=settings.TRAIN_IMAGE_QUALITY)
+    return buffer.getvalue()
+
+
+def generate_image_variants(train_id: int, image_name: str, previous=()) -> dict:
+    """Render every ``TRAIN_IMAGE_VARIANTS`` entry of ``image_name``.
+
+    Variants are only stored on the train if its image has not been
+    replaced in the meantime. Then the files of the replaced image's
+    variants (``previous``) are deleted, as are the new ones if they were
+    not stored; whatever the train still references is kept.
+    """
+    with default_storage.open(image_name, "rb") as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    variants = {}
+    for variant, (size, image_format) in settings.TRAIN_IMAGE_VARIANTS.items():
+        name = variant_name(image_name, variant, image_format)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        variants[variant] = default_storage.save(
+            name, ContentFile(render_variant(image, size, image_format))
+        )
+
+    updated = Train.objects.filter(pk=train_id, image=image_name).update(
+        image_variants=variants
+    )
+    if updated:
+        bump_model_version(Train)
+        current = variants
+    else:
+        current = (
+            Train.objects.filter(pk=train_id)
+            .values_list("image_variants", flat=True)
+            .first()
+        ) or {}
+    for name in {*previous, *variants.values()} - set(current.values()):
+        default_storage.delete(name)
+    return variants
+
+
+def schedule_image_variants(train, previous=()) -> None:
+    """Queue the variants of ``train.image`` once the upload is committed;
+    the run_tasks worker builds them and deletes the ``previous`` ones.
+    """
+    enqueue_on_commit(
+        generate_image_variants, (train.pk, train.image.name, list(previous))
+    )
@@ -0,0 +1,136 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from station.models import Journey, Ticket
+from station.occupancy import journey_key, record_occupancy, record_seats_sold
+from station.seat_map import SeatMap, set_seat_bits
+
+
+def record_tickets(journey: Journey, seats, sold: bool = True) -> None:
+    """Mark ``seats`` as sold (or released) in the stored journey inventory.
+
+    Counter and bitmap are changed by a single ``UPDATE`` built from column
+    expressions, so concurrent orders for the same journey never overwrite
+    each other's seats.
+    """
+    delta = _update_inventory(journey, list(seats), sold)
+    if delta:
+        record_seats_sold(journey, delta)
+
+
+def record_sold_tickets(tickets) -> None:
+    """Record freshly created ``tickets`` with one update per journey.
+
+    Journeys are updated in id order, then the rollup in key order, so
+    concurrent orders lock the same rows in the same order and cannot
+    deadlock.
+    """
+    seats_by_journey = {}
+    for ticket in tickets:
+        journey, seats = seats_by_journey.setdefault(
+            ticket.journey_id, (ticket.journey, [])
+        )
+        seats.append((ticket.cargo, ticket.seat))
+    changes = defaultdict(lambda: [0, 0, 0])
+    for journey_id in sorted(seats_by_journey):
+        journey, seats = seats_by_journey[journey_id]
+        changes[journey_key(journey)][2] += _update_inventory(journey, seats)
+    record_occupancy(changes)
+
+
+def _update_inventory(journey: Journey, seats, sold: bool = True) -> int:
+    if not seats:
+        return 0
+    delta = len(seats) if sold else -len(seats)
+    Journey.objects.filter(pk=journey.pk).update(
+        seats_sold=F("seats_sold") + delta,
+        seat_map=set_seat_bits(SeatMap.for_train(journey.train), seats, sold),
+        updated_at=timezone.now(),
+    )
+    return delta
+
+
+def counted_seats_sold():
+    tickets = (
+        Ticket.objects.filter(journey=OuterRef("pk"))
+        .order_by()
+        .values("journey")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(tickets), 0)
+
+
+def build_seat_maps(journeys) -> dict:
+    """Rebuild the seat maps of ``journeys`` from their tickets in one query."""
+    seat_maps = {journey.pk: SeatMap.for_train(journey.train) for journey in journeys}
+    tickets = Ticket.objects.filter(journey_id__in=seat_maps).values_list(
+        "journey_id", "cargo", "seat"
+    )
+    for journey_id, cargo, seat in tickets.iterator():
+        try:
+            seat_maps[journey_id].take(cargo, seat)
+        except IndexError:
+            # Ticket sold before the train was resized; counted, not drawn.
+            pass
+    return seat_maps
+
+
+def find_inventory_drift(queryset=None, chunk_size: int = 500):
+    """Return ``(journey_id, stored, actual, seat_map_ok)`` for drifted journeys."""
+    if queryset is None:
+        queryset = Journey.objects.all()
+    journeys = (
+        queryset.select_related("train")
+        .annotate(actual=counted_seats_sold())
+        .order_by("pk")
+    )
+
+    drift, chunk = [], []
+    for journey in journeys.iterator(chunk_size=chunk_size):
+        chunk.append(journey)
+        if len(chunk) == chunk_size:
+            drift.extend(_compare_inventory(chunk))
+            chunk = []
+    drift.extend(_compare_inventory(chunk))
+    return drift
+
+
+def _compare_inventory(journeys):
+    seat_maps = build_seat_maps(journeys)
+    for journey in journeys:
+        seat_map_ok = bytes(journey.seat_map) == seat_maps[journey.pk].to_bytes()
+        if journey.seats_sold != journey.actual or not seat_map_ok:
+            yield journey.pk, journey.seats_sold, journey.actual, seat_map_ok
+
+
+def repair_inventory(journey_ids) -> int:
+    # Journey rows are locked while their tickets are re-read, so a ticket
+    # committed meanwhile waits and applies its update on top of the fix.
+    with transaction.atomic():
+        journeys = list(
+            Journey.objects.select_for_update(of=("self",))
+            .select_related("train")
+            .annotate(actual=counted_seats_sold())
+            .filter(pk__in=journey_ids)
+        )
+        seat_maps = build_seat_maps(journeys)
+        now = timezone.now()
+        record_occupancy(
+            {
+                journey_key(journey): (0, 0, journey.actual - journey.seats_sold)
+                for journey in journeys
+            }
+        )
+        for journey in journeys:
+            journey.seats_sold = journey.actual
+            journey.seat_map = seat_maps[journey.pk].to_bytes()
+            journey.updated_at = now
+        Journey.objects.bulk_update(
+            journeys, ["seats_sold", "seat_map", "updated_at"]
+        )
+    return len(journeys)
@@ -0,0 +1,31 @@
+import threading
+import time
+
+from django.conf import settings
+
+
+class ProcessLocalIndex:
+    """An in-memory structure built on first use and kept per process.
+
+    Model signals call ``invalidate`` in the process that changed the
+    data; other workers rebuild once ``ttl_setting`` seconds have passed.
+    """
+
+    def __init__(self, build, ttl_setting: str):
+        self.build = build
+        self.ttl_setting = ttl_setting
+        self._value = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            age = time.monotonic() - self._built_at
+            if self._value is None or age > getattr(settings, self.ttl_setting):
+                self._value = self.build()
+                self._built_at = time.monotonic()
+            return self._value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
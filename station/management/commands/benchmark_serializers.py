@@ -0,0 +1,86 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from station.read_serializers import (
+    JourneyListValuesSerializer,
+    OrderListValuesSerializer,
+)
+from station.serializers import JourneyListSerializer, OrderListSerializer
+from station.views import JourneyViewSet, OrderViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the ModelSerializer and values() read paths of the journey "
+        "and order lists on the same rows: median time per call including "
+        "the queries, and the speedup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if options["rows"] < 1 or options["repeat"] < 1:
+            raise CommandError("--rows and --repeat must be at least 1.")
+        rows, repeat = options["rows"], options["repeat"]
+
+        journeys = JourneyViewSet.queryset.order_by("departure_time", "id")
+        user_id = (
+            OrderViewSet.queryset.values("user_id")
+            .annotate(orders=Count("id"))
+            .order_by("-orders")
+            .values_list("user_id", flat=True)
+            .first()
+        )
+        if not journeys.exists() or user_id is None:
+            raise CommandError("No orders found; run seed_benchmark_data first.")
+        orders = OrderViewSet.queryset.filter(user_id=user_id).order_by(
+            "-created_at", "-id"
+        )
+
+        report = {
+            "journey_list": self.compare(
+                JourneyListSerializer,
+                JourneyListValuesSerializer(),
+                journeys[:rows],
+                repeat,
+            ),
+            "order_list": self.compare(
+                OrderListSerializer,
+                OrderListValuesSerializer(),
+                orders[:rows],
+                repeat,
+            ),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def measure(self, call, repeat):
+        call()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def compare(self, model_serializer, values_serializer, queryset, repeat):
+        model_ms = self.measure(
+            lambda: model_serializer(queryset.all(), many=True).data, repeat
+        )
+        values_ms = self.measure(
+            lambda: values_serializer.serialize(
+                values_serializer.get_queryset(queryset.all())
+            ),
+            repeat,
+        )
+        return {
+            "rows": queryset.count(),
+            "model_serializer_ms": round(model_ms, 2),
+            "values_ms": round(values_ms, 2),
+            "speedup": round(model_ms / values_ms, 2),
+        }
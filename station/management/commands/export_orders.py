@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from station.export import EXPORT_FORMATS, buffered, export_rows
+from station.filters import created_window
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the tickets of all orders, joined with journey, route and "
+        "train, as CSV or NDJSON. Rows are read through a server-side "
+        "cursor, so memory use does not depend on the number of orders."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", choices=list(EXPORT_FORMATS), default="csv")
+        parser.add_argument(
+            "--created-from",
+            help="Orders created at or after this date or datetime.",
+        )
+        parser.add_argument(
+            "--created-to",
+            help="Orders created before this datetime, or up to this date.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--file", help="Write here instead of stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            start, end = created_window(options)
+        except ValidationError as error:
+            name, messages = next(iter(error.detail.items()))
+            raise CommandError(f"--{name.replace('_', '-')}: {messages[0]}")
+        lines = EXPORT_FORMATS[options["output"]][0]
+        chunks = buffered(lines(export_rows(start, end, options["chunk_size"])))
+
+        if options["file"]:
+            with open(options["file"], "w", newline="") as file:
+                file.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from station.schedules import generate_journeys
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the journeys of every schedule up to a rolling horizon. Run "
+        "it daily; searches beyond the horizon queue a run_tasks job for the rest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.JOURNEY_SCHEDULE_HORIZON_DAYS,
+            help="Horizon in days from today (default: "
+            "JOURNEY_SCHEDULE_HORIZON_DAYS).",
+        )
+        parser.add_argument(
+            "--schedule",
+            type=int,
+            action="append",
+            help="Only this schedule id; may be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("--days must not be negative.")
+        until = timezone.localdate() + timedelta(days=options["days"])
+        created = generate_journeys(until, options["schedule"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated {created} journeys up to {until}.")
+        )
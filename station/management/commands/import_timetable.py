@@ -0,0 +1,100 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from station.timetable import (
+    CsvTimetable,
+    GtfsTimetable,
+    TimetableError,
+    TimetableImporter,
+)
+
+
+class DryRun(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Import journeys from a CSV file or a GTFS feed directory. Files are "
+        "streamed, names are resolved through in-memory maps and rows are "
+        "written in batches with COPY or bulk inserts, all in one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Journeys CSV file or GTFS directory.")
+        parser.add_argument("--format", choices=("csv", "gtfs"), default="csv")
+        parser.add_argument(
+            "--stations",
+            help="CSV of stations to create (name,latitude,longitude); csv only.",
+        )
+        parser.add_argument(
+            "--service-date",
+            action="append",
+            type=date.fromisoformat,
+            default=[],
+            help="Date the GTFS trips run on (YYYY-MM-DD); may be repeated.",
+        )
+        parser.add_argument(
+            "--method",
+            choices=("auto", "copy", "insert"),
+            default="auto",
+            help="How journeys are written (default: COPY if available).",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=20,
+            help="Stop validating after this many bad rows.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate and import everything, then roll back.",
+        )
+
+    def handle(self, *args, **options):
+        if options["format"] == "gtfs":
+            if not options["service_date"]:
+                raise CommandError("--service-date is required for GTFS feeds.")
+            timetable = GtfsTimetable(options["path"], options["service_date"])
+        else:
+            timetable = CsvTimetable(options["path"], options["stations"])
+
+        importer = TimetableImporter(
+            batch_size=options["batch_size"],
+            method=options["method"],
+            max_errors=options["max_errors"],
+        )
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                importer.run(timetable)
+                if importer.errors:
+                    raise CommandError(
+                        f"{len(importer.errors)} row(s) failed validation, "
+                        "nothing was imported:\n"
+                        + "\n".join(str(error) for error in importer.errors)
+                    )
+                if options["dry_run"]:
+                    raise DryRun
+        except DryRun:
+            pass
+        except (OSError, TimetableError) as error:
+            raise CommandError(str(error))
+        elapsed = time.perf_counter() - started
+
+        counts = importer.counts
+        prefix = "Dry run, rolled back: " if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{counts['journeys']} journeys, {counts['routes']} new "
+                f"routes and {counts['stations']} new stations from "
+                f"{counts['rows']} rows in {elapsed:.2f}s "
+                f"({counts['rows'] / max(elapsed, 1e-6):.0f} rows/s, "
+                f"{importer.method})."
+            )
+        )
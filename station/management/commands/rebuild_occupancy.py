@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from station.occupancy import rebuild_occupancy
+
+
+def parse_day(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"{value!r} is not a date (YYYY-MM-DD).")
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily occupancy rollup from the journeys, for every "
+        "departure day or only those in --from..--to. Ticket sales keep the "
+        "rollup current; run this after bulk changes made outside the app."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", help="First day (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="end", help="Last day (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        start = options["start"] and parse_day(options["start"])
+        end = options["end"] and parse_day(options["end"])
+        if start and end and start > end:
+            raise CommandError("--from must not be after --to.")
+        rows = rebuild_occupancy(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} occupancy rows."))
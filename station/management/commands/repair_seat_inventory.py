@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from station.inventory import find_inventory_drift, repair_inventory
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Journey.seats_sold and Journey.seat_map from tickets "
+        "and fix journeys that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted journeys, do not update them.",
+        )
+
+    def handle(self, *args, **options):
+        drift = find_inventory_drift()
+        for journey_id, stored, actual, seat_map_ok in drift:
+            if stored != actual:
+                self.stdout.write(
+                    f"Journey {journey_id}: stored {stored}, actual {actual}"
+                )
+            if not seat_map_ok:
+                self.stdout.write(f"Journey {journey_id}: seat map is out of date")
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Seat inventory is correct."))
+            return
+        if options["dry_run"]:
+            self.stdout.write(f"{len(drift)} journeys have drifted inventory.")
+            return
+
+        repaired = repair_inventory([journey_id for journey_id, *_ in drift])
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} journeys."))
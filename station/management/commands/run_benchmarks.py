@@ -0,0 +1,212 @@
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from station.models import Journey, Order, Route, Station, Ticket
+
+ENDPOINTS = ("journey_list", "journey_detail", "order_list", "order_create")
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Call the hot API endpoints in-process and report p50/p95 latency, "
+        "query counts and peak memory as JSON. Orders created by the "
+        "benchmark are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            choices=ENDPOINTS,
+            help="Endpoint to run; may be repeated (default: all).",
+        )
+        parser.add_argument(
+            "--user",
+            help="Email of the user to call the API as "
+            "(default: the user with the most orders).",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be at least 1.")
+        self.random = random.Random(options["seed"])
+        self.journey_ids = list(
+            Journey.objects.order_by("?").values_list("pk", flat=True)[:1000]
+        )
+        self.route_ids = list(
+            Route.objects.order_by("?").values_list("pk", flat=True)[:1000]
+        )
+        if not self.journey_ids:
+            raise CommandError("No journeys found; run seed_benchmark_data first.")
+
+        user = self.get_user(options["user"])
+        token = RefreshToken.for_user(user).access_token
+        self.client = Client(
+            HTTP_HOST=self.get_host(), HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+
+        report = {
+            "dataset": {
+                "stations": Station.objects.count(),
+                "routes": Route.objects.count(),
+                "journeys": Journey.objects.count(),
+                "orders": Order.objects.count(),
+                "tickets": Ticket.objects.count(),
+            },
+            "settings": {"DEBUG": settings.DEBUG},
+            "endpoints": {},
+        }
+        for name in options["endpoint"] or ENDPOINTS:
+            report["endpoints"][name] = self.run_endpoint(
+                getattr(self, f"prepare_{name}"),
+                options["requests"],
+                options["warmup"],
+            )
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        self.stdout.write(output)
+
+    def get_user(self, email):
+        users = get_user_model().objects.all()
+        if email:
+            try:
+                return users.get(email=email)
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {email} does not exist.")
+        user = (
+            users.annotate(orders=Count("order")).order_by("-orders", "pk").first()
+        )
+        if user is None:
+            raise CommandError("No users found; run seed_benchmark_data first.")
+        return user
+
+    def get_host(self):
+        # Any concrete ALLOWED_HOSTS entry passes host validation; with
+        # DEBUG on and no entries Django accepts localhost.
+        for host in settings.ALLOWED_HOSTS:
+            if host and "*" not in host and not host.startswith("."):
+                return host
+        return "localhost"
+
+    def run_endpoint(self, prepare, requests, warmup):
+        """Time ``requests`` calls; ``prepare`` returns one call per request.
+
+        Picking parameters (e.g. free seats) happens in ``prepare`` so it
+        is not counted against the endpoint.
+        """
+        for _ in range(warmup):
+            prepare()()
+
+        latencies, queries, statuses = [], [], Counter()
+        for _ in range(requests):
+            call = prepare()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = call()
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            statuses[response.status_code] += 1
+
+        # tracemalloc slows every allocation down, so memory is measured in
+        # a separate pass instead of skewing the latencies above.
+        tracemalloc.start()
+        try:
+            peak = 0
+            for _ in range(min(requests, 10)):
+                call = prepare()
+                tracemalloc.reset_peak()
+                call()
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "requests": requests,
+            "status": dict(statuses),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "mean_ms": round(statistics.fmean(latencies), 2),
+            "max_ms": round(max(latencies), 2),
+            "queries_p50": percentile(queries, 50),
+            "queries_max": max(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+
+    def prepare_journey_list(self):
+        params = {}
+        if self.random.random() < 0.5:
+            params["route"] = self.random.choice(self.route_ids)
+        return lambda: self.client.get(reverse("station:journey-list"), params)
+
+    def prepare_journey_detail(self):
+        pk = self.random.choice(self.journey_ids)
+        url = reverse("station:journey-detail", args=[pk])
+        return lambda: self.client.get(url)
+
+    def prepare_order_list(self):
+        return lambda: self.client.get(reverse("station:order-list"))
+
+    def prepare_order_create(self):
+        journey = Journey.objects.select_related("train").get(
+            pk=self.random.choice(self.journey_ids)
+        )
+        seat_map = journey.get_seat_map()
+        free = [
+            (cargo, seat)
+            for cargo in range(1, journey.train.cargo_num + 1)
+            for seat in range(1, journey.train.places_in_cargo + 1)
+            if not seat_map.is_taken(cargo, seat)
+        ]
+        payload = json.dumps(
+            {
+                "tickets": [
+                    {"journey": journey.pk, "cargo": cargo, "seat": seat}
+                    for cargo, seat in free[:2] or [(1, 1)]
+                ]
+            }
+        )
+
+        def call():
+            try:
+                with transaction.atomic():
+                    response = self.client.post(
+                        reverse("station:order-list"),
+                        payload,
+                        content_type="application/json",
+                    )
+                    raise Rollback
+            except Rollback:
+                return response
+
+        return call
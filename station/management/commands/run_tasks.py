@@ -0,0 +1,50 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from station.tasks import run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background tasks. Due tasks are claimed for idle threads "
+        "with SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers can "
+        "share the queue. SIGTERM/SIGINT finish the running tasks and exit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.TASK_WORKER_CONCURRENCY,
+            help="Tasks run in parallel threads (default: "
+            "TASK_WORKER_CONCURRENCY).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty (default: 1).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as no task is due instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        if concurrency < 1:
+            raise CommandError("--concurrency must be at least 1.")
+
+        stopping = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: stopping.set())
+
+        total = run_worker(
+            concurrency, stopping, options["poll_interval"], options["once"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Ran {total} tasks."))
@@ -0,0 +1,222 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from station.cache import bump_model_version
+from station.geo import great_circle_km
+from station.models import (
+    Crew,
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.occupancy import record_journeys
+from station.seat_map import SeatMap
+
+PREFIX = "Bench"
+USER_EMAIL = "bench{}@example.com"
+USER_PASSWORD = "benchmark"
+
+# Roughly the bounding box of Ukraine.
+LATITUDES = (44.4, 52.3)
+LONGITUDES = (22.2, 40.2)
+TRAIN_SPEED_KMH = 90
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with a large synthetic dataset for "
+        "run_benchmarks. Every table is written with bulk inserts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stations", type=int, default=2000)
+        parser.add_argument("--routes", type=int, default=20000)
+        parser.add_argument("--trains", type=int, default=500)
+        parser.add_argument("--crew", type=int, default=1000)
+        parser.add_argument("--journeys", type=int, default=50000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--tickets",
+            type=int,
+            default=2_000_000,
+            help="Approximate number of tickets sold over all journeys.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if Station.objects.filter(name__startswith=f"{PREFIX} station").exists():
+            raise CommandError(
+                "Benchmark data is already present; run `manage.py flush` first."
+            )
+        if options["stations"] < 2:
+            raise CommandError("At least two stations are needed.")
+
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        with transaction.atomic():
+            stations = self.seed_stations(options["stations"])
+            routes = self.seed_routes(stations, options["routes"])
+            trains = self.seed_trains(options["trains"])
+            crew = self.seed_crew(options["crew"])
+            users = self.seed_users(options["users"])
+            journeys = self.seed_journeys(
+                routes, trains, crew, options["journeys"], options["tickets"]
+            )
+            tickets = self.seed_tickets(journeys, users)
+
+        for model in (Crew, Journey, Route, Station, Train, TrainType):
+            bump_model_version(model)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(stations)} stations, {len(routes)} routes, "
+                f"{len(trains)} trains, {len(journeys)} journeys, "
+                f"{len(users)} users and {tickets} tickets."
+            )
+        )
+
+    def log(self, message):
+        self.stdout.write(message)
+
+    def seed_stations(self, count):
+        stations = [
+            Station(
+                name=f"{PREFIX} station {number:05}",
+                latitude=round(self.random.uniform(*LATITUDES), 5),
+                longitude=round(self.random.uniform(*LONGITUDES), 5),
+            )
+            for number in range(count)
+        ]
+        self.log(f"Stations: {count}")
+        return Station.objects.bulk_create(stations, batch_size=self.batch_size)
+
+    def seed_routes(self, stations, count):
+        routes = []
+        for _ in range(count):
+            source, destination = self.random.sample(stations, 2)
+            routes.append(
+                Route(
+                    source=source,
+                    destination=destination,
+                    distance=max(1, round(great_circle_km(source, destination))),
+                )
+            )
+        self.log(f"Routes: {count}")
+        return Route.objects.bulk_create(routes, batch_size=self.batch_size)
+
+    def seed_trains(self, count):
+        train_types = TrainType.objects.bulk_create(
+            TrainType(name=f"{PREFIX} type {number}") for number in range(10)
+        )
+        trains = [
+            Train(
+                name=f"{PREFIX} train {number:05}",
+                train_type=self.random.choice(train_types),
+                cargo_num=self.random.randint(4, 16),
+                places_in_cargo=self.random.choice((36, 54, 64, 80)),
+            )
+            for number in range(count)
+        ]
+        self.log(f"Trains: {count}")
+        return Train.objects.bulk_create(trains, batch_size=self.batch_size)
+
+    def seed_crew(self, count):
+        crew = [
+            Crew(first_name=f"{PREFIX}", last_name=f"Crew {number:05}")
+            for number in range(count)
+        ]
+        self.log(f"Crew: {count}")
+        return Crew.objects.bulk_create(crew, batch_size=self.batch_size)
+
+    def seed_users(self, count):
+        # Hashing once keeps the seeding time independent of the hasher.
+        password = make_password(USER_PASSWORD)
+        users = [
+            get_user_model()(email=USER_EMAIL.format(number), password=password)
+            for number in range(count)
+        ]
+        self.log(f"Users: {count}")
+        return get_user_model().objects.bulk_create(users, batch_size=self.batch_size)
+
+    def seed_journeys(self, routes, trains, crew, count, tickets):
+        # Journeys are created with their seats already chosen, so the
+        # seats_sold counters and seat maps are right without a rebuild.
+        capacity = sum(train.capacity for train in trains) / len(trains)
+        fill = min(1.0, tickets / max(1, count * capacity))
+        start = timezone.now().replace(minute=0, second=0, microsecond=0)
+
+        journeys = []
+        for _ in range(count):
+            route, train = self.random.choice(routes), self.random.choice(trains)
+            departure = start + timedelta(
+                days=self.random.randint(-30, 90), hours=self.random.randint(0, 23)
+            )
+            share = self.random.uniform(0, 2 * fill)
+            sold = min(train.capacity, round(share * train.capacity))
+            seats = self.random.sample(range(train.capacity), sold)
+            seat_map = SeatMap.for_train(train)
+            for index in seats:
+                cargo, seat = divmod(index, train.places_in_cargo)
+                seat_map.take(cargo + 1, seat + 1)
+            journey = Journey(
+                route=route,
+                train=train,
+                departure_time=departure,
+                arrival_time=departure
+                + timedelta(hours=route.distance / TRAIN_SPEED_KMH + 0.5),
+                seats_sold=sold,
+                seat_map=seat_map.to_bytes(),
+            )
+            journey.seats = seats
+            journeys.append(journey)
+
+        Journey.objects.bulk_create(journeys, batch_size=self.batch_size)
+        record_journeys(journeys)
+        members = [
+            Journey.crew.through(journey_id=journey.pk, crew_id=member.pk)
+            for journey in journeys
+            for member in self.random.sample(crew, min(len(crew), 3))
+        ]
+        Journey.crew.through.objects.bulk_create(members, batch_size=self.batch_size)
+        self.log(f"Journeys: {count}")
+        return journeys
+
+    def seed_tickets(self, journeys, users):
+        # Orders and tickets are written in chunks to bound memory use.
+        total = 0
+        for offset in range(0, len(journeys), 500):
+            orders, order_seats = [], []
+            for journey in journeys[offset:offset + 500]:
+                seats = journey.seats
+                while seats:
+                    size = self.random.randint(1, 4)
+                    orders.append(Order(user=self.random.choice(users)))
+                    order_seats.append((journey, seats[:size]))
+                    seats = seats[size:]
+            Order.objects.bulk_create(orders, batch_size=self.batch_size)
+
+            tickets = [
+                Ticket(
+                    order=order,
+                    journey=journey,
+                    cargo=index // journey.train.places_in_cargo + 1,
+                    seat=index % journey.train.places_in_cargo + 1,
+                )
+                for order, (journey, seats) in zip(orders, order_seats)
+                for index in seats
+            ]
+            Ticket.objects.bulk_create(tickets, batch_size=self.batch_size)
+            total += len(tickets)
+            self.log(f"Tickets: {total}")
+        return total
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from station.models import IdempotencyKey, SeatHold, ThrottleCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired seat holds, throttle counters and idempotency keys "
+        "in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows deleted per statement (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        holds = SeatHold.objects.sweep_expired(options["batch_size"])
+        counters = ThrottleCounter.objects.sweep_expired(options["batch_size"])
+        keys = IdempotencyKey.objects.sweep_expired(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {holds} expired seat holds and "
+                f"{counters} throttle counters."
+            )
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {keys} expired idempotency keys.")
+        )
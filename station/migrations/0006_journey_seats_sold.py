@@ -0,0 +1,34 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_sold_seats(apps, schema_editor):
+    Journey = apps.get_model("station", "Journey")
+    Ticket = apps.get_model("station", "Ticket")
+    tickets = (
+        Ticket.objects.filter(journey=OuterRef("pk"))
+        .order_by()
+        .values("journey")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Journey.objects.update(seats_sold=Coalesce(Subquery(tickets), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0005_alter_order_options_remove_train_crew_train_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journey',
+            name='seats_sold',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_sold_seats, migrations.RunPython.noop),
+    ]
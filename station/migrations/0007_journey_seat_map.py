@@ -0,0 +1,65 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:22
+
+from django.db import migrations, models
+
+
+def build_seat_maps(apps, schema_editor):
+    # Seat (cargo, seat) is bit (cargo - 1) * places_in_cargo + seat - 1,
+    # least significant first inside every byte. The bitmap is spelled out
+    # here rather than taken from station.seat_map, so that later changes
+    # there cannot change what this migration did. Tickets outside the
+    # train are counted, not drawn.
+    quote = schema_editor.connection.ops.quote_name
+    journey, ticket, train = (
+        quote(apps.get_model("station", name)._meta.db_table)
+        for name in ("Journey", "Ticket", "Train")
+    )
+    schema_editor.execute(
+        f"""
+        WITH seats AS (
+            SELECT
+                t.journey_id,
+                (t.cargo - 1) * tr.places_in_cargo + t.seat - 1 AS position
+            FROM {ticket} t
+            JOIN {journey} j ON j.id = t.journey_id
+            JOIN {train} tr ON tr.id = j.train_id
+            WHERE t.cargo BETWEEN 1 AND tr.cargo_num
+                AND t.seat BETWEEN 1 AND tr.places_in_cargo
+        ), bytes AS (
+            SELECT journey_id, position / 8 AS index,
+                bit_or(1 << mod(position, 8)) AS value
+            FROM seats
+            GROUP BY journey_id, position / 8
+        ), maps AS (
+            SELECT j.id, string_agg(
+                set_byte(decode('00', 'hex'), 0, COALESCE(b.value, 0)),
+                ''::bytea ORDER BY n.index
+            ) AS seat_map
+            FROM {journey} j
+            JOIN {train} tr ON tr.id = j.train_id
+            CROSS JOIN generate_series(
+                0, (tr.cargo_num * tr.places_in_cargo + 7) / 8 - 1
+            ) AS n(index)
+            LEFT JOIN bytes b ON b.journey_id = j.id AND b.index = n.index
+            GROUP BY j.id
+        )
+        UPDATE {journey} j SET seat_map = maps.seat_map
+        FROM maps WHERE maps.id = j.id
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0006_journey_seats_sold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journey',
+            name='seat_map',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(build_seat_maps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('station', '0007_journey_seat_map'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cargo', models.IntegerField()),
+                ('seat', models.IntegerField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('journey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='station.journey')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('journey', 'cargo', 'seat')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0008_seathold'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journey',
+            index=models.Index(fields=['departure_time', 'id'], name='station_jou_departu_aeb808_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='station_ord_user_id_79537b_idx'),
+        ),
+    ]
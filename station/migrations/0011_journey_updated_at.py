@@ -0,0 +1,20 @@
+# Generated by Django 4.2.19 on 2026-10-18 11:02
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0010_journey_route_departure_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journey',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0011_journey_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='train',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
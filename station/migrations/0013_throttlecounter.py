@@ -0,0 +1,26 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0012_train_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('window_start', models.DateTimeField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'unique_together': {('key', 'window_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.19 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0013_throttlecounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'id'], name='station_ord_created_ea6ad5_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.19 on 2026-10-18 10:08
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0014_order_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JourneySchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('departure', models.TimeField(help_text='Local departure time')),
+                ('duration', models.DurationField()),
+                ('weekdays', models.PositiveSmallIntegerField(default=127, help_text='Bit mask of service days: Monday = 1, Tuesday = 2 ... Sunday = 64', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(127)])),
+                ('valid_from', models.DateField()),
+                ('valid_until', models.DateField(blank=True, null=True)),
+                ('generated_until', models.DateField(blank=True, editable=False, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScheduleException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='scheduleexception',
+            name='schedule',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='station.journeyschedule'),
+        ),
+        migrations.AddField(
+            model_name='journeyschedule',
+            name='crew',
+            field=models.ManyToManyField(blank=True, to='station.crew'),
+        ),
+        migrations.AddField(
+            model_name='journeyschedule',
+            name='route',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='station.route'),
+        ),
+        migrations.AddField(
+            model_name='journeyschedule',
+            name='train',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='station.train'),
+        ),
+        migrations.AddField(
+            model_name='journey',
+            name='schedule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='journeys', to='station.journeyschedule'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scheduleexception',
+            unique_together={('schedule', 'date')},
+        ),
+        migrations.AddConstraint(
+            model_name='journey',
+            constraint=models.UniqueConstraint(fields=('schedule', 'departure_time'), name='unique_schedule_departure'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.19 on 2026-10-18 10:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0015_journey_schedules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('journeys', models.IntegerField(default=0)),
+                ('capacity', models.IntegerField(default=0)),
+                ('seats_sold', models.IntegerField(default=0)),
+                ('route', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='station.route')),
+                ('train_type', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='station.traintype')),
+            ],
+            options={
+                'verbose_name_plural': 'daily occupancy',
+                'unique_together': {('date', 'route', 'train_type')},
+            },
+        ),
+    ]
@@ -1,9 +1,14 @@
+import hashlib
 import os
 import uuid
-from django.db import models
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import connection, models, transaction
 from django.forms import ValidationError
-from train_station import settings
+from django.conf import settings
+from django.utils import timezone
 from django.utils.text import slugify
+from station.seat_map import SeatMap
 
 class TrainType(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -23,9 +28,21 @@ class Crew(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+def file_content_hash(file) -> str:
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()[:32]
+
+
 def train_image_file_path(instance, filename):
     _, extencion = os.path.splitext(filename)
-    filename = f"{slugify(instance.name)}-{uuid.uuid4()}{extencion}"
+    try:
+        content_hash = file_content_hash(instance.image)
+    except (OSError, ValueError):
+        content_hash = uuid.uuid4().hex
+    filename = f"{slugify(instance.name)}-{content_hash}{extencion.lower()}"
     return os.path.join("uploads/trains", filename)
 
 
@@ -36,6 +53,7 @@ class Train(models.Model):
     places_in_cargo = models.IntegerField()
     train_type = models.ForeignKey(TrainType, on_delete=models.CASCADE)
     image = models.ImageField(null=True, upload_to=train_image_file_path)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     @property
     def capacity(self) -> int:
@@ -68,16 +86,136 @@ class Route(models.Model):
     def __str__(self) -> str:
         return self.full_route
 
+class JourneySchedule(models.Model):
+    """A recurring service that is expanded into ``Journey`` rows.
+
+    Journeys are generated up to ``generated_until`` (see
+    station.schedules); later dates only exist as this row.
+    """
+
+    route = models.ForeignKey(Route, on_delete=models.CASCADE)
+    train = models.ForeignKey(Train, on_delete=models.CASCADE)
+    crew = models.ManyToManyField(Crew, blank=True)
+    departure = models.TimeField(help_text="Local departure time")
+    duration = models.DurationField()
+    weekdays = models.PositiveSmallIntegerField(
+        default=0b1111111,
+        validators=[MinValueValidator(1), MaxValueValidator(0b1111111)],
+        help_text="Bit mask of service days: Monday = 1, Tuesday = 2 ... Sunday = 64",
+    )
+    valid_from = models.DateField()
+    valid_until = models.DateField(null=True, blank=True)
+    generated_until = models.DateField(null=True, blank=True, editable=False)
+
+    def runs_on(self, day) -> bool:
+        return bool(self.weekdays >> day.weekday() & 1)
+
+    def service_dates(self, start, end, exceptions=()):
+        """Yield the dates in ``[start, end]`` the schedule runs on."""
+        start = max(start, self.valid_from)
+        if self.valid_until is not None:
+            end = min(end, self.valid_until)
+        day = start
+        while day <= end:
+            if self.runs_on(day) and day not in exceptions:
+                yield day
+            day += timedelta(days=1)
+
+    def departure_on(self, day) -> datetime:
+        return timezone.make_aware(datetime.combine(day, self.departure))
+
+    def __str__(self):
+        return f"{self.route} at {self.departure:%H:%M}"
+
+
+class ScheduleException(models.Model):
+    """A date on which a schedule does not run."""
+
+    schedule = models.ForeignKey(
+        JourneySchedule, on_delete=models.CASCADE, related_name="exceptions"
+    )
+    date = models.DateField()
+
+    def __str__(self):
+        return f"{self.schedule}: not on {self.date}"
+
+    class Meta:
+        unique_together = ("schedule", "date")
+
+
 class Journey(models.Model):
     route = models.ForeignKey(Route, on_delete=models.CASCADE)
     train = models.ForeignKey(Train, on_delete=models.CASCADE)
     crew = models.ManyToManyField(Crew)
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
-    
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+    seat_map = models.BinaryField(default=bytes, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    schedule = models.ForeignKey(
+        JourneySchedule,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="journeys",
+    )
+
+    @property
+    def tickets_available(self) -> int:
+        return self.train.capacity - self.seats_sold
+
+    def get_seat_map(self) -> SeatMap:
+        return SeatMap.for_train(self.train, self.seat_map)
+
+    def build_seat_map(self) -> SeatMap:
+        seat_map = SeatMap.for_train(self.train)
+        if self.pk:
+            for cargo, seat in self.tickets.values_list("cargo", "seat"):
+                try:
+                    seat_map.take(cargo, seat)
+                except IndexError:
+                    # Ticket sold before the train was resized; counted, not drawn.
+                    pass
+        return seat_map
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            train_changed = False
+            if not self._state.adding:
+                # Ticket sales change these columns with UPDATEs of their
+                # own; write back the stored values, read under a lock,
+                # instead of whatever this instance loaded.
+                stored = (
+                    Journey.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("seats_sold", "seat_map", "train_id")
+                    .first()
+                )
+                if stored is not None:
+                    self.seats_sold, self.seat_map = stored[0], bytes(stored[1])
+                    # Another train may have the same byte size but a
+                    # different layout.
+                    train_changed = stored[2] != self.train_id
+            size = SeatMap.byte_size(self.train.cargo_num, self.train.places_in_cargo)
+            if train_changed or len(self.seat_map or b"") != size:
+                self.seat_map = self.build_seat_map().to_bytes()
+            return super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.route}: {self.departure_time}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["departure_time", "id"]),
+            models.Index(fields=["route", "departure_time"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["schedule", "departure_time"],
+                name="unique_schedule_departure",
+            ),
+        ]
+
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -87,6 +225,11 @@ class Order(models.Model):
     
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"]),
+            # Exports filter on created_at across all users.
+            models.Index(fields=["created_at", "id"]),
+        ]
 
 
 class Ticket(models.Model):
@@ -141,3 +284,252 @@ class Ticket(models.Model):
     
     class Meta:
         unique_together = ("journey", "cargo", "seat")
+
+
+class ExpiringQuerySet(models.QuerySet):
+    """QuerySet of rows with an ``expires_at`` column."""
+
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+    def sweep_expired(self, batch_size: int = 1000) -> int:
+        deleted = 0
+        while True:
+            batch = list(self.expired().values_list("pk", flat=True)[:batch_size])
+            if not batch:
+                return deleted
+            deleted += self.model.objects.filter(pk__in=batch).delete()[0]
+
+
+class SeatHoldQuerySet(ExpiringQuerySet):
+    pass
+
+
+class SeatHold(models.Model):
+    journey = models.ForeignKey(Journey,
+                                on_delete=models.CASCADE,
+                                related_name="holds")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE,
+                             related_name="seat_holds")
+    cargo = models.IntegerField()
+    seat = models.IntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.journey} cargo: {self.cargo}, seat: {self.seat} (held)"
+
+    class Meta:
+        unique_together = ("journey", "cargo", "seat")
+
+
+class ThrottleCounterQuerySet(ExpiringQuerySet):
+    def hit(self, key: str, now: float, duration: int, limit: int):
+        """Count a request of ``key`` if the sliding window has room for it.
+
+        Returns ``(allowed, current, previous, elapsed)``: whether the hit
+        was counted, the hits of the fixed window ``now`` falls in (this
+        one included if counted), the hits of the window before it, and
+        the seconds since the current one started. The check and the
+        upsert are a single statement, and the ``DO UPDATE`` condition is
+        evaluated on the locked row, so concurrent workers can neither
+        lose a hit nor both take the last one. Rejected requests are not
+        counted.
+        """
+        start = int(now // duration * duration)
+        window = datetime.fromtimestamp(start, tz=dt_timezone.utc)
+        previous = datetime.fromtimestamp(start - duration, tz=dt_timezone.utc)
+        expires_at = datetime.fromtimestamp(start + 2 * duration, tz=dt_timezone.utc)
+        # The window estimate, scaled by ``duration`` to compare without
+        # rounding: hits * duration + previous * remaining <= limit * duration.
+        remaining = start + duration - now
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH previous AS (
+                    SELECT COALESCE(
+                        (SELECT hits FROM {table}
+                         WHERE key = %(key)s AND window_start = %(previous)s),
+                        0
+                    ) AS hits
+                ), counted AS (
+                    INSERT INTO {table} (key, window_start, hits, expires_at)
+                    SELECT %(key)s, %(window)s, 1, %(expires_at)s FROM previous
+                    WHERE %(duration)s + previous.hits * %(remaining)s
+                        <= %(limit)s * %(duration)s
+                    ON CONFLICT (key, window_start) DO UPDATE
+                    SET hits = {table}.hits + 1
+                    WHERE ({table}.hits + 1) * %(duration)s
+                        + (SELECT hits FROM previous) * %(remaining)s
+                        <= %(limit)s * %(duration)s
+                    RETURNING hits
+                )
+                SELECT
+                    (SELECT hits FROM counted),
+                    COALESCE(
+                        (SELECT hits FROM {table}
+                         WHERE key = %(key)s AND window_start = %(window)s),
+                        0
+                    ),
+                    (SELECT hits FROM previous)
+                """,
+                {
+                    "key": key,
+                    "window": window,
+                    "previous": previous,
+                    "expires_at": expires_at,
+                    # Floats, or Postgres may multiply them as int2.
+                    "duration": float(duration),
+                    "remaining": float(remaining),
+                    "limit": float(limit),
+                },
+            )
+            counted, current, previous_hits = cursor.fetchone()
+        allowed = counted is not None
+        return allowed, counted if allowed else current, previous_hits, now - start
+
+
+class ThrottleCounter(models.Model):
+    """Hits of one throttle key in one fixed window (see station.throttling)."""
+
+    key = models.CharField(max_length=255)
+    window_start = models.DateTimeField()
+    hits = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = ThrottleCounterQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.key} @ {self.window_start}: {self.hits}"
+
+    class Meta:
+        unique_together = ("key", "window_start")
+
+
+class DailyOccupancyQuerySet(models.QuerySet):
+    def add(self, changes, batch_size: int = 1000) -> None:
+        """Add ``{(date, route_id, train_type_id): (journeys, capacity,
+        seats_sold)}`` deltas with one upsert.
+
+        Rows are written in key order, so concurrent upserts lock them in
+        the same order and cannot deadlock.
+        """
+        rows = [
+            (*key, *delta)
+            for key, delta in sorted(changes.items())
+            if any(delta)
+        ]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            for offset in range(0, len(rows), batch_size):
+                batch = rows[offset:offset + batch_size]
+                values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(batch))
+                cursor.execute(
+                    f"""
+                    INSERT INTO {table}
+                        (date, route_id, train_type_id, journeys, capacity, seats_sold)
+                    VALUES {values}
+                    ON CONFLICT (date, route_id, train_type_id) DO UPDATE SET
+                        journeys = {table}.journeys + EXCLUDED.journeys,
+                        capacity = {table}.capacity + EXCLUDED.capacity,
+                        seats_sold = {table}.seats_sold + EXCLUDED.seats_sold
+                    """,
+                    [value for row in batch for value in row],
+                )
+
+
+class DailyOccupancy(models.Model):
+    """Journeys, seats and sold seats per departure day, route and train type.
+
+    Maintained incrementally by station.occupancy; ``rebuild_occupancy``
+    recomputes it from the journeys.
+    """
+
+    # No database constraints: a cascade delete removes the route before
+    # the journeys' delete signals take their counts back out of the row.
+    # Such rows end up all zero and go with the next rebuild.
+    date = models.DateField()
+    route = models.ForeignKey(
+        Route, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    train_type = models.ForeignKey(
+        TrainType, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    journeys = models.IntegerField(default=0)
+    capacity = models.IntegerField(default=0)
+    seats_sold = models.IntegerField(default=0)
+
+    objects = DailyOccupancyQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.date}: {self.seats_sold}/{self.capacity}"
+
+    class Meta:
+        verbose_name_plural = "daily occupancy"
+        unique_together = ("date", "route", "train_type")
+
+
+class IdempotencyKeyQuerySet(ExpiringQuerySet):
+    pass
+
+
+class IdempotencyKey(models.Model):
+    """Response of a request sent with an ``Idempotency-Key`` header,
+    replayed when the client retries with the same key (see
+    station.idempotency).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    content_type = models.CharField(max_length=255, blank=True)
+    content = models.BinaryField(default=bytes)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = IdempotencyKeyQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.user_id}: {self.key}"
+
+    class Meta:
+        unique_together = ("user", "key")
+
+
+class Task(models.Model):
+    """Function call queued for the run_tasks worker (see station.tasks)."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.QUEUED
+    )
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_at"])]
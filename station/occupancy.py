@@ -0,0 +1,184 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from station.models import DailyOccupancy, Journey
+from station.read_serializers import full_route
+
+
+def occupancy_key(departure_time, route_id, train_type_id):
+    if timezone.is_naive(departure_time):
+        # Saved as a time in the default timezone, like the model field does.
+        departure_time = timezone.make_aware(
+            departure_time, timezone.get_default_timezone()
+        )
+    return (timezone.localtime(departure_time).date(), route_id, train_type_id)
+
+
+def journey_key(journey):
+    """Rollup key of ``journey``; its ``train`` must be loaded."""
+    return occupancy_key(
+        journey.departure_time, journey.route_id, journey.train.train_type_id
+    )
+
+
+def record_occupancy(changes) -> None:
+    """Apply ``{key: (journeys, capacity, seats_sold)}`` deltas to the rollup."""
+    DailyOccupancy.objects.add(changes)
+
+
+def record_journeys(journeys, sign: int = 1, sold: bool = True) -> None:
+    """Count ``journeys`` (with ``train`` loaded) in or out of the rollup.
+
+    ``sold=False`` leaves seats_sold alone, for journeys whose tickets are
+    recorded separately (a deleted journey's tickets are deleted first).
+    """
+    changes = defaultdict(lambda: [0, 0, 0])
+    for journey in journeys:
+        delta = changes[journey_key(journey)]
+        delta[0] += sign
+        delta[1] += sign * journey.train.capacity
+        if sold:
+            delta[2] += sign * journey.seats_sold
+    record_occupancy(changes)
+
+
+def record_seats_sold(journey, delta: int) -> None:
+    record_occupancy({journey_key(journey): (0, 0, delta)})
+
+
+def record_train_change(train, old_train_type_id, old_capacity: int) -> None:
+    """Move the journeys of ``train`` from its old type and capacity to the
+    current ones, with one aggregate over its journeys.
+    """
+    totals = (
+        train.journey_set.annotate(
+            day=TruncDate("departure_time", tzinfo=timezone.get_current_timezone())
+        )
+        .values("day", "route_id")
+        .annotate(count=Count("id"), sold=Sum("seats_sold"))
+        .order_by()
+    )
+    changes = defaultdict(lambda: [0, 0, 0])
+    for total in totals:
+        count, sold = total["count"], total["sold"]
+        old = changes[(total["day"], total["route_id"], old_train_type_id)]
+        old[0] -= count
+        old[1] -= count * old_capacity
+        old[2] -= sold
+        new = changes[(total["day"], total["route_id"], train.train_type_id)]
+        new[0] += count
+        new[1] += count * train.capacity
+        new[2] += sold
+    record_occupancy(changes)
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def rebuild_occupancy(start=None, end=None) -> int:
+    """Recompute the rollup of departure days ``start``..``end`` (inclusive)
+    from the journeys, and return the number of rows written.
+
+    The table is locked against writes meanwhile; ticket sales wait and
+    apply their deltas on top of the rebuilt rows.
+    """
+    journeys = Journey.objects.all()
+    rows = DailyOccupancy.objects.all()
+    if start is not None:
+        journeys = journeys.filter(departure_time__gte=day_start(start))
+        rows = rows.filter(date__gte=start)
+    if end is not None:
+        journeys = journeys.filter(
+            departure_time__lt=day_start(end + timedelta(days=1))
+        )
+        rows = rows.filter(date__lte=end)
+
+    totals = (
+        journeys.annotate(
+            day=TruncDate("departure_time", tzinfo=timezone.get_current_timezone())
+        )
+        .values("day", "route_id", "train__train_type_id")
+        .annotate(
+            count=Count("id"),
+            seats=Sum(F("train__cargo_num") * F("train__places_in_cargo")),
+            sold=Sum("seats_sold"),
+        )
+        .order_by()
+    )
+    table = connection.ops.quote_name(DailyOccupancy._meta.db_table)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+        rows.delete()
+        created = DailyOccupancy.objects.bulk_create(
+            (
+                DailyOccupancy(
+                    date=total["day"],
+                    route_id=total["route_id"],
+                    train_type_id=total["train__train_type_id"],
+                    journeys=total["count"],
+                    capacity=total["seats"],
+                    seats_sold=total["sold"],
+                )
+                for total in totals.iterator()
+            ),
+            batch_size=5000,
+        )
+    return len(created)
+
+
+# group_by name -> (fields, named expressions) it groups on
+OCCUPANCY_GROUPS = {
+    "day": (("date",), {}),
+    "route": (("route",), {"route_name": full_route("route__")}),
+    "train_type": (("train_type",), {"train_type_name": F("train_type__name")}),
+}
+
+
+def occupancy_report(group_by=("day",), start=None, end=None, route=None,
+                     train_type=None):
+    """Sum the rollup of departure days ``start``..``end`` over ``group_by``.
+
+    Returns one dict per group, ordered by the group columns, with its
+    journeys, capacity, seats_sold and load_factor (sold / capacity).
+    """
+    rows = DailyOccupancy.objects.all()
+    if start is not None:
+        rows = rows.filter(date__gte=start)
+    if end is not None:
+        rows = rows.filter(date__lte=end)
+    if route is not None:
+        rows = rows.filter(route_id=route)
+    if train_type is not None:
+        rows = rows.filter(train_type_id=train_type)
+
+    fields, expressions = [], {}
+    for name in group_by:
+        fields.extend(OCCUPANCY_GROUPS[name][0])
+        expressions.update(OCCUPANCY_GROUPS[name][1])
+    totals = (
+        rows.values(*fields, **expressions)
+        .annotate(
+            total_journeys=Sum("journeys"),
+            total_capacity=Sum("capacity"),
+            total_sold=Sum("seats_sold"),
+        )
+        .filter(total_journeys__gt=0)
+        .order_by(*fields)
+    )
+
+    report = []
+    for total in totals:
+        capacity, sold = total.pop("total_capacity"), total.pop("total_sold")
+        total["journeys"] = total.pop("total_journeys")
+        total["capacity"] = capacity
+        total["seats_sold"] = sold
+        total["load_factor"] = round(sold / capacity, 4) if capacity else None
+        report.append(total)
+    return report
@@ -0,0 +1,219 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import BooleanField, F, Func, Q, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class RowComparison(Func):
+    """``(a, b) < (x, y)`` as a single SQL row-value comparison, which
+    Postgres turns into an index range on ``(a, b)``.
+    """
+
+    output_field = BooleanField()
+
+    def __init__(self, fields, operator, values):
+        self.operator = operator
+        super().__init__(*map(F, fields), *map(Value, values))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sqls, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            sqls.append(sql)
+            params.extend(expression_params)
+        half = len(sqls) // 2
+        left, right = ", ".join(sqls[:half]), ", ".join(sqls[half:])
+        return f"({left}) {self.operator} ({right})", params
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on a composite, unique ordering.
+
+    A cursor holds the ordering values of the row a page starts after, so
+    each page is ``WHERE (a, b) > (x, y) ORDER BY a, b LIMIT n`` and a deep
+    page costs the same as the first one. No ``COUNT(*)`` is ever run.
+    """
+
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+    page_size = 15
+    page_size_query_param = "page_size"
+    max_page_size = 90
+    # The last field must be unique so the position is never ambiguous.
+    ordering = ("-id",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_results(list(self.get_page_queryset(queryset, request)))
+
+    def get_page_queryset(self, queryset, request):
+        """Return the (lazy) queryset of one page, plus a look-ahead row."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request, queryset.model)
+
+        if self.position is not None:
+            queryset = queryset.filter(self.keyset_filter(self.position, self.reverse))
+        return queryset.order_by(*self.get_ordering(self.reverse))[: self.page_size + 1]
+
+    def paginate_results(self, results):
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if self.reverse:
+            results.reverse()
+            has_previous, has_next = has_more, self.position is not None
+        else:
+            has_previous, has_next = self.position is not None, has_more
+
+        self.next_position = None
+        self.previous_position = None
+        if results and has_next:
+            self.next_position = self.get_position(results[-1])
+        if results and has_previous:
+            self.previous_position = self.get_position(results[0])
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        )
+
+    def keyset_filter(self, position, reverse=False):
+        names = [field.lstrip("-") for field in self.ordering]
+        lookups = [
+            "lt" if field.startswith("-") != reverse else "gt"
+            for field in self.ordering
+        ]
+        if len(set(lookups)) == 1:
+            return RowComparison(names, "<" if lookups[0] == "lt" else ">", position)
+
+        # Mixed directions have no row comparison; the expanded OR gets a
+        # bound on the first field so the index can still seek.
+        query = Q()
+        for index, (name, lookup) in enumerate(zip(names, lookups)):
+            clause = Q(**{f"{name}__{lookup}": position[index]})
+            for previous, value in zip(names[:index], position):
+                clause &= Q(**{previous: value})
+            query |= clause
+        return Q(**{f"{names[0]}__{lookups[0]}e": position[0]}) & query
+
+    def get_position(self, item):
+        names = [field.lstrip("-") for field in self.ordering]
+        if isinstance(item, dict):
+            return [item[name] for name in names]
+        return [getattr(item, name) for name in names]
+
+    def encode_cursor(self, position, reverse=False):
+        values = [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in position
+        ]
+        payload = json.dumps({"p": values, "r": int(reverse)}, separators=(",", ":"))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode("ascii")
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            values, reverse = payload["p"], bool(payload["r"])
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (
+            binascii.Error,
+            DjangoValidationError,
+            KeyError,
+            TypeError,
+            UnicodeEncodeError,
+            ValueError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class OrderPagination(KeysetPagination):
+    page_size = 15
+    max_page_size = 90
+    ordering = ("-created_at", "-id")
+
+
+class JourneyPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+    ordering = ("departure_time", "id")
@@ -0,0 +1,103 @@
+import math
+from bisect import bisect_left
+
+from station.local_index import ProcessLocalIndex
+from station.models import Journey
+
+
+class ConnectionIndex:
+    """Timetable of every journey as ``(departure, arrival, source, destination, id)``.
+
+    Connections are kept sorted by departure so a search can start at the
+    first train leaving after the requested time and scan forward
+    (Connection Scan Algorithm). Times are POSIX timestamps.
+    """
+
+    def __init__(self, connections):
+        self.connections = sorted(connections)
+        self.departures = [connection[0] for connection in self.connections]
+
+    @staticmethod
+    def connection(journey) -> tuple:
+        """The connection ``journey`` stands for now; needs its ``route``."""
+        return (
+            journey.departure_time.timestamp(),
+            journey.arrival_time.timestamp(),
+            journey.route.source_id,
+            journey.route.destination_id,
+            journey.pk,
+        )
+
+    @classmethod
+    def build(cls) -> "ConnectionIndex":
+        rows = Journey.objects.values_list(
+            "departure_time",
+            "arrival_time",
+            "route__source_id",
+            "route__destination_id",
+            "pk",
+        )
+        return cls(
+            (departure.timestamp(), arrival.timestamp(), source, destination, pk)
+            for departure, arrival, source, destination, pk in rows.iterator()
+        )
+
+    def earliest_arrival(self, source, destination, departure, min_transfer=0):
+        """Return the connections of the earliest arriving trip, or ``None``.
+
+        ``min_transfer`` seconds are required between arriving at a station
+        and leaving it again; no time is needed at the origin.
+        """
+        if source == destination:
+            return None
+
+        arrival = {source: departure}
+        reached_by = {}
+        best = math.inf
+        start = bisect_left(self.departures, departure)
+        for connection in self.connections[start:]:
+            leaves, arrives, from_station, to_station, _ = connection
+            if leaves >= best:
+                break
+            ready = arrival.get(from_station)
+            if ready is None:
+                continue
+            if from_station != source:
+                ready += min_transfer
+            if ready > leaves or arrives >= arrival.get(to_station, math.inf):
+                continue
+            arrival[to_station] = arrives
+            reached_by[to_station] = connection
+            if to_station == destination:
+                best = arrives
+
+        if destination not in reached_by:
+            return None
+        legs, station = [], destination
+        while station != source and len(legs) <= len(reached_by):
+            legs.append(reached_by[station])
+            station = reached_by[station][2]
+        legs.reverse()
+        return legs
+
+    def plan(self, source, destination, departure, min_transfer=0, limit=3):
+        """Return up to ``limit`` itineraries, each leaving later than the last."""
+        itineraries = []
+        while len(itineraries) < limit:
+            legs = self.earliest_arrival(source, destination, departure, min_transfer)
+            if legs is None:
+                break
+            itineraries.append(legs)
+            departure = legs[0][0] + 1
+        return itineraries
+
+
+_connection_index = ProcessLocalIndex(ConnectionIndex.build, "JOURNEY_PLANNER_INDEX_TTL")
+
+
+def get_connection_index() -> ConnectionIndex:
+    return _connection_index.get()
+
+
+def invalidate_connection_index() -> None:
+    _connection_index.invalidate()
@@ -0,0 +1,154 @@
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import ExpressionWrapper, F, IntegerField, OuterRef, Value
+from django.db.models.functions import Concat
+from rest_framework import mixins, serializers
+from rest_framework.response import Response
+
+from station.models import Crew, Ticket
+
+
+def full_route(prefix=""):
+    """SQL version of ``Route.full_route`` for the route at ``prefix``."""
+    return Concat(
+        F(f"{prefix}source__name"), Value(" - "), F(f"{prefix}destination__name")
+    )
+
+
+class ValuesSerializer:
+    """Read-only list serializer working on ``values()`` rows.
+
+    ``get_queryset()`` reduces a model queryset to flat dicts with every
+    display string built in SQL, so no model instances, related objects or
+    field instances are created per row. ``serialize()`` only picks keys
+    and formats datetimes; the output must stay identical to the
+    ``ModelSerializer`` the endpoint documents (see test_read_serializers).
+    Subclasses must define ``get_queryset(queryset)`` and
+    ``to_representation(row)``.
+    """
+
+    datetime_field = serializers.DateTimeField()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        missing = [
+            name
+            for name in ("get_queryset", "to_representation")
+            if not callable(getattr(cls, name, None))
+        ]
+        if missing:
+            raise TypeError(f"{cls.__name__} must define {', '.join(missing)}.")
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+    def format_datetime(self, value):
+        return self.datetime_field.to_representation(value)
+
+
+class JourneyListValuesSerializer(ValuesSerializer):
+    """Same output as ``JourneyListSerializer``."""
+
+    def get_queryset(self, queryset):
+        crew_names = (
+            Crew.objects.filter(journey=OuterRef("pk"))
+            .order_by("pk")
+            .values(full_name=Concat("first_name", Value(" "), "last_name"))
+        )
+        return queryset.select_related(None).prefetch_related(None).values(
+            "id",
+            "departure_time",
+            "arrival_time",
+            route_name=full_route("route__"),
+            train_name=F("train__name"),
+            crew_names=ArraySubquery(crew_names),
+            seats_available=ExpressionWrapper(
+                F("train__cargo_num") * F("train__places_in_cargo")
+                - F("seats_sold"),
+                output_field=IntegerField(),
+            ),
+        )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "route": row["route_name"],
+            "train": row["train_name"],
+            "crew": row["crew_names"],
+            "departure_time": self.format_datetime(row["departure_time"]),
+            "arrival_time": self.format_datetime(row["arrival_time"]),
+            "tickets_available": row["seats_available"],
+        }
+
+
+class OrderListValuesSerializer(ValuesSerializer):
+    """Same output as ``OrderListSerializer``.
+
+    Tickets of all orders in ``rows`` are read with one extra query.
+    """
+
+    def get_queryset(self, queryset):
+        return queryset.prefetch_related(None).values("id", "created_at")
+
+    def get_tickets(self, order_ids):
+        tickets = {order_id: [] for order_id in order_ids}
+        rows = (
+            Ticket.objects.filter(order_id__in=order_ids)
+            .order_by("pk")
+            .values(
+                "id",
+                "cargo",
+                "seat",
+                "order_id",
+                route_name=full_route("journey__route__"),
+                departure_time=F("journey__departure_time"),
+                arrival_time=F("journey__arrival_time"),
+            )
+        )
+        for row in rows:
+            tickets[row["order_id"]].append(
+                {
+                    "id": row["id"],
+                    "cargo": row["cargo"],
+                    "seat": row["seat"],
+                    "journey": {
+                        "route": row["route_name"],
+                        "departure_time": self.format_datetime(row["departure_time"]),
+                        "arrival_time": self.format_datetime(row["arrival_time"]),
+                    },
+                    "order": row["order_id"],
+                }
+            )
+        return tickets
+
+    def serialize(self, rows):
+        rows = list(rows)
+        if not rows:
+            return []
+        self.tickets = self.get_tickets([row["id"] for row in rows])
+        return super().serialize(rows)
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "tickets": self.tickets[row["id"]],
+            "created_at": self.format_datetime(row["created_at"]),
+        }
+
+
+class ValuesListModelMixin(mixins.ListModelMixin):
+    """``list`` through ``values_serializer_class`` instead of model instances.
+
+    ``get_serializer_class()`` still names the ``ModelSerializer`` for the
+    schema and for every other action.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.values_serializer_class()
+        queryset = serializer.get_queryset(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
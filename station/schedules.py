@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from station.cache import bump_versions, invalidate_now_and_on_commit
+from station.models import Journey, JourneySchedule
+from station.occupancy import record_journeys
+from station.planner import invalidate_connection_index
+from station.tasks import enqueue_on_commit
+
+
+def generate_schedule(schedule_id, until) -> int:
+    """Create the journeys of one schedule up to ``until``; return how many.
+
+    The schedule row stays locked until commit, so concurrent generators
+    wait for each other instead of creating the same journeys twice.
+    Dates before today are never generated.
+    """
+    with transaction.atomic():
+        schedule = (
+            JourneySchedule.objects.select_for_update(of=("self",))
+            .select_related("train")
+            .get(pk=schedule_id)
+        )
+        if schedule.generated_until is not None and schedule.generated_until >= until:
+            return 0
+        start = timezone.localdate()
+        if schedule.generated_until is not None:
+            start = max(start, schedule.generated_until + timedelta(days=1))
+        exceptions = set(
+            schedule.exceptions.filter(date__gte=start, date__lte=until).values_list(
+                "date", flat=True
+            )
+        )
+
+        journeys = []
+        for day in schedule.service_dates(start, until, exceptions):
+            departure = schedule.departure_on(day)
+            journeys.append(
+                Journey(
+                    route_id=schedule.route_id,
+                    train=schedule.train,
+                    departure_time=departure,
+                    arrival_time=departure + schedule.duration,
+                    schedule=schedule,
+                )
+            )
+        Journey.objects.bulk_create(journeys)
+        record_journeys(journeys)
+        crew_ids = list(schedule.crew.values_list("pk", flat=True))
+        Journey.crew.through.objects.bulk_create(
+            Journey.crew.through(journey_id=journey.pk, crew_id=crew_id)
+            for journey in journeys
+            for crew_id in crew_ids
+        )
+
+        schedule.generated_until = until
+        schedule.save(update_fields=["generated_until"])
+    return len(journeys)
+
+
+def generate_journeys(until=None, schedules=None) -> int:
+    """Generate the journeys of every schedule (or of ``schedules``) up to
+    ``until``, by default ``JOURNEY_SCHEDULE_HORIZON_DAYS`` from today.
+    """
+    if until is None:
+        until = timezone.localdate() + timedelta(
+            days=settings.JOURNEY_SCHEDULE_HORIZON_DAYS
+        )
+    pending = (
+        JourneySchedule.objects.filter(
+            Q(generated_until__isnull=True) | Q(generated_until__lt=until)
+        )
+        .exclude(valid_until__lte=F("generated_until"))
+        .order_by("pk")
+    )
+    if schedules is not None:
+        pending = pending.filter(pk__in=schedules)
+
+    created = 0
+    for schedule_id in pending.values_list("pk", flat=True):
+        created += generate_schedule(schedule_id, until)
+    # bulk_create sends no signals.
+    if created:
+        invalidate_now_and_on_commit(invalidate_connection_index)
+        bump_versions(Journey)
+    return created
+
+
+def generate_journeys_until(until: str) -> int:
+    """Task form of generate_journeys; ``until`` is an ISO date."""
+    return generate_journeys(date.fromisoformat(until))
+
+
+def request_journeys_until(end) -> None:
+    """Queue the journeys a search for departures before ``end`` needs.
+
+    Dates within the horizon are kept generated by the generate_journeys
+    command, so this costs nothing unless ``end`` lies beyond it. Further
+    dates are generated by the run_tasks worker, never by the request, and
+    never more than ``JOURNEY_SCHEDULE_MAX_DAYS`` ahead. Each day is only
+    queued once per ``JOURNEY_SCHEDULE_REQUEST_TIMEOUT``.
+    """
+    if end is None:
+        return
+    day = timezone.localtime(end - timedelta(microseconds=1)).date()
+    today = timezone.localdate()
+    if day <= today + timedelta(days=settings.JOURNEY_SCHEDULE_HORIZON_DAYS):
+        return
+    day = min(day, today + timedelta(days=settings.JOURNEY_SCHEDULE_MAX_DAYS))
+    if cache.add(
+        f"station:journeys-requested:{day.isoformat()}",
+        True,
+        settings.JOURNEY_SCHEDULE_REQUEST_TIMEOUT,
+    ):
+        enqueue_on_commit(generate_journeys_until, (day.isoformat(),))
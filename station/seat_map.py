@@ -0,0 +1,207 @@
+import base64
+
+from django.db.models import BinaryField, F, Func, Value
+
+
+class SeatMap:
+    """Seat occupancy bitmap of a journey.
+
+    Seat ``(cargo, seat)`` is bit ``(cargo - 1) * places_in_cargo + seat - 1``
+    and bits are numbered least significant first inside every byte, which
+    is the layout Postgres ``get_bit``/``set_bit`` use for ``bytea``.
+    """
+
+    ENCODINGS = ("bitmap", "rle")
+
+    def __init__(self, cargo_num: int, places_in_cargo: int, data=b""):
+        self.cargo_num = cargo_num
+        self.places_in_cargo = places_in_cargo
+        size = self.byte_size(cargo_num, places_in_cargo)
+        self.data = bytearray(bytes(data or b"")[:size].ljust(size, b"\0"))
+
+    @staticmethod
+    def byte_size(cargo_num: int, places_in_cargo: int) -> int:
+        return (cargo_num * places_in_cargo + 7) // 8
+
+    @classmethod
+    def for_train(cls, train, data=b"") -> "SeatMap":
+        return cls(train.cargo_num, train.places_in_cargo, data)
+
+    @property
+    def capacity(self) -> int:
+        return self.cargo_num * self.places_in_cargo
+
+    def index(self, cargo: int, seat: int) -> int:
+        if not (1 <= cargo <= self.cargo_num and 1 <= seat <= self.places_in_cargo):
+            raise IndexError(f"Seat {cargo}/{seat} is outside of the train")
+        return (cargo - 1) * self.places_in_cargo + seat - 1
+
+    def is_taken(self, cargo: int, seat: int) -> bool:
+        index = self.index(cargo, seat)
+        return bool(self.data[index >> 3] & (1 << (index & 7)))
+
+    def take(self, cargo: int, seat: int) -> None:
+        index = self.index(cargo, seat)
+        self.data[index >> 3] |= 1 << (index & 7)
+
+    def release(self, cargo: int, seat: int) -> None:
+        index = self.index(cargo, seat)
+        self.data[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def free_masks(self) -> list:
+        """Free seats of every cargo as an int, with bit ``seat - 1`` set."""
+        bits = int.from_bytes(self.data, "little")
+        full = (1 << self.places_in_cargo) - 1
+        return [
+            ~(bits >> (cargo * self.places_in_cargo)) & full
+            for cargo in range(self.cargo_num)
+        ]
+
+    def taken_count(self) -> int:
+        return int.from_bytes(self.data, "little").bit_count()
+
+    def taken_seats(self) -> list:
+        """``(cargo, seat)`` of every taken seat, in seat order."""
+        bits = int.from_bytes(self.data, "little")
+        seats = []
+        while bits:
+            low = bits & -bits
+            cargo, seat = divmod(low.bit_length() - 1, self.places_in_cargo)
+            seats.append((cargo + 1, seat + 1))
+            bits ^= low
+        return seats
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.data)
+
+    def to_rle(self) -> bytes:
+        """Encode the map as alternating free/taken run lengths.
+
+        Runs start with free seats (the first run may be 0) and every run
+        length is written as an unsigned LEB128 varint.
+        """
+        bits = int.from_bytes(self.data, "little")
+        encoded = bytearray()
+        position, taken = 0, False
+        while position < self.capacity:
+            run = 0
+            while (
+                position + run < self.capacity
+                and bool(bits >> (position + run) & 1) is taken
+            ):
+                run += 1
+            _write_varint(encoded, run)
+            position += run
+            taken = not taken
+        return bytes(encoded)
+
+    def encode(self, encoding: str = "bitmap") -> str:
+        raw = self.to_rle() if encoding == "rle" else self.to_bytes()
+        return base64.b64encode(raw).decode("ascii")
+
+
+def run_starts(mask: int, length: int) -> int:
+    """Bits of ``mask`` that start a run of ``length`` set bits.
+
+    Runs are doubled with shift-and, so it takes log2(length) steps.
+    """
+    have = 1
+    while have < length and mask:
+        step = min(have, length - have)
+        mask &= mask >> step
+        have += step
+    return mask
+
+
+def lowest_bits(mask: int, count: int) -> int:
+    bits = 0
+    for _ in range(count):
+        low = mask & -mask
+        bits |= low
+        mask ^= low
+    return bits
+
+
+def allocate_seats(seat_map: SeatMap, count: int, unavailable=()) -> list:
+    """Choose ``count`` free seats, also avoiding the ``unavailable`` ones.
+
+    A contiguous run in one cargo wins, taken from the fullest cargo that
+    has one so that empty cargos stay free for larger groups. Otherwise the
+    seats are spread over as few cargos as possible. Work grows with the
+    number of cargos, not seats. Raises ``ValueError`` when the journey
+    does not have enough free seats.
+    """
+    masks = seat_map.free_masks()
+    for cargo, seat in unavailable:
+        try:
+            index = seat_map.index(cargo, seat)
+        except IndexError:
+            continue
+        masks[cargo - 1] &= ~(1 << (index % seat_map.places_in_cargo))
+    counts = [mask.bit_count() for mask in masks]
+    if sum(counts) < count:
+        raise ValueError(f"Only {sum(counts)} seats are free.")
+
+    # Whole cargos, fullest first, until one cargo can take the rest.
+    chosen, remaining = {}, count
+    for index in sorted(range(len(masks)), key=lambda index: -counts[index]):
+        if counts[index] >= remaining:
+            break
+        chosen[index] = masks[index]
+        remaining -= counts[index]
+
+    best = None
+    for index, mask in enumerate(masks):
+        if index in chosen or counts[index] < remaining:
+            continue
+        starts = run_starts(mask, remaining)
+        key = (not starts, counts[index], index)
+        if best is None or key < best[0]:
+            best = (key, index, starts)
+    _, index, starts = best
+    if starts:
+        chosen[index] = ((1 << remaining) - 1) * (starts & -starts)
+    else:
+        chosen[index] = lowest_bits(masks[index], remaining)
+
+    seats = []
+    for index, bits in chosen.items():
+        while bits:
+            low = bits & -bits
+            seats.append((index + 1, low.bit_length()))
+            bits ^= low
+    return sorted(seats)
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+class PaddedSeatMap(Func):
+    # set_bit() rejects indexes past the end of the bytea, so a map that is
+    # shorter than the train (e.g. an old row) is zero padded first.
+    template = (
+        "(%(expressions)s || decode(repeat('00', "
+        "greatest(0, %(size)s - length(%(expressions)s))), 'hex'))"
+    )
+    output_field = BinaryField()
+
+    def __init__(self, expression, size: int, **extra):
+        super().__init__(expression, size=int(size), **extra)
+
+
+def set_seat_bits(seat_map: SeatMap, seats, taken: bool = True):
+    """Return an expression that flips ``seats`` in the stored ``seat_map``."""
+    expression = PaddedSeatMap(F("seat_map"), len(seat_map.data))
+    for cargo, seat in seats:
+        expression = Func(
+            expression,
+            Value(seat_map.index(cargo, seat)),
+            Value(int(taken)),
+            function="set_bit",
+            output_field=BinaryField(),
+        )
+    return expression
@@ -1,6 +1,18 @@
+from collections.abc import Mapping
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
 from rest_framework import serializers
-from django.db import transaction
-from rest_framework.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ErrorDetail, ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator
+from drf_spectacular.utils import extend_schema_field
+from station.inventory import record_sold_tickets
+from station.occupancy import OCCUPANCY_GROUPS
+from station.seat_map import allocate_seats
 from station.models import (Train,
                             TrainType,
                             Ticket,
@@ -8,7 +20,8 @@ from station.models import (Train,
                             Station,
                             Route,
                             Crew,
-                            Order)
+                            Order,
+                            SeatHold)
 
 
 class CrewSerializer(serializers.ModelSerializer):
@@ -23,6 +36,25 @@ class StationSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "latitude", "longitude")
 
 
+class StationNearbyQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lon = serializers.FloatField(min_value=-180, max_value=180)
+    k = serializers.IntegerField(min_value=1, max_value=100, default=5)
+    radius = serializers.FloatField(
+        min_value=0,
+        required=False,
+        help_text="Return every station within this many km instead of the k closest",
+    )
+
+
+class StationDistanceSerializer(StationSerializer):
+    distance = serializers.FloatField(read_only=True, help_text="Kilometres")
+
+    class Meta:
+        model = Station
+        fields = ("id", "name", "latitude", "longitude", "distance")
+
+
 class RouteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Route
@@ -50,6 +82,18 @@ class TrainTypeSerializer(serializers.ModelSerializer):
         fields = ("id", "name")
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Render ``Train.image_variants`` as ``{name: url}``."""
+
+    def to_representation(self, variants):
+        request = self.context.get("request")
+        urls = {}
+        for name, path in variants.items():
+            url = default_storage.url(path)
+            urls[name] = request.build_absolute_uri(url) if request else url
+        return urls
+
+
 class TrainSerializer(serializers.ModelSerializer):
     class Meta:
         model = Train
@@ -100,6 +144,25 @@ class JourneyListSerializer(JourneySerializer):
                   "tickets_available")
 
 
+class JourneyPlanQuerySerializer(serializers.Serializer):
+    source = serializers.PrimaryKeyRelatedField(queryset=Station.objects.all())
+    destination = serializers.PrimaryKeyRelatedField(queryset=Station.objects.all())
+    departure = serializers.DateTimeField(default=timezone.now)
+    min_transfer = serializers.IntegerField(
+        min_value=0,
+        default=settings.JOURNEY_PLANNER_MIN_TRANSFER_MINUTES,
+        help_text="Minutes needed to change trains",
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=5, default=3)
+
+
+class JourneyPlanSerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    transfers = serializers.IntegerField()
+    journeys = JourneyListSerializer(many=True)
+
+
 class JourneyTicketSerializer(JourneySerializer):
     route = serializers.SlugRelatedField(
         many=False,
@@ -118,6 +181,8 @@ class TrainListSerializer(TrainSerializer):
         read_only=True,
         slug_field="name"
     )
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Train
         fields = ("id",
@@ -125,7 +190,9 @@ class TrainListSerializer(TrainSerializer):
                   "cargo_num",
                   "places_in_cargo",
                   "train_type",
-                  "capacity")
+                  "capacity",
+                  "image",
+                  "image_variants")
 
 
 class TrainDetailSerializer(TrainSerializer):
@@ -134,6 +201,8 @@ class TrainDetailSerializer(TrainSerializer):
         read_only=True,
         slug_field="name"
     )
+    image_variants = ImageVariantsField()
+
     class Meta:
         model=Train
         fields=("id",
@@ -142,22 +211,102 @@ class TrainDetailSerializer(TrainSerializer):
                 "places_in_cargo",
                 "train_type",
                 "capacity",
-                "image")
+                "image",
+                "image_variants")
 
 
 class TrainImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Train
-        fields = ("id", "image")
+        fields = ("id", "image", "image_variants")
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    def prefetch(self, pks):
+        ids = set()
+        for pk in pks:
+            try:
+                ids.add(int(pk))
+            except (TypeError, ValueError):
+                continue
+        self._prefetched = self.get_queryset().in_bulk(ids)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, bool):
+            try:
+                return self._prefetched[int(data)]
+            except (AttributeError, KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+def seats_lookup(seats):
+    query = Q()
+    for journey_id, cargo, seat in seats:
+        query |= Q(journey_id=journey_id, cargo=cargo, seat=seat)
+    return query
+
+
+class TicketBulkSerializer(serializers.ListSerializer):
+    unique_message = UniqueTogetherValidator.message.format(
+        field_names="journey, cargo, seat"
+    )
+    held_message = "This seat is held by another customer."
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.fields["journey"].prefetch(
+                item.get("journey") for item in data if isinstance(item, Mapping)
+            )
+        attrs = super().to_internal_value(data)
+        # Raised from here rather than validate() to keep the errors per ticket.
+        self.validate_seats_free(attrs)
+        return attrs
+
+    def validate_seats_free(self, attrs):
+        seats = [
+            (ticket["journey"].pk, ticket["cargo"], ticket["seat"])
+            for ticket in attrs
+        ]
+        query = seats_lookup(set(seats))
+        taken = set(
+            Ticket.objects.filter(query).values_list("journey_id", "cargo", "seat")
+        )
+        held = SeatHold.objects.active().filter(query)
+        request = self.context.get("request")
+        if request is not None:
+            held = held.exclude(user_id=request.user.id)
+        held = set(held.values_list("journey_id", "cargo", "seat"))
+
+        errors = []
+        for seat in seats:
+            if seat in taken:
+                error = ErrorDetail(self.unique_message, code="unique")
+            elif seat in held:
+                error = ErrorDetail(self.held_message, code="held")
+            else:
+                error = None
+            errors.append(
+                {api_settings.NON_FIELD_ERRORS_KEY: [error]} if error else {}
+            )
+            taken.add(seat)
+        if any(errors):
+            raise ValidationError(errors)
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    journey = PrefetchedPrimaryKeyRelatedField(
+        queryset=Journey.objects.select_related("train")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
             attrs["cargo"],
             attrs["seat"],
-            attrs["journey"].order,
+            attrs["journey"].train,
             ValidationError
         )
         return data
@@ -165,6 +314,11 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "cargo", "seat", "journey", "order")
+        read_only_fields = ("order",)
+        # Seat uniqueness is checked for the whole order at once by
+        # TicketBulkSerializer instead of one query per ticket.
+        validators = []
+        list_serializer_class = TicketBulkSerializer
 
 
 class TicketListSerializer(TicketSerializer):
@@ -180,11 +334,8 @@ class TicketSeatSerializer(TicketSerializer):
 class JourneyDetailSerializer(JourneySerializer):
     train = TrainSerializer()
     route = RouteListSerializer()
-    taken_seats = TicketSeatSerializer(
-        many=True,
-        source="tickets",
-        read_only=True,
-    )
+    taken_seats = serializers.SerializerMethodField()
+
     class Meta:
         model=Journey
         fields=("route",
@@ -193,6 +344,14 @@ class JourneyDetailSerializer(JourneySerializer):
                 "arrival_time",
                 "taken_seats")
 
+    @extend_schema_field(TicketSeatSerializer(many=True))
+    def get_taken_seats(self, journey):
+        # Read from the seat bitmap rather than one row per ticket.
+        return [
+            {"cargo": cargo, "seat": seat}
+            for cargo, seat in journey.get_seat_map().taken_seats()
+        ]
+
 class OrderSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
 
@@ -201,12 +360,70 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ("id", "tickets", "created_at")
 
     def create(self, validated_data):
+        tickets_data = validated_data.pop("tickets")
+        try:
+            with transaction.atomic():
+                order = Order.objects.create(**validated_data)
+                tickets = Ticket.objects.bulk_create(
+                    Ticket(order=order, **ticket_data)
+                    for ticket_data in tickets_data
+                )
+                record_sold_tickets(tickets)
+                SeatHold.objects.filter(
+                    seats_lookup(
+                        (ticket.journey_id, ticket.cargo, ticket.seat)
+                        for ticket in tickets
+                    ),
+                    user_id=order.user_id,
+                ).delete()
+        except IntegrityError:
+            # A concurrent order took one of the seats after validation.
+            raise ValidationError(
+                {"tickets": [TicketBulkSerializer.unique_message]},
+                code="unique",
+            )
+        return order
+
+
+class OrderAllocateSerializer(serializers.Serializer):
+    journey = serializers.PrimaryKeyRelatedField(queryset=Journey.objects.all())
+    seats = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.ORDER_ALLOCATE_MAX_SEATS,
+        help_text="Number of seats the server picks",
+    )
+
+    def create(self, validated_data):
+        user_id = validated_data["user_id"]
         with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
-            return order
+            # The lock queues concurrent allocations for the journey, so
+            # each one reads a seat map with the others' tickets in it.
+            journey = (
+                Journey.objects.select_for_update(of=("self",))
+                .select_related("train")
+                .get(pk=validated_data["journey"].pk)
+            )
+            held = (
+                SeatHold.objects.active()
+                .filter(journey=journey)
+                .exclude(user_id=user_id)
+                .values_list("cargo", "seat")
+            )
+            try:
+                seats = allocate_seats(
+                    journey.get_seat_map(), validated_data["seats"], held
+                )
+            except ValueError as error:
+                raise ValidationError({"seats": [str(error)]}, code="unavailable")
+            return OrderSerializer().create(
+                {
+                    "user_id": user_id,
+                    "tickets": [
+                        {"journey": journey, "cargo": cargo, "seat": seat}
+                        for cargo, seat in seats
+                    ],
+                }
+            )
 
 
 class OrderListSerializer(OrderSerializer):
@@ -217,3 +434,118 @@ class OrderListSerializer(OrderSerializer):
         fields = ("id",
                   "tickets",
                   "created_at")
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("id", "journey", "cargo", "seat", "expires_at")
+
+
+class SeatSerializer(serializers.Serializer):
+    cargo = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldCreateSerializer(serializers.Serializer):
+    journey = serializers.PrimaryKeyRelatedField(
+        queryset=Journey.objects.select_related("train")
+    )
+    seats = SeatSerializer(many=True, allow_empty=False)
+    minutes = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.SEAT_HOLD_MAX_MINUTES,
+        default=settings.SEAT_HOLD_MINUTES,
+    )
+
+    def validate(self, attrs):
+        journey = attrs["journey"]
+        seat_map = journey.get_seat_map()
+        errors = []
+        for seat in attrs["seats"]:
+            try:
+                Ticket.validate_ticket(
+                    seat["cargo"], seat["seat"], journey.train, ValidationError
+                )
+            except ValidationError as error:
+                errors.append(error.detail)
+                continue
+            if seat_map.is_taken(seat["cargo"], seat["seat"]):
+                error = ErrorDetail(TicketBulkSerializer.unique_message, code="unique")
+                errors.append({api_settings.NON_FIELD_ERRORS_KEY: [error]})
+            else:
+                errors.append({})
+        if any(errors):
+            raise ValidationError({"seats": errors})
+        return attrs
+
+    def create(self, validated_data):
+        journey = validated_data["journey"]
+        user_id = validated_data["user_id"]
+        seats = {(journey.pk, seat["cargo"], seat["seat"])
+                 for seat in validated_data["seats"]}
+        expires_at = timezone.now() + timedelta(minutes=validated_data["minutes"])
+        try:
+            with transaction.atomic():
+                # Expired holds are only cleared lazily, when somebody asks
+                # for the same seat again; a user's own holds are renewed.
+                SeatHold.objects.filter(seats_lookup(seats)).filter(
+                    Q(expires_at__lte=timezone.now()) | Q(user_id=user_id)
+                ).delete()
+                return SeatHold.objects.bulk_create(
+                    SeatHold(
+                        journey=journey,
+                        user_id=user_id,
+                        cargo=cargo,
+                        seat=seat,
+                        expires_at=expires_at,
+                    )
+                    for _, cargo, seat in sorted(seats)
+                )
+        except IntegrityError:
+            raise ValidationError(
+                {"seats": [TicketBulkSerializer.held_message]}, code="held"
+            )
+
+
+class OccupancyQuerySerializer(serializers.Serializer):
+    group_by = serializers.CharField(
+        default="day",
+        help_text=f"Comma separated, any of: {', '.join(OCCUPANCY_GROUPS)}",
+    )
+    start = serializers.DateField(
+        required=False, help_text="First departure day (inclusive)"
+    )
+    end = serializers.DateField(
+        required=False, help_text="Last departure day (inclusive)"
+    )
+    route = serializers.IntegerField(required=False)
+    train_type = serializers.IntegerField(required=False)
+
+    def validate_group_by(self, value):
+        groups = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in groups if name not in OCCUPANCY_GROUPS]
+        if not groups or unknown:
+            raise ValidationError(
+                f"Expected a comma separated list of: {', '.join(OCCUPANCY_GROUPS)}."
+            )
+        return list(dict.fromkeys(groups))
+
+    def validate(self, attrs):
+        if "start" in attrs and "end" in attrs and attrs["start"] > attrs["end"]:
+            raise ValidationError({"end": "Must not be before start."})
+        return attrs
+
+
+class OccupancySerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+    route = serializers.IntegerField(required=False)
+    route_name = serializers.CharField(required=False)
+    train_type = serializers.IntegerField(required=False)
+    train_type_name = serializers.CharField(required=False)
+    journeys = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    seats_sold = serializers.IntegerField()
+    load_factor = serializers.FloatField(
+        allow_null=True, help_text="seats_sold / capacity"
+    )
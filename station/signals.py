@@ -0,0 +1,203 @@
+from collections import defaultdict
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from station.cache import bump_versions, invalidate_now_and_on_commit
+from station.geo import invalidate_station_index
+from station.images import schedule_image_variants
+from station.inventory import record_tickets, repair_inventory
+from station.models import (
+    Crew,
+    Journey,
+    JourneySchedule,
+    Route,
+    ScheduleException,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.occupancy import (
+    occupancy_key,
+    record_journeys,
+    record_occupancy,
+    record_train_change,
+)
+from station.planner import invalidate_connection_index
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_created(sender, instance, created, **kwargs):
+    if created:
+        record_tickets(instance.journey, [(instance.cargo, instance.seat)])
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, **kwargs):
+    try:
+        journey = instance.journey
+    except Journey.DoesNotExist:
+        return
+    record_tickets(journey, [(instance.cargo, instance.seat)], sold=False)
+
+
+@receiver(pre_save, sender=Train)
+def train_changing(sender, instance, **kwargs):
+    old = None
+    if instance.pk:
+        old = (
+            Train.objects.filter(pk=instance.pk)
+            .values_list(
+                "train_type_id", "cargo_num", "places_in_cargo", "image_variants"
+            )
+            .first()
+        )
+    instance._seat_layout_changed = bool(
+        old and old[1:3] != (instance.cargo_num, instance.places_in_cargo)
+    )
+    instance._occupancy_before = old and (old[0], old[1] * old[2])
+    # An uncommitted file is a fresh upload; its old variants are dropped,
+    # and their files deleted once the new ones exist.
+    instance._image_uploaded = bool(instance.image and not instance.image._committed)
+    if instance._image_uploaded:
+        instance._previous_variants = list((old[3] if old else {}).values())
+        instance.image_variants = {}
+
+
+@receiver(post_save, sender=Train)
+def train_seats_changed(sender, instance, **kwargs):
+    # Before the inventory repair, which records under the new train type.
+    before = getattr(instance, "_occupancy_before", None)
+    if before and before != (instance.train_type_id, instance.capacity):
+        record_train_change(instance, *before)
+
+
+@receiver(post_save, sender=Train)
+def train_layout_changed(sender, instance, **kwargs):
+    if getattr(instance, "_seat_layout_changed", False):
+        repair_inventory(instance.journey_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Train)
+def train_image_changed(sender, instance, **kwargs):
+    if getattr(instance, "_image_uploaded", False):
+        schedule_image_variants(instance, instance._previous_variants)
+
+
+@receiver(pre_save, sender=Journey)
+def journey_occupancy_changing(sender, instance, **kwargs):
+    old = None
+    if instance.pk:
+        old = (
+            Journey.objects.filter(pk=instance.pk)
+            .values_list(
+                "departure_time",
+                "route_id",
+                "train__train_type_id",
+                "train__cargo_num",
+                "train__places_in_cargo",
+                "seats_sold",
+            )
+            .first()
+        )
+    instance._occupancy_before = old
+
+
+@receiver(post_save, sender=Journey)
+def journey_occupancy_changed(sender, instance, **kwargs):
+    changes = defaultdict(lambda: [0, 0, 0])
+    before = getattr(instance, "_occupancy_before", None)
+    if before:
+        departure_time, route_id, train_type_id, cargo_num, places, sold = before
+        old = changes[occupancy_key(departure_time, route_id, train_type_id)]
+        old[0] -= 1
+        old[1] -= cargo_num * places
+        old[2] -= sold
+    new = changes[
+        occupancy_key(
+            instance.departure_time, instance.route_id, instance.train.train_type_id
+        )
+    ]
+    new[0] += 1
+    new[1] += instance.train.capacity
+    new[2] += instance.seats_sold
+    record_occupancy(changes)
+
+
+@receiver(post_delete, sender=Journey)
+def journey_occupancy_deleted(sender, instance, **kwargs):
+    # Its tickets were deleted first and took their seats out already.
+    record_journeys([instance], sign=-1, sold=False)
+
+
+@receiver(post_save, sender=Journey)
+@receiver(post_delete, sender=Journey)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def timetable_changed(sender, **kwargs):
+    invalidate_now_and_on_commit(invalidate_connection_index)
+
+
+@receiver(post_save, sender=ScheduleException)
+def schedule_date_cancelled(sender, instance, created, **kwargs):
+    # The generated journey of that day goes, unless tickets were sold.
+    if created:
+        Journey.objects.filter(
+            schedule_id=instance.schedule_id,
+            departure_time=instance.schedule.departure_on(instance.date),
+            tickets__isnull=True,
+        ).delete()
+
+
+@receiver(post_delete, sender=ScheduleException)
+def schedule_date_restored(sender, instance, origin=None, **kwargs):
+    # Not when the exception goes because its schedule is being deleted.
+    if getattr(origin, "model", type(origin)) is not ScheduleException:
+        return
+    # Read again: a cached schedule may predate the last generation.
+    schedule = JourneySchedule.objects.filter(pk=instance.schedule_id).first()
+    generated = schedule and schedule.generated_until
+    if (
+        generated is None
+        or not timezone.localdate() <= instance.date <= generated
+        or not any(schedule.service_dates(instance.date, instance.date))
+    ):
+        return
+    departure = schedule.departure_on(instance.date)
+    journey, created = Journey.objects.get_or_create(
+        schedule=schedule,
+        departure_time=departure,
+        defaults={
+            "route_id": schedule.route_id,
+            "train_id": schedule.train_id,
+            "arrival_time": departure + schedule.duration,
+        },
+    )
+    if created:
+        journey.crew.set(schedule.crew.all())
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+def stations_changed(sender, **kwargs):
+    invalidate_now_and_on_commit(invalidate_station_index)
+
+
+VERSIONED_MODELS = (Crew, Journey, Route, Station, Train, TrainType)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def versioned_model_changed(sender, **kwargs):
+    if sender in VERSIONED_MODELS:
+        bump_versions(sender)
+
+
+@receiver(m2m_changed)
+def versioned_relation_changed(sender, instance, action, model, **kwargs):
+    if action.startswith("post_"):
+        changed = {type(instance), model} & set(VERSIONED_MODELS)
+        if changed:
+            bump_versions(*changed)
@@ -0,0 +1,176 @@
+import logging
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from station.models import Task
+
+logger = logging.getLogger(__name__)
+
+
+def task_name(func) -> str:
+    if isinstance(func, str):
+        return func
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(func, args=(), kwargs=None, delay=None, max_attempts=None) -> Task:
+    """Queue ``func(*args, **kwargs)`` for the worker.
+
+    ``func`` is a module-level function or its dotted path; arguments must
+    be JSON serializable. Inside a transaction the row is only visible to
+    workers once it commits, and goes away if it rolls back.
+    """
+    return Task.objects.create(
+        name=task_name(func),
+        args=list(args),
+        kwargs=kwargs or {},
+        run_at=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+
+
+def enqueue_on_commit(func, args=(), kwargs=None, **options) -> None:
+    """Queue the task once the current transaction commits, if it does."""
+    transaction.on_commit(partial(enqueue, func, args, kwargs, **options))
+
+
+def claim_tasks(limit: int) -> list:
+    """Mark up to ``limit`` due tasks as running and return them.
+
+    ``SKIP LOCKED`` lets concurrent workers claim different rows without
+    waiting for each other. Tasks whose lease ran out (their worker died)
+    are claimed again.
+    """
+    now = timezone.now()
+    due = Q(status=Task.Status.QUEUED, run_at__lte=now) | Q(
+        status=Task.Status.RUNNING, locked_until__lte=now
+    )
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by("run_at", "pk")[:limit]
+        )
+        locked_until = now + timedelta(seconds=settings.TASK_LEASE_SECONDS)
+        Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+            status=Task.Status.RUNNING,
+            attempts=F("attempts") + 1,
+            locked_until=locked_until,
+        )
+    for task in tasks:
+        task.status = Task.Status.RUNNING
+        task.attempts += 1
+        task.locked_until = locked_until
+    return tasks
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.TASK_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.TASK_RETRY_MAX_DELAY))
+
+
+def run_task(task: Task) -> bool:
+    """Run a claimed task; delete it on success, else retry it with
+    exponential backoff until ``max_attempts`` is reached.
+
+    The row is only finished while it still carries this claim's lease. If
+    the lease ran out and another worker claimed the task meanwhile, the
+    outcome is left to that worker.
+    """
+    claimed = Task.objects.filter(pk=task.pk, locked_until=task.locked_until)
+    try:
+        import_string(task.name)(*task.args, **task.kwargs)
+    except Exception:
+        logger.exception("Task %s (%s) failed", task.pk, task.name)
+        if task.attempts >= task.max_attempts:
+            changes = {"status": Task.Status.FAILED}
+        else:
+            changes = {
+                "status": Task.Status.QUEUED,
+                "run_at": timezone.now() + retry_delay(task.attempts),
+            }
+        finished = claimed.update(
+            locked_until=None, last_error=traceback.format_exc(), **changes
+        )
+        succeeded = False
+    else:
+        finished, _ = claimed.delete()
+        succeeded = True
+    if not finished:
+        logger.warning(
+            "Task %s (%s) outlived its lease and was claimed again; "
+            "leaving it to the new claim",
+            task.pk,
+            task.name,
+        )
+    return succeeded
+
+
+def _run_in_thread(task: Task) -> bool:
+    try:
+        return run_task(task)
+    finally:
+        close_old_connections()
+
+
+def run_batch(batch_size: int = 10) -> int:
+    """Run up to ``batch_size`` due tasks one after another in this thread;
+    return the number run.
+
+    Each task is claimed right before it runs, so its lease isn't spent
+    waiting behind the others.
+    """
+    count = 0
+    while count < batch_size:
+        tasks = claim_tasks(1)
+        if not tasks:
+            break
+        run_task(tasks[0])
+        count += 1
+    return count
+
+
+def run_worker(concurrency=1, stop=None, poll_interval=1.0, once=False) -> int:
+    """Run due tasks until ``stop`` is set; return the number claimed.
+
+    With ``concurrency`` above one, tasks run on that many threads and are
+    claimed only for idle threads, as soon as one frees up: a slow task
+    holds up its own thread, not the rest. When no task is due, the queue
+    is polled every ``poll_interval`` seconds, or with ``once`` the worker
+    returns. Tasks already running are finished before returning.
+    """
+    stop = stop or threading.Event()
+    total = 0
+    if concurrency == 1:
+        while not stop.is_set():
+            ran = run_batch(1)
+            total += ran
+            if not ran:
+                if once:
+                    break
+                stop.wait(poll_interval)
+        return total
+
+    running = set()
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="tasks") as executor:
+        while not stop.is_set():
+            idle = concurrency - len(running)
+            tasks = claim_tasks(idle) if idle else []
+            running.update(executor.submit(_run_in_thread, task) for task in tasks)
+            total += len(tasks)
+            if running:
+                _, running = wait(running, poll_interval, FIRST_COMPLETED)
+            elif once:
+                break
+            else:
+                stop.wait(poll_interval)
+    return total
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from station.models import Journey, Route, Station, Train, TrainType
+
+
+def sample_route(source="Sample source", destination="Sample destination"):
+    return Route.objects.create(
+        source=Station.objects.create(name=source, latitude=50.45, longitude=30.52),
+        destination=Station.objects.create(
+            name=destination, latitude=49.84, longitude=24.03
+        ),
+        distance=540,
+    )
+
+
+def sample_train(
+    name="Sample train", train_type="Sample type", cargo_num=4, places_in_cargo=10
+):
+    return Train.objects.create(
+        name=name,
+        train_type=TrainType.objects.get_or_create(name=train_type)[0],
+        cargo_num=cargo_num,
+        places_in_cargo=places_in_cargo,
+    )
+
+
+def sample_journey(name="Sample", cargo_num=4, places_in_cargo=10, **params):
+    """Create a journey, with a route and train of its own unless given.
+
+    Station and train names are unique, so journeys that each need their
+    own route or train take a distinct ``name``.
+    """
+    if "route" not in params:
+        params["route"] = sample_route(f"{name} source", f"{name} destination")
+    if "train" not in params:
+        params["train"] = sample_train(
+            f"{name} train", f"{name} type", cargo_num, places_in_cargo
+        )
+    departure = params.setdefault("departure_time", datetime(2025, 2, 26, 10))
+    params.setdefault("arrival_time", departure + timedelta(hours=8))
+    return Journey.objects.create(**params)
+
+
+class QueryBudgetMixin:
+    """TestCase mixin that checks query counts against a fixed budget.
+
+    Subclasses must define ``build_dataset(size)``, which creates ``size``
+    rows of everything the endpoints under test return and gives back
+    whatever the request needs (ids, params). Each endpoint is then
+    requested against a dataset of every size in ``dataset_sizes``; the
+    test fails if the number of queries exceeds the budget (plus
+    ``request_overhead``) or differs between sizes, which is what an N+1
+    looks like.
+    """
+
+    dataset_sizes = (1, 5)
+    # Queries every API request makes on top of the endpoint's own: the
+    # throttle counter upsert (station.throttling).
+    request_overhead = 1
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not callable(getattr(cls, "build_dataset", None)):
+            raise TypeError(f"{cls.__name__} must define build_dataset(size).")
+
+    def count_queries(self, request, size):
+        # Every dataset lives in its own savepoint, so sizes don't mix.
+        with transaction.atomic():
+            context = self.build_dataset(size)
+            # The first call fills process-local caches (indexes, content
+            # types) that a long-running server only fills once.
+            response = request(context)
+            with CaptureQueriesContext(connection) as queries:
+                response = request(context)
+            transaction.set_rollback(True)
+        return response, queries
+
+    def assertQueryBudget(self, name, budget, request, status_code=200):
+        budget += self.request_overhead
+        counts = {}
+        for size in self.dataset_sizes:
+            response, queries = self.count_queries(request, size)
+            self.assertEqual(
+                response.status_code,
+                status_code,
+                f"{name}: unexpected status with {size} rows",
+            )
+            counts[size] = len(queries)
+            listing = "\n".join(query["sql"] for query in queries.captured_queries)
+            self.assertLessEqual(
+                len(queries),
+                budget,
+                f"{name}: {len(queries)} queries with {size} rows, budget is "
+                f"{budget}:\n{listing}",
+            )
+        self.assertEqual(
+            len(set(counts.values())),
+            1,
+            f"{name}: query count grows with the data {counts}",
+        )
@@ -0,0 +1,94 @@
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from station.models import Crew, Order, Ticket
+from station.testing import sample_journey, sample_route, sample_train
+
+
+class AsyncReadViewsTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "async@test.com", "samplepass4334"
+        )
+        token = str(RefreshToken.for_user(self.user).access_token)
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.client = APIClient()
+        route, train = sample_route(), sample_train(cargo_num=2)
+        crew = Crew.objects.create(first_name="Ivan", last_name="Franko")
+        self.journeys = []
+        for day in range(1, 4):
+            journey = sample_journey(
+                route=route, train=train, departure_time=datetime(2025, 3, day, 10)
+            )
+            journey.crew.add(crew)
+            self.journeys.append(journey)
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(journey=self.journeys[0], order=order, cargo=1, seat=2)
+        Ticket.objects.create(journey=self.journeys[1], order=order, cargo=2, seat=5)
+
+    async def assert_same_response(self, sync_url, async_url, params=None):
+        sync_res = await sync_to_async(self.client.get)(
+            sync_url, params, headers={"Accept": "application/json", **self.headers}
+        )
+        async_res = await self.async_client.get(
+            async_url, params, headers=self.headers
+        )
+        self.assertEqual(async_res.status_code, sync_res.status_code)
+        # Pagination links point at the endpoint that served the page.
+        content = async_res.content.replace(b"/async/", b"/")
+        self.assertEqual(content, sync_res.content)
+        return async_res
+
+    async def test_journey_list(self):
+        res = await self.assert_same_response(
+            reverse("station:journey-list"),
+            reverse("station:async-journey-list"),
+            {"page_size": 2},
+        )
+        cursor = res.json()["next"].split("cursor=")[1]
+        await self.assert_same_response(
+            reverse("station:journey-list"),
+            reverse("station:async-journey-list"),
+            {"page_size": 2, "cursor": cursor},
+        )
+
+    async def test_journey_detail(self):
+        pk = self.journeys[0].pk
+        await self.assert_same_response(
+            reverse("station:journey-detail", args=[pk]),
+            reverse("station:async-journey-detail", args=[pk]),
+        )
+        await self.assert_same_response(
+            reverse("station:journey-detail", args=[0]),
+            reverse("station:async-journey-detail", args=[0]),
+        )
+
+    async def test_route_and_order_lists(self):
+        await self.assert_same_response(
+            reverse("station:route-list"), reverse("station:async-route-list")
+        )
+        await self.assert_same_response(
+            reverse("station:order-list"), reverse("station:async-order-list")
+        )
+
+    async def test_bad_filter(self):
+        await self.assert_same_response(
+            reverse("station:journey-list"),
+            reverse("station:async-journey-list"),
+            {"date": "yesterday"},
+        )
+
+    async def test_authentication_required(self):
+        res = await self.async_client.get(reverse("station:async-journey-list"))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", res)
+
+        res = await self.async_client.post(
+            reverse("station:async-journey-list"), headers=self.headers
+        )
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,61 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from station.inventory import find_inventory_drift
+from station.models import Journey, Order, Station, Ticket
+
+
+class BenchmarkCommandsTest(TestCase):
+    def seed(self):
+        call_command(
+            "seed_benchmark_data",
+            stations=20,
+            routes=40,
+            trains=5,
+            crew=10,
+            journeys=30,
+            users=5,
+            tickets=1500,
+            batch_size=50,
+            stdout=StringIO(),
+        )
+
+    def test_seeded_inventory_is_consistent(self):
+        self.seed()
+
+        self.assertEqual(Station.objects.count(), 20)
+        self.assertEqual(Journey.objects.count(), 30)
+        self.assertGreater(Ticket.objects.count(), 0)
+        self.assertEqual(list(find_inventory_drift()), [])
+
+        with self.assertRaises(CommandError):
+            self.seed()
+
+    def test_run_benchmarks_report(self):
+        self.seed()
+        orders = Order.objects.count()
+        out = StringIO()
+        call_command("run_benchmarks", requests=3, warmup=1, stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["dataset"]["journeys"], 30)
+        for name, result in report["endpoints"].items():
+            expected = 201 if name == "order_create" else 200
+            self.assertEqual(result["status"], {str(expected): 3}, name)
+            self.assertGreater(result["queries_max"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+        # Orders placed by the benchmark are rolled back.
+        self.assertEqual(Order.objects.count(), orders)
+
+    def test_benchmark_serializers_report(self):
+        self.seed()
+        out = StringIO()
+        call_command("benchmark_serializers", rows=10, repeat=2, stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report), {"journey_list", "order_list"})
+        self.assertEqual(report["journey_list"]["rows"], 10)
+        for result in report.values():
+            self.assertGreater(result["speedup"], 0)
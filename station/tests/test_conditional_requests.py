@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.models import Order, Ticket, Train
+from station.testing import sample_journey
+
+JOURNEY_URL = reverse("station:journey-list")
+TRAIN_URL = reverse("station:train-list")
+
+
+class ConditionalListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "etag@test.com", "samplepass4334"
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey()
+
+    def test_unchanged_journey_list_is_not_modified(self):
+        res = self.client.get(JOURNEY_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", res)
+
+        res = self.client.get(JOURNEY_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+        self.assertIn("ETag", res)
+
+    def test_ticket_sale_changes_journey_etag(self):
+        etag = self.client.get(JOURNEY_URL)["ETag"]
+        Ticket.objects.create(
+            journey=self.journey,
+            order=Order.objects.create(user=self.user),
+            cargo=1,
+            seat=1,
+        )
+
+        res = self.client.get(JOURNEY_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 39)
+
+    def test_etag_depends_on_query(self):
+        etag = self.client.get(JOURNEY_URL)["ETag"]
+        res = self.client.get(
+            JOURNEY_URL, {"route": self.journey.route_id}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_train_list_validators(self):
+        res = self.client.get(TRAIN_URL)
+        etag, last_modified = res["ETag"], res["Last-Modified"]
+
+        res = self.client.get(TRAIN_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Train.objects.filter(pk=self.journey.train_id).first().save()
+        res = self.client.get(TRAIN_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
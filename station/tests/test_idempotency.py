@@ -0,0 +1,99 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.models import IdempotencyKey, Order, Ticket
+from station.testing import sample_journey
+
+ORDER_URL = reverse("station:order-list")
+ALLOCATE_URL = reverse("station:order-allocate")
+
+
+class IdempotentOrderTest(TestCase):
+    def setUp(self):
+        self.journey = sample_journey()
+        self.user = get_user_model().objects.create_user("retry@test.com", "pass4334")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def order(self, key, *seats, client=None):
+        payload = {
+            "tickets": [
+                {"journey": self.journey.id, "cargo": cargo, "seat": seat}
+                for cargo, seat in seats
+            ]
+        }
+        return (client or self.client).post(
+            ORDER_URL, payload, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_the_first_response(self):
+        first = self.order("checkout-1", (1, 1), (1, 2))
+        retry = self.order("checkout-1", (1, 1), (1, 2))
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry["Content-Type"], first["Content-Type"])
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_key_reused_for_another_request(self):
+        self.order("checkout-1", (1, 1))
+
+        res = self.order("checkout-1", (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_requests_are_not_stored(self):
+        other = APIClient()
+        other.force_authenticate(
+            get_user_model().objects.create_user("other@test.com", "pass4334")
+        )
+        self.order("checkout-1", (1, 1), client=other)
+
+        res = self.order("checkout-1", (1, 1))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(IdempotencyKey.objects.filter(user=self.user).count(), 0)
+
+        Order.objects.all().delete()
+        res = self.order("checkout-1", (1, 1))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_expired_key_runs_again(self):
+        self.order("checkout-1", (1, 1))
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        res = self.order("checkout-1", (1, 1), (1, 2))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.order("checkout-1", (1, 2))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", res)
+
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        out = StringIO()
+        call_command("sweep_expired", stdout=out)
+        self.assertIn("Deleted 1 expired idempotency keys.", out.getvalue())
+
+    def test_allocate_and_invalid_key(self):
+        payload = {"journey": self.journey.id, "seats": 2}
+        first = self.client.post(
+            ALLOCATE_URL, payload, format="json", HTTP_IDEMPOTENCY_KEY="group-1"
+        )
+        retry = self.client.post(
+            ALLOCATE_URL, payload, format="json", HTTP_IDEMPOTENCY_KEY="group-1"
+        )
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+        res = self.order("k" * 256, (2, 1))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
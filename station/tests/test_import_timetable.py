@@ -0,0 +1,155 @@
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from station.models import Journey, Route, Station
+from station.testing import sample_train
+
+JOURNEYS_CSV = """source,destination,train,departure_time,arrival_time,distance
+Kyiv,Lviv,Intercity,2025-03-01T08:00:00+00:00,2025-03-01T14:00:00+00:00,540
+Kyiv,Lviv,Intercity,2025-03-02T08:00:00+00:00,2025-03-02T14:00:00+00:00,
+Lviv,Odesa,Intercity,2025-03-01T16:00:00+00:00,2025-03-02T06:00:00+00:00,
+"""
+
+STATIONS_CSV = """name,latitude,longitude
+Lviv,49.84,24.03
+Odesa,46.48,30.72
+"""
+
+STOPS_TXT = """stop_id,stop_name,stop_lat,stop_lon,location_type,parent_station
+KYIV,Kyiv,50.45,30.52,1,
+KYIV-1,Kyiv platform 1,50.45,30.52,0,KYIV
+LVIV,Lviv,49.84,24.03,1,
+"""
+
+TRIPS_TXT = """route_id,service_id,trip_id,trip_short_name
+Intercity,daily,T1,
+Intercity,daily,T2,Night
+"""
+
+STOP_TIMES_TXT = """trip_id,arrival_time,departure_time,stop_id,stop_sequence
+T1,14:00:00,14:00:00,LVIV,2
+T1,08:00:00,08:00:00,KYIV-1,1
+T2,22:30:00,22:30:00,KYIV-1,1
+T2,25:10:00,,LVIV,5
+"""
+
+
+class ImportTimetableTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.train = sample_train("Intercity", "Fast")
+        self.kyiv = Station.objects.create(name="Kyiv", latitude=50.45, longitude=30.52)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", newline="") as file:
+            file.write(content)
+        return path
+
+    def import_csv(self, content=JOURNEYS_CSV, **options):
+        out = StringIO()
+        call_command(
+            "import_timetable",
+            self.write("journeys.csv", content),
+            stations=self.write("stations.csv", STATIONS_CSV),
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def test_csv_import(self):
+        for method in ("copy", "insert"):
+            with self.subTest(method=method):
+                Journey.objects.all().delete()
+                Route.objects.all().delete()
+                output = self.import_csv(method=method, batch_size=2)
+
+                self.assertIn("3 journeys, 2 new routes", output)
+                self.assertIn(method, output)
+                self.assertEqual(Station.objects.count(), 3)
+                route = Route.objects.get(source=self.kyiv, destination__name="Lviv")
+                self.assertEqual(route.distance, 540)
+                journey = Journey.objects.filter(route=route).earliest("departure_time")
+                self.assertEqual(
+                    journey.departure_time,
+                    datetime(2025, 3, 1, 8, tzinfo=dt_timezone.utc),
+                )
+                self.assertEqual(journey.tickets_available, 40)
+                self.assertIsNotNone(journey.updated_at)
+
+    def test_existing_routes_are_reused(self):
+        self.import_csv()
+        self.import_csv()
+
+        self.assertEqual(Route.objects.count(), 2)
+        self.assertEqual(Journey.objects.count(), 6)
+
+    def test_invalid_rows_roll_back_everything(self):
+        content = JOURNEYS_CSV + (
+            "Kyiv,Paris,Intercity,2025-03-01T08:00:00,2025-03-01T09:00:00,\n"
+            "Kyiv,Lviv,Regional,2025-03-01T08:00:00,2025-03-01T09:00:00,\n"
+            "Kyiv,Lviv,Intercity,tomorrow,2025-03-01T09:00:00,\n"
+            "Kyiv,Lviv,Intercity,2025-03-01T09:00:00,2025-03-01T08:00:00,\n"
+        )
+        with self.assertRaises(CommandError) as raised:
+            self.import_csv(content)
+
+        message = str(raised.exception)
+        self.assertIn("4 row(s) failed validation", message)
+        self.assertIn("journeys.csv line 5: unknown station 'Paris'", message)
+        self.assertIn("line 6: unknown train 'Regional'", message)
+        self.assertIn("line 7: departure_time 'tomorrow' is not a datetime", message)
+        self.assertIn("line 8: arrival_time is not after departure_time", message)
+        self.assertEqual(Journey.objects.count(), 0)
+        self.assertEqual(Station.objects.count(), 1)
+
+    def test_dry_run_writes_nothing(self):
+        output = self.import_csv(dry_run=True)
+
+        self.assertIn("Dry run, rolled back: 3 journeys", output)
+        self.assertEqual(Journey.objects.count(), 0)
+        self.assertEqual(Route.objects.count(), 0)
+
+    def test_missing_column(self):
+        with self.assertRaisesMessage(
+            CommandError, "journeys.csv: missing column(s) train"
+        ):
+            self.import_csv("source,destination,departure_time,arrival_time\n")
+
+    def test_gtfs_import(self):
+        sample_train("Night", "Fast")
+        self.write("stops.txt", STOPS_TXT)
+        self.write("trips.txt", TRIPS_TXT)
+        self.write("stop_times.txt", STOP_TIMES_TXT)
+
+        call_command(
+            "import_timetable",
+            self.directory.name,
+            "--format=gtfs",
+            "--service-date=2025-03-01",
+            "--service-date=2025-03-02",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(Station.objects.count(), 2)
+        journeys = Journey.objects.select_related("train", "route__source")
+        self.assertEqual(journeys.count(), 4)
+        night = journeys.filter(train__name="Night").earliest("departure_time")
+        self.assertEqual(night.route.full_route, "Kyiv - Lviv")
+        self.assertEqual(
+            (night.departure_time, night.arrival_time),
+            (
+                datetime(2025, 3, 1, 22, 30, tzinfo=dt_timezone.utc),
+                datetime(2025, 3, 2, 1, 10, tzinfo=dt_timezone.utc),
+            ),
+        )
+        self.assertEqual(journeys.filter(train=self.train).count(), 2)
+
+    def test_gtfs_needs_service_date(self):
+        with self.assertRaisesMessage(CommandError, "--service-date is required"):
+            call_command("import_timetable", self.directory.name, format="gtfs")
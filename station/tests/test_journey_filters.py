@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.filters import filter_journeys
+from station.models import Journey, Route, Station, Train, TrainType
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+@override_settings(TIME_ZONE="Europe/Kyiv")
+class JourneyDepartureFilterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("filters@test.com", "pass4334")
+        )
+        source = Station.objects.create(name="Kyiv", latitude=50.45, longitude=30.52)
+        destination = Station.objects.create(name="Lviv", latitude=49.84, longitude=24.03)
+        self.route = Route.objects.create(
+            source=source, destination=destination, distance=540
+        )
+        self.other_route = Route.objects.create(
+            source=destination, destination=source, distance=540
+        )
+        self.train = Train.objects.create(
+            name="Intercity",
+            train_type=TrainType.objects.create(name="Intercity"),
+            cargo_num=1,
+            places_in_cargo=10,
+        )
+
+    def journey(self, departure, route=None):
+        return Journey.objects.create(
+            route=route or self.route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=6),
+        )
+
+    def ids(self, **params):
+        res = self.client.get(JOURNEY_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return {journey["id"] for journey in res.data["results"]}
+
+    def test_date_is_a_day_in_the_configured_time_zone(self):
+        # 23:30 in Kyiv on Feb 3 is still Feb 3 there, but 21:30 UTC.
+        late = self.journey(datetime(2025, 2, 3, 21, 30, tzinfo=dt_timezone.utc))
+        # 23:30 UTC on Feb 3 is already Feb 4 in Kyiv.
+        next_day = self.journey(datetime(2025, 2, 3, 23, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(self.ids(date="2025-02-03"), {late.id})
+
+    def test_from_to_window_and_route(self):
+        first = self.journey(datetime(2025, 2, 1, 8))
+        second = self.journey(datetime(2025, 2, 2, 8))
+        third = self.journey(datetime(2025, 2, 3, 8))
+        other = self.journey(datetime(2025, 2, 2, 9), route=self.other_route)
+
+        self.assertEqual(
+            self.ids(**{"from": "2025-02-02", "to": "2025-02-03"}),
+            {second.id, third.id, other.id},
+        )
+        self.assertEqual(
+            self.ids(**{"from": "2025-02-01T09:00", "to": "2025-02-03T08:00"}),
+            {second.id, other.id},
+        )
+        self.assertEqual(
+            self.ids(route=self.route.id, **{"to": "2025-02-02"}),
+            {first.id, second.id},
+        )
+
+    def test_invalid_parameters(self):
+        for params in ({"date": "03.02.2025"}, {"from": "soon"}, {"route": "x"}):
+            res = self.client.get(JOURNEY_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_generated_sql_is_sargable(self):
+        queryset = filter_journeys(
+            Journey.objects.all(), QueryDict("route=1&date=2025-02-03")
+        )
+        sql = str(queryset.query)
+        self.assertIn('"station_journey"."departure_time" >= ', sql)
+        self.assertIn('"station_journey"."departure_time" < ', sql)
+        self.assertIn('"station_journey"."route_id" = 1', sql)
+        self.assertNotIn("::date", sql)
+        self.assertNotIn("AT TIME ZONE", sql)
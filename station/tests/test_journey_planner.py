@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.models import Journey, Route, Station, Train, TrainType
+from station.planner import ConnectionIndex
+
+PLAN_URL = reverse("station:journey-plan")
+
+
+def at(hour, minute=0):
+    return datetime(2025, 3, 1, hour, minute, tzinfo=timezone.utc)
+
+
+class JourneyPlannerTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("planner@test.com", "pass4334")
+        )
+        self.stations = {
+            name: Station.objects.create(name=name, latitude=0, longitude=0)
+            for name in "ABCD"
+        }
+        self.train = Train.objects.create(
+            name="Planner train",
+            train_type=TrainType.objects.create(name="Planner"),
+            cargo_num=1,
+            places_in_cargo=10,
+        )
+        self.ab = self.journey("A", "B", at(8), at(9))
+        self.bc_fast = self.journey("B", "C", at(9, 5), at(10))
+        self.bc = self.journey("B", "C", at(9, 30), at(10, 30))
+        self.ac = self.journey("A", "C", at(8, 30), at(11))
+
+    def journey(self, source, destination, departure, arrival):
+        route, _ = Route.objects.get_or_create(
+            source=self.stations[source],
+            destination=self.stations[destination],
+            defaults={"distance": 100},
+        )
+        return Journey.objects.create(
+            route=route, train=self.train, departure_time=departure, arrival_time=arrival
+        )
+
+    def plan(self, source, destination, **params):
+        params.update(
+            source=self.stations[source].id,
+            destination=self.stations[destination].id,
+            departure=at(7).isoformat(),
+        )
+        res = self.client.get(PLAN_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [[leg["id"] for leg in plan["journeys"]] for plan in res.data]
+
+    def test_transfer_time_is_respected(self):
+        self.assertEqual(
+            self.plan("A", "C", limit=2),
+            [[self.ab.id, self.bc.id], [self.ac.id]],
+        )
+        self.assertEqual(
+            self.plan("A", "C", min_transfer=0, limit=1),
+            [[self.ab.id, self.bc_fast.id]],
+        )
+
+    def test_index_is_rebuilt_after_timetable_changes(self):
+        self.assertEqual(self.plan("A", "D"), [])
+        cd = self.journey("C", "D", at(10, 45), at(12))
+        self.assertEqual(self.plan("A", "D", limit=1), [[self.ab.id, self.bc.id, cd.id]])
+
+    def test_stale_index_never_yields_partial_itineraries(self):
+        self.assertEqual(
+            self.plan("A", "C", limit=2),
+            [[self.ab.id, self.bc.id], [self.ac.id]],
+        )
+        # Changes made by another worker: no signal reaches this process.
+        Journey.objects.filter(pk=self.bc.pk).update(
+            departure_time=at(12), arrival_time=at(13)
+        )
+        self.assertEqual(self.plan("A", "C", limit=2), [[self.ac.id]])
+
+        Journey.objects.filter(pk=self.ac.pk)._raw_delete(Journey.objects.db)
+        self.assertEqual(self.plan("A", "C", limit=2), [[self.ab.id, self.bc.id]])
+
+    def test_response_shape(self):
+        res = self.client.get(
+            PLAN_URL,
+            {
+                "source": self.stations["A"].id,
+                "destination": self.stations["C"].id,
+                "departure": at(7).isoformat(),
+                "limit": 1,
+            },
+        )
+        self.assertEqual(res.data[0]["transfers"], 1)
+        self.assertEqual(res.data[0]["arrival_time"], "2025-03-01T10:30:00Z")
+        self.assertEqual(res.data[0]["journeys"][0]["route"], "A - B")
+
+    def test_missing_station(self):
+        res = self.client.get(PLAN_URL, {"source": self.stations["A"].id})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_scan_skips_unreachable_connections(self):
+        index = ConnectionIndex(
+            [(10, 20, 1, 2, 1), (5, 8, 3, 2, 2), (25, 30, 2, 4, 3)]
+        )
+        self.assertEqual(
+            index.earliest_arrival(1, 4, 0), [(10, 20, 1, 2, 1), (25, 30, 2, 4, 3)]
+        )
+        self.assertIsNone(index.earliest_arrival(1, 4, 0, min_transfer=10))
@@ -0,0 +1,162 @@
+from datetime import time, timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from station.models import (
+    Crew,
+    Journey,
+    JourneySchedule,
+    Order,
+    ScheduleException,
+    Ticket,
+)
+from station.schedules import generate_journeys
+from station.tasks import run_batch
+from station.testing import sample_route, sample_train
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+def sample_schedule(**params):
+    defaults = {
+        "route": sample_route(),
+        "train": sample_train(),
+        "departure": time(8, 30),
+        "duration": timedelta(hours=5, minutes=45),
+        "valid_from": timezone.localdate(),
+    }
+    defaults.update(params)
+    return JourneySchedule.objects.create(**defaults)
+
+
+@override_settings(JOURNEY_SCHEDULE_HORIZON_DAYS=13, JOURNEY_SCHEDULE_MAX_DAYS=60)
+class JourneyScheduleTest(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.schedule = sample_schedule(
+            # Every day but today's weekday.
+            weekdays=0b1111111 & ~(1 << self.today.weekday()),
+        )
+        self.crew = Crew.objects.bulk_create(
+            Crew(first_name="Crew", last_name=str(number)) for number in range(2)
+        )
+        self.schedule.crew.set(self.crew)
+
+    def departures(self):
+        return list(
+            Journey.objects.filter(schedule=self.schedule)
+            .order_by("departure_time")
+            .values_list("departure_time", flat=True)
+        )
+
+    def test_generate_journeys(self):
+        ScheduleException.objects.create(
+            schedule=self.schedule, date=self.today + timedelta(days=2)
+        )
+
+        self.assertEqual(generate_journeys(), 11)
+
+        departures = self.departures()
+        first = self.schedule.departure_on(self.today + timedelta(days=1))
+        self.assertEqual(departures[0], first)
+        self.assertEqual(departures[1], first + timedelta(days=2))
+        journey = Journey.objects.get(departure_time=first)
+        self.assertEqual(journey.arrival_time, first + timedelta(hours=5, minutes=45))
+        self.assertEqual(set(journey.crew.all()), set(self.crew))
+        self.assertEqual(journey.tickets_available, 40)
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.generated_until, self.today + timedelta(days=13))
+
+        self.assertEqual(generate_journeys(), 0)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Journey.objects.create(
+                route=journey.route,
+                train=journey.train,
+                departure_time=first,
+                arrival_time=journey.arrival_time,
+                schedule=self.schedule,
+            )
+
+    def test_generation_stops_at_valid_until(self):
+        JourneySchedule.objects.filter(pk=self.schedule.pk).update(
+            valid_until=self.today + timedelta(days=3)
+        )
+        self.assertEqual(generate_journeys(), 3)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("generate_journeys", days=6, stdout=out)
+
+        self.assertIn("Generated 6 journeys", out.getvalue())
+        self.assertEqual(len(self.departures()), 6)
+
+    def test_search_beyond_horizon_queues_generation(self):
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("search@test.com", "pass4334")
+        )
+        generate_journeys()
+
+        res = client.get(JOURNEY_URL)
+        self.assertEqual(len(res.data["results"]), 12)
+        self.assertEqual(run_batch(), 0)
+
+        day = self.today + timedelta(days=40)
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                res = client.get(JOURNEY_URL, {"date": day.isoformat()})
+            # The request only reads; the worker generates the journeys.
+            self.assertEqual(res.data["results"], [])
+        self.assertEqual(run_batch(), 1)
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.generated_until, day)
+        res = client.get(JOURNEY_URL, {"date": day.isoformat()})
+        self.assertEqual(len(res.data["results"]), int(self.schedule.runs_on(day)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            client.get(
+                JOURNEY_URL, {"to": (self.today + timedelta(days=400)).isoformat()}
+            )
+        self.assertEqual(run_batch(), 1)
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.generated_until, self.today + timedelta(days=60))
+
+    def test_exception_cancels_and_restores_unsold_journeys(self):
+        generate_journeys()
+        sold, unsold = Journey.objects.filter(schedule=self.schedule).order_by(
+            "departure_time"
+        )[:2]
+        Ticket.objects.create(
+            journey=sold,
+            order=Order.objects.create(
+                user=get_user_model().objects.create_user("buyer@test.com", "pass4334")
+            ),
+            cargo=1,
+            seat=1,
+        )
+
+        exceptions = [
+            ScheduleException.objects.create(
+                schedule=self.schedule,
+                date=timezone.localtime(journey.departure_time).date(),
+            )
+            for journey in (sold, unsold)
+        ]
+        self.assertTrue(Journey.objects.filter(pk=sold.pk).exists())
+        self.assertFalse(Journey.objects.filter(pk=unsold.pk).exists())
+
+        exceptions[1].delete()
+        restored = Journey.objects.get(
+            schedule=self.schedule, departure_time=unsold.departure_time
+        )
+        self.assertEqual(set(restored.crew.all()), set(self.crew))
+
+        self.schedule.delete()
+        self.assertEqual(Journey.objects.filter(schedule__isnull=True).count(), 12)
@@ -0,0 +1,178 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.models import DailyOccupancy, Order, Ticket
+from station.occupancy import rebuild_occupancy
+from station.testing import sample_journey, sample_route, sample_train
+
+OCCUPANCY_URL = reverse("station:occupancy-list")
+FIRST_DAY = date(2025, 3, 1)
+
+
+def occupancy():
+    return {
+        (row.date, row.route_id, row.train_type_id): (
+            row.journeys,
+            row.capacity,
+            row.seats_sold,
+        )
+        for row in DailyOccupancy.objects.exclude(journeys=0)
+    }
+
+
+class OccupancyTest(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "analyst@test.com", "samplepass4334"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.kyiv_lviv = sample_route("Kyiv", "Lviv")
+        self.kyiv_odesa = sample_route("Kyiv Pas", "Odesa")
+        self.fast = sample_train("Intercity", "Fast", cargo_num=2)
+        self.slow = sample_train("Regional", "Slow", cargo_num=1)
+
+        first = datetime(2025, 3, 1, 10, tzinfo=dt_timezone.utc)
+        second = first + timedelta(days=1)
+        self.journeys = [
+            sample_journey(route=self.kyiv_lviv, train=self.fast, departure_time=first),
+            sample_journey(route=self.kyiv_lviv, train=self.fast, departure_time=first),
+            sample_journey(route=self.kyiv_lviv, train=self.slow, departure_time=first),
+            sample_journey(
+                route=self.kyiv_odesa, train=self.fast, departure_time=second
+            ),
+        ]
+        self.order = Order.objects.create(user=self.admin)
+        for journey, seats in zip(self.journeys, (3, 1, 5, 0)):
+            for seat in range(1, seats + 1):
+                Ticket.objects.create(
+                    journey=journey, order=self.order, cargo=1, seat=seat
+                )
+
+    def test_rollup_follows_tickets_and_journeys(self):
+        fast, slow = self.fast.train_type_id, self.slow.train_type_id
+        day = FIRST_DAY + timedelta(days=1)
+        self.assertEqual(
+            occupancy(),
+            {
+                (FIRST_DAY, self.kyiv_lviv.pk, fast): (2, 40, 4),
+                (FIRST_DAY, self.kyiv_lviv.pk, slow): (1, 10, 5),
+                (day, self.kyiv_odesa.pk, fast): (1, 20, 0),
+            },
+        )
+
+        self.journeys[0].tickets.first().delete()
+        moved = self.journeys[1]
+        moved.departure_time += timedelta(days=1)
+        moved.save()
+        self.journeys[2].delete()
+
+        self.assertEqual(
+            occupancy(),
+            {
+                (FIRST_DAY, self.kyiv_lviv.pk, fast): (1, 20, 2),
+                (day, self.kyiv_lviv.pk, fast): (1, 20, 1),
+                (day, self.kyiv_odesa.pk, fast): (1, 20, 0),
+            },
+        )
+
+    def test_train_change_moves_its_journeys(self):
+        slow = self.slow.train_type_id
+        self.slow.train_type = self.fast.train_type
+        self.slow.cargo_num = 3
+        self.slow.save()
+
+        self.assertEqual(
+            occupancy()[(FIRST_DAY, self.kyiv_lviv.pk, self.fast.train_type_id)],
+            (3, 70, 9),
+        )
+        self.assertNotIn((FIRST_DAY, self.kyiv_lviv.pk, slow), occupancy())
+
+    def test_rebuild_matches_incremental_rollup(self):
+        expected = occupancy()
+        DailyOccupancy.objects.filter(date=FIRST_DAY).update(seats_sold=0)
+        DailyOccupancy.objects.create(
+            date=FIRST_DAY,
+            route=self.kyiv_odesa,
+            train_type=self.slow.train_type,
+            journeys=4,
+            capacity=4,
+        )
+
+        self.assertEqual(rebuild_occupancy(FIRST_DAY, FIRST_DAY), 2)
+        self.assertEqual(occupancy(), expected)
+
+        out = StringIO()
+        call_command("rebuild_occupancy", stdout=out)
+        self.assertIn("Rebuilt 3 occupancy rows", out.getvalue())
+        self.assertEqual(occupancy(), expected)
+
+    def test_report_by_day(self):
+        res = self.client.get(OCCUPANCY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "date": "2025-03-01",
+                    "journeys": 3,
+                    "capacity": 50,
+                    "seats_sold": 9,
+                    "load_factor": 0.18,
+                },
+                {
+                    "date": "2025-03-02",
+                    "journeys": 1,
+                    "capacity": 20,
+                    "seats_sold": 0,
+                    "load_factor": 0.0,
+                },
+            ],
+        )
+
+    def test_report_by_route_and_train_type(self):
+        res = self.client.get(
+            OCCUPANCY_URL,
+            {"group_by": "route,train_type", "end": "2025-03-01"},
+        )
+
+        self.assertEqual(
+            [
+                (row["route_name"], row["train_type_name"], row["load_factor"])
+                for row in res.data
+            ],
+            [("Kyiv - Lviv", "Fast", 0.1), ("Kyiv - Lviv", "Slow", 0.5)],
+        )
+        self.assertNotIn("date", res.data[0])
+
+        res = self.client.get(
+            OCCUPANCY_URL,
+            {"group_by": "route", "train_type": self.fast.train_type_id},
+        )
+        self.assertEqual(
+            [(row["route"], row["seats_sold"]) for row in res.data],
+            [(self.kyiv_lviv.pk, 4), (self.kyiv_odesa.pk, 0)],
+        )
+
+    def test_invalid_parameters(self):
+        for params in (
+            {"group_by": "week"},
+            {"group_by": ","},
+            {"start": "2025-03-02", "end": "2025-03-01"},
+        ):
+            with self.subTest(params):
+                res = self.client.get(OCCUPANCY_URL, params)
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_report_is_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@test.com", "samplepass4334")
+        )
+        res = self.client.get(OCCUPANCY_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
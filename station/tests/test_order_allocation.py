@@ -0,0 +1,123 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.models import Order, SeatHold, Ticket
+from station.seat_map import SeatMap, allocate_seats, run_starts
+from station.testing import sample_journey
+
+ALLOCATE_URL = reverse("station:order-allocate")
+
+
+def sample_seat_map(*taken):
+    seat_map = SeatMap(3, 6)
+    for cargo, seat in taken:
+        seat_map.take(cargo, seat)
+    return seat_map
+
+
+class AllocateSeatsTest(SimpleTestCase):
+    def test_run_starts(self):
+        self.assertEqual(run_starts(0b0111011, 3), 0b0001000)
+        self.assertEqual(run_starts(0b1111111, 5), 0b0000111)
+        self.assertEqual(run_starts(0b1010101, 2), 0)
+
+    def test_contiguous_run_in_fullest_cargo(self):
+        seat_map = sample_seat_map((1, 3), (3, 1), (3, 2), (3, 3))
+
+        self.assertEqual(allocate_seats(seat_map, 2), [(3, 4), (3, 5)])
+        self.assertEqual(
+            allocate_seats(seat_map, 4), [(2, 1), (2, 2), (2, 3), (2, 4)]
+        )
+
+    def test_fewest_cargos_when_no_run_fits(self):
+        seat_map = sample_seat_map((1, 2), (1, 4), (2, 3), (2, 5), (3, 1), (3, 4))
+
+        self.assertEqual(
+            allocate_seats(seat_map, 4), [(1, 1), (1, 3), (1, 5), (1, 6)]
+        )
+        self.assertEqual(
+            allocate_seats(seat_map, 6),
+            [(1, 1), (1, 3), (1, 5), (1, 6), (2, 1), (2, 2)],
+        )
+
+    def test_unavailable_seats_and_full_journey(self):
+        seat_map = sample_seat_map(*((1, seat) for seat in range(1, 7)))
+        unavailable = [(2, seat) for seat in range(1, 7)] + [(3, 2), (9, 1)]
+
+        self.assertEqual(
+            allocate_seats(seat_map, 4, unavailable),
+            [(3, 3), (3, 4), (3, 5), (3, 6)],
+        )
+        with self.assertRaisesMessage(ValueError, "Only 5 seats are free."):
+            allocate_seats(seat_map, 6, unavailable)
+
+
+class OrderAllocateApiTest(TestCase):
+    def setUp(self):
+        self.journey = sample_journey(cargo_num=3, places_in_cargo=6)
+        self.user = get_user_model().objects.create_user("group@test.com", "pass4334")
+        self.other = get_user_model().objects.create_user("other@test.com", "pass4334")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def allocate(self, seats):
+        return self.client.post(
+            ALLOCATE_URL, {"journey": self.journey.pk, "seats": seats}, format="json"
+        )
+
+    def test_allocate_contiguous_seats(self):
+        order = Order.objects.create(user=self.other)
+        for seat in (1, 2):
+            Ticket.objects.create(journey=self.journey, order=order, cargo=1, seat=seat)
+        SeatHold.objects.create(
+            journey=self.journey,
+            user=self.other,
+            cargo=1,
+            seat=6,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+
+        res = self.allocate(3)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(ticket["cargo"], ticket["seat"]) for ticket in res.data["tickets"]],
+            [(1, 3), (1, 4), (1, 5)],
+        )
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 5)
+        self.assertTrue(self.journey.get_seat_map().is_taken(1, 4))
+
+        res = self.allocate(3)
+        self.assertEqual(
+            [(ticket["cargo"], ticket["seat"]) for ticket in res.data["tickets"]],
+            [(2, 1), (2, 2), (2, 3)],
+        )
+
+    def test_own_holds_are_allocated_and_released(self):
+        SeatHold.objects.create(
+            journey=self.journey,
+            user=self.user,
+            cargo=1,
+            seat=1,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+
+        res = self.allocate(2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["tickets"][0]["seat"], 1)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_not_enough_seats(self):
+        res = self.allocate(19)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Only 18 seats are free.", res.data["seats"])
+        self.assertFalse(Order.objects.exists())
+
+        res = self.allocate(0)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
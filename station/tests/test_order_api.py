@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.models import Order, Ticket
+from station.testing import sample_journey
+
+ORDER_URL = reverse("station:order-list")
+
+
+class OrderCreateApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "orders@test.com", "samplepass4334"
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey()
+
+    def order_payload(self, *seats):
+        return {
+            "tickets": [
+                {"journey": self.journey.id, "cargo": cargo, "seat": seat}
+                for cargo, seat in seats
+            ]
+        }
+
+    def test_create_order(self):
+        res = self.client.post(
+            ORDER_URL, self.order_payload((1, 1), (1, 2)), format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(user=self.user)
+        self.assertEqual(order.tickets.count(), 2)
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 2)
+        self.assertTrue(self.journey.get_seat_map().is_taken(1, 2))
+
+    def test_query_count_does_not_grow_with_tickets(self):
+        def count_queries(seats):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(
+                    ORDER_URL, self.order_payload(*seats), format="json"
+                )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        single = count_queries([(1, 1)])
+        group = count_queries([(2, seat) for seat in range(1, 11)])
+        self.assertEqual(single, group)
+
+    def test_seat_out_of_train_range(self):
+        res = self.client.post(
+            ORDER_URL, self.order_payload((5, 1)), format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"][0]["cargo_num"][0],
+            "cargo_num number must be in avaliable range: "
+            "(1, cargo_num): (1, 4)",
+        )
+
+    def test_taken_seat_rejected(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(journey=self.journey, order=order, cargo=1, seat=1)
+        res = self.client.post(
+            ORDER_URL, self.order_payload((1, 2), (1, 1)), format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertEqual(
+            res.data["tickets"][1]["non_field_errors"][0],
+            "The fields journey, cargo, seat must make a unique set.",
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_duplicate_seat_in_one_order_rejected(self):
+        res = self.client.post(
+            ORDER_URL, self.order_payload((1, 1), (1, 1)), format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", res.data["tickets"][1])
+        self.assertFalse(Order.objects.exists())
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.export import EXPORT_COLUMNS
+from station.models import Order, Ticket
+from station.testing import sample_journey
+
+EXPORT_URL = reverse("station:order-export")
+
+
+def sample_order(user, journey, created_at, *seats):
+    order = Order.objects.create(user=user)
+    Order.objects.filter(pk=order.pk).update(created_at=created_at)
+    for seat in seats:
+        Ticket.objects.create(order=order, journey=journey, cargo=1, seat=seat)
+    return order
+
+
+class OrderExportTest(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "finance@test.com", "samplepass4334"
+        )
+        self.user = get_user_model().objects.create_user(
+            "buyer@test.com", "samplepass4334"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        journey = sample_journey(
+            departure_time=datetime(2025, 2, 26, 10, tzinfo=dt_timezone.utc)
+        )
+        self.march = sample_order(
+            self.user, journey, datetime(2025, 3, 1, 12, tzinfo=dt_timezone.utc), 1, 2
+        )
+        self.april = sample_order(
+            self.admin, journey, datetime(2025, 4, 1, 12, tzinfo=dt_timezone.utc), 3
+        )
+
+    def read(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res["Content-Type"], "text/csv")
+        self.assertIn('filename="orders.csv"', res["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(self.read(res))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(list(rows[0]), list(EXPORT_COLUMNS))
+        self.assertEqual(
+            rows[0],
+            {
+                "order_id": str(self.march.pk),
+                "order_created_at": "2025-03-01T12:00:00+00:00",
+                "user_id": str(self.user.pk),
+                "user_email": "buyer@test.com",
+                "ticket_id": str(self.march.tickets.get(seat=1).pk),
+                "journey_id": str(self.march.tickets.get(seat=1).journey_id),
+                "cargo": "1",
+                "seat": "1",
+                "route": "Sample source - Sample destination",
+                "departure_time": "2025-02-26T10:00:00+00:00",
+                "arrival_time": "2025-02-26T18:00:00+00:00",
+                "train": "Sample train",
+                "train_type": "Sample type",
+            },
+        )
+        self.assertEqual(rows[2]["order_id"], str(self.april.pk))
+
+    def test_ndjson_export_with_date_range(self):
+        res = self.client.get(
+            EXPORT_URL,
+            {"output": "ndjson", "created_from": "2025-03-15", "created_to": "2025-04-01"},
+        )
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in self.read(res).splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["order_id"], self.april.pk)
+        self.assertEqual(records[0]["seat"], 3)
+
+    def test_invalid_parameters(self):
+        res = self.client.get(EXPORT_URL, {"output": "xml"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(EXPORT_URL, {"created_from": "March"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_is_admin_only(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.get(EXPORT_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command(
+            "export_orders", output="ndjson", created_to="2025-03-01", stdout=out
+        )
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([record["seat"] for record in records], [1, 2])
+
+        with self.assertRaisesMessage(CommandError, "--created-from"):
+            call_command("export_orders", created_from="soon", stdout=StringIO())
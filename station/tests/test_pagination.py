@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.models import Journey, Order, Route, Station, Train, TrainType
+from station.pagination import KeysetPagination, OrderPagination
+
+ORDER_URL = reverse("station:order-list")
+JOURNEY_URL = reverse("station:journey-list")
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "pages@test.com", "samplepass4334"
+        )
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, params, link="next"):
+        ids = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(item["id"] for item in res.data["results"])
+            if not res.data[link]:
+                return ids, res
+            res = self.client.get(res.data[link])
+
+    def test_orders_walk_forward_and_back(self):
+        created_at = timezone.now()
+        orders = [Order.objects.create(user=self.user) for _ in range(7)]
+        # Several orders share a timestamp, so ties are broken by id.
+        for index, order in enumerate(orders):
+            order.created_at = created_at - timedelta(minutes=index // 3)
+        Order.objects.bulk_update(orders, ["created_at"])
+        Order.objects.create(
+            user=get_user_model().objects.create_user("other@test.com", "pass")
+        )
+        expected = [
+            order.id
+            for order in sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)
+        ]
+
+        ids, last_page = self.walk(ORDER_URL, {"page_size": 3})
+        self.assertEqual(ids, expected)
+        self.assertIsNone(last_page.data["next"])
+
+        res = self.client.get(last_page.data["previous"])
+        self.assertEqual([item["id"] for item in res.data["results"]], expected[3:6])
+
+    def test_journeys_are_paginated_by_departure(self):
+        station = Station.objects.create(name="A", latitude=1, longitude=1)
+        route = Route.objects.create(source=station, destination=station, distance=1)
+        train = Train.objects.create(
+            name="T",
+            train_type=TrainType.objects.create(name="T"),
+            cargo_num=1,
+            places_in_cargo=1,
+        )
+        departures = [datetime(2025, 3, day, 10) for day in (5, 1, 3, 2, 4)]
+        journeys = [
+            Journey.objects.create(
+                route=route,
+                train=train,
+                departure_time=departure,
+                arrival_time=departure + timedelta(hours=1),
+            )
+            for departure in departures
+        ]
+        expected = [
+            journey.id for journey in sorted(journeys, key=lambda j: j.departure_time)
+        ]
+
+        ids, _ = self.walk(JOURNEY_URL, {"page_size": 2})
+        self.assertEqual(ids, expected)
+
+    def test_keyset_filter_is_a_row_comparison(self):
+        position = [timezone.now(), 5]
+        sql = str(
+            Order.objects.filter(OrderPagination().keyset_filter(position)).query
+        )
+        self.assertIn('("station_order"."created_at", "station_order"."id") <', sql)
+
+    def test_mixed_directions_are_bounded_on_the_first_field(self):
+        class MixedPagination(KeysetPagination):
+            ordering = ("-created_at", "id")
+
+        created_at = timezone.now()
+        orders = [Order.objects.create(user=self.user) for _ in range(6)]
+        for index, order in enumerate(orders):
+            order.created_at = created_at - timedelta(minutes=index // 2)
+        Order.objects.bulk_update(orders, ["created_at"])
+        pagination = MixedPagination()
+        position = pagination.get_position(orders[2])
+
+        after = Order.objects.filter(pagination.keyset_filter(position))
+        self.assertEqual(
+            sorted(order.pk for order in after),
+            [order.pk for order in orders[3:]],
+        )
+        self.assertIn('"station_order"."created_at" <=', str(after.query))
+
+    def test_invalid_cursor(self):
+        res = self.client.get(ORDER_URL, {"cursor": "not-a-cursor"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,21 @@
+import importlib
+from django.test import SimpleTestCase
+
+
+class ProductionSettingsTest(SimpleTestCase):
+    def test_debug_tooling_is_disabled(self):
+        production = importlib.import_module("train_station.settings_production")
+
+        self.assertFalse(production.DEBUG)
+        self.assertNotIn("debug_toolbar", production.INSTALLED_APPS)
+        self.assertFalse(
+            [m for m in production.MIDDLEWARE if m.startswith("debug_toolbar.")]
+        )
+
+    def test_database_connections_are_reused(self):
+        production = importlib.import_module("train_station.settings_production")
+        database = production.DATABASES["default"]
+
+        self.assertGreater(database["CONN_MAX_AGE"], 0)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertNotIn("locmem", production.CACHES["default"]["BACKEND"])
@@ -0,0 +1,200 @@
+from datetime import datetime, timedelta
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from station.models import (
+    Crew,
+    Journey,
+    Order,
+    Route,
+    SeatHold,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.cache import flush_cache_lookups
+from station.testing import QueryBudgetMixin, sample_journey
+from station.urls import router
+
+# Maximum number of queries per GET endpoint. Every GET route of the
+# router must be listed here (see test_every_router_endpoint_has_a_budget).
+QUERY_BUDGETS = {
+    "station:crew-list": 1,
+    "station:station-list": 1,
+    "station:station-nearby": 2,
+    "station:route-list": 1,
+    "station:route-detail": 1,
+    "station:traintype-list": 1,
+    "station:train-list": 1,
+    "station:train-detail": 1,
+    "station:order-list": 2,
+    "station:order-export": 1,
+    "station:journey-list": 2,
+    "station:journey-detail": 2,
+    "station:journey-plan": 4,
+    "station:journey-seat-map": 1,
+    "station:seathold-list": 1,
+    "station:cache-stats-list": 0,
+    "station:occupancy-list": 1,
+    "station:async-journey-list": 2,
+    "station:async-journey-detail": 2,
+    "station:async-route-list": 1,
+    "station:async-order-list": 2,
+}
+
+# How to call the endpoints that need arguments; ``context`` is what
+# build_dataset() returned.
+URL_ARGS = {
+    "station:route-detail": lambda context: [context["route"].pk],
+    "station:train-detail": lambda context: [context["train"].pk],
+    "station:journey-detail": lambda context: [context["journey"].pk],
+    "station:journey-seat-map": lambda context: [context["journey"].pk],
+    "station:async-journey-detail": lambda context: [context["journey"].pk],
+}
+PARAMS = {
+    "station:station-nearby": lambda context: {"lat": 50.4, "lon": 30.5, "k": 50},
+    "station:journey-plan": lambda context: {
+        "source": context["route"].source_id,
+        "destination": context["route"].destination_id,
+        "departure": "2025-01-01T00:00",
+    },
+}
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            "budget@test.com", "samplepass4334"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def build_dataset(self, size):
+        crew = Crew.objects.bulk_create(
+            Crew(first_name="Crew", last_name=str(number)) for number in range(2)
+        )
+        for number in range(size):
+            source = Station.objects.create(
+                name=f"Source {number}", latitude=50.4 + number, longitude=30.5
+            )
+            destination = Station.objects.create(
+                name=f"Destination {number}", latitude=49.8, longitude=24 + number
+            )
+            route = Route.objects.create(
+                source=source, destination=destination, distance=540
+            )
+            train = Train.objects.create(
+                name=f"Train {number}",
+                train_type=TrainType.objects.create(name=f"Type {number}"),
+                cargo_num=2,
+                places_in_cargo=10,
+            )
+            journey = Journey.objects.create(
+                route=route,
+                train=train,
+                departure_time=datetime(2025, 3, 1, 10) + timedelta(days=number),
+                arrival_time=datetime(2025, 3, 1, 18) + timedelta(days=number),
+            )
+            journey.crew.set(crew)
+            order = Order.objects.create(user=self.user)
+            for seat in (1, 2):
+                Ticket.objects.create(journey=journey, order=order, cargo=1, seat=seat)
+            SeatHold.objects.create(
+                journey=journey,
+                user=self.user,
+                cargo=2,
+                seat=1,
+                expires_at=timezone.now() + timedelta(minutes=5),
+            )
+        return {"route": route, "train": train, "journey": journey}
+
+    def request_for(self, name):
+        def request(context):
+            args = URL_ARGS.get(name, lambda context: [])(context)
+            params = PARAMS.get(name, lambda context: {})(context)
+            response = self.client.get(reverse(name, args=args), params)
+            if response.streaming:
+                # Streaming responses query while the body is read.
+                b"".join(response.streaming_content)
+            return response
+
+        return request
+
+    def test_query_budgets(self):
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(name):
+                self.assertQueryBudget(name, budget, self.request_for(name))
+
+    def test_every_router_endpoint_has_a_budget(self):
+        names = {
+            f"station:{pattern.name}"
+            for pattern in router.urls
+            if "get" in getattr(pattern.callback, "actions", {})
+        }
+        self.assertFalse(names - set(QUERY_BUDGETS))
+
+    def test_build_dataset_is_required(self):
+        with self.assertRaisesMessage(TypeError, "build_dataset"):
+
+            class NoDataset(QueryBudgetMixin, TestCase):
+                pass
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        }
+    }
+)
+class DatabaseCacheQueryBudgetTest(TransactionTestCase):
+    """Cached endpoints on the production cache backend.
+
+    Outside a test transaction, so responses are served from the cache: a
+    hit must cost no more queries than the endpoint's own budget.
+    """
+
+    def setUp(self):
+        call_command("createcachetable", verbosity=0)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "cache-budget@test.com", "samplepass4334"
+            )
+        )
+        journey = sample_journey()
+        journey.crew.add(Crew.objects.create(first_name="Crew", last_name="1"))
+        self.urls = {
+            "station:crew-list": reverse("station:crew-list"),
+            "station:station-list": reverse("station:station-list"),
+            "station:route-list": reverse("station:route-list"),
+            "station:route-detail": reverse(
+                "station:route-detail", args=[journey.route_id]
+            ),
+            "station:traintype-list": reverse("station:traintype-list"),
+            "station:train-list": reverse("station:train-list"),
+            "station:train-detail": reverse(
+                "station:train-detail", args=[journey.train_id]
+            ),
+        }
+        flush_cache_lookups()
+
+    def test_cache_hits_stay_within_budget(self):
+        for name, url in self.urls.items():
+            with self.subTest(name):
+                self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response["X-Cache"], "HIT")
+                listing = "\n".join(query["sql"] for query in queries)
+                # Plus the throttle counter upsert.
+                self.assertLessEqual(
+                    len(queries), QUERY_BUDGETS[name] + 1, listing
+                )
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from station.models import Crew, Order, Ticket
+from station.read_serializers import (
+    JourneyListValuesSerializer,
+    OrderListValuesSerializer,
+    ValuesSerializer,
+)
+from station.serializers import JourneyListSerializer, OrderListSerializer
+from station.testing import sample_journey, sample_route, sample_train
+from station.views import JourneyViewSet, OrderViewSet
+
+JOURNEY_URL = reverse("station:journey-list")
+ORDER_URL = reverse("station:order-list")
+
+
+class ValuesSerializerParityTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "reader@test.com", "samplepass4334"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        route, train = sample_route(), sample_train()
+        crew = Crew.objects.bulk_create(
+            Crew(first_name="Crew", last_name=str(number)) for number in range(3)
+        )
+        start = datetime(2025, 2, 26, 10, 15, 30, 123456, tzinfo=dt_timezone.utc)
+        self.journeys = []
+        for number in range(6):
+            journey = sample_journey(
+                route=route, train=train, departure_time=start + timedelta(hours=number)
+            )
+            # Includes a journey without crew.
+            journey.crew.set(crew[: number % 4])
+            self.journeys.append(journey)
+        for number, journey in enumerate(self.journeys[:4]):
+            order = Order.objects.create(user=self.user)
+            Ticket.objects.bulk_create(
+                Ticket(order=order, journey=journey, cargo=1, seat=seat)
+                for seat in range(1, number + 2)
+            )
+            journey.seats_sold = number + 1
+            journey.save()
+        # Orders of other users are never listed.
+        other = get_user_model().objects.create_user("other@test.com", "pass4334")
+        Ticket.objects.create(
+            order=Order.objects.create(user=other),
+            journey=self.journeys[0],
+            cargo=2,
+            seat=1,
+        )
+
+    def test_journey_list_matches_model_serializer(self):
+        queryset = JourneyViewSet.queryset.order_by("departure_time", "id")
+        serializer = JourneyListValuesSerializer()
+
+        self.assertEqual(
+            serializer.serialize(serializer.get_queryset(queryset)),
+            JourneyListSerializer(queryset, many=True).data,
+        )
+
+    def test_order_list_matches_model_serializer(self):
+        queryset = OrderViewSet.queryset.filter(user=self.user).order_by("-id")
+        serializer = OrderListValuesSerializer()
+
+        self.assertEqual(
+            serializer.serialize(serializer.get_queryset(queryset)),
+            OrderListSerializer(queryset, many=True).data,
+        )
+
+    def test_list_endpoints_paginate_values_rows(self):
+        res = self.client.get(JOURNEY_URL, {"page_size": 4})
+        expected = JourneyListSerializer(
+            JourneyViewSet.queryset.order_by("departure_time", "id")[:4], many=True
+        ).data
+        self.assertEqual(res.json()["results"], expected)
+
+        res = self.client.get(res.json()["next"])
+        self.assertEqual(
+            [journey["id"] for journey in res.json()["results"]],
+            [journey.pk for journey in self.journeys[4:]],
+        )
+
+        res = self.client.get(ORDER_URL, {"page_size": 3})
+        self.assertEqual(len(res.json()["results"]), 3)
+        res = self.client.get(res.json()["next"])
+        self.assertEqual(
+            res.json()["results"],
+            OrderListSerializer(
+                Order.objects.filter(user=self.user).order_by("created_at")[:1],
+                many=True,
+            ).data,
+        )
+
+    def test_subclass_must_define_row_methods(self):
+        with self.assertRaisesMessage(TypeError, "to_representation"):
+
+            class NoRepresentation(ValuesSerializer):
+                def get_queryset(self, queryset):
+                    return queryset.values()
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from station.cache import flush_cache_lookups
+from station.models import Route, Station, Train, TrainType
+
+STATION_URL = reverse("station:station-list")
+ROUTE_URL = reverse("station:route-list")
+TRAIN_URL = reverse("station:train-list")
+STATS_URL = reverse("station:cache-stats-list")
+
+
+class ResponseCacheTest(TransactionTestCase):
+    def setUp(self):
+        # Lookups other tests counted in this process go before the clear.
+        flush_cache_lookups()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("cache@test.com", "pass4334")
+        )
+        self.kyiv = Station.objects.create(name="Kyiv", latitude=50.45, longitude=30.52)
+
+    def test_list_is_served_from_cache_until_model_changes(self):
+        res = self.client.get(STATION_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+        res = self.client.get(STATION_URL)
+        self.assertEqual(res["X-Cache"], "HIT")
+        self.assertEqual([s["name"] for s in res.data], ["Kyiv"])
+
+        Station.objects.create(name="Lviv", latitude=49.84, longitude=24.03)
+        res = self.client.get(STATION_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(len(res.data), 2)
+
+    def test_related_model_change_invalidates(self):
+        Route.objects.create(source=self.kyiv, destination=self.kyiv, distance=1)
+        self.client.get(ROUTE_URL)
+        self.assertEqual(self.client.get(ROUTE_URL)["X-Cache"], "HIT")
+
+        self.kyiv.name = "Kyiv-Pasazhyrskyi"
+        self.kyiv.save()
+        res = self.client.get(ROUTE_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data[0]["source"], "Kyiv-Pasazhyrskyi")
+
+    def test_detail_and_stats(self):
+        train = Train.objects.create(
+            name="Intercity",
+            train_type=TrainType.objects.create(name="Fast"),
+            cargo_num=1,
+            places_in_cargo=1,
+        )
+        url = reverse("station:train-detail", args=[train.id])
+        self.client.get(url)
+        self.client.get(url)
+        self.client.get(TRAIN_URL)
+
+        stats = self.client.get(STATS_URL).data
+        self.assertEqual(stats["TrainViewSet"], {"hits": 1, "misses": 2})
+        self.assertEqual(stats["StationViewSet"], {"hits": 0, "misses": 0})
+
+
+class ResponseCacheInTransactionTest(TestCase):
+    def test_cache_is_bypassed_inside_transactions(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("tx@test.com", "pass4334")
+        )
+        res = client.get(STATION_URL)
+        self.assertNotIn("X-Cache", res)
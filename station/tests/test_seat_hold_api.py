@@ -0,0 +1,95 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.models import SeatHold
+from station.testing import sample_journey
+
+SEAT_HOLD_URL = reverse("station:seathold-list")
+ORDER_URL = reverse("station:order-list")
+
+
+class SeatHoldApiTest(TestCase):
+    def setUp(self):
+        self.journey = sample_journey(cargo_num=2)
+        self.user = get_user_model().objects.create_user("hold@test.com", "pass4334")
+        self.other = get_user_model().objects.create_user("other@test.com", "pass4334")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.other_client = APIClient()
+        self.other_client.force_authenticate(self.other)
+
+    def hold(self, client, *seats, **extra):
+        payload = {
+            "journey": self.journey.id,
+            "seats": [{"cargo": cargo, "seat": seat} for cargo, seat in seats],
+        }
+        payload.update(extra)
+        return client.post(SEAT_HOLD_URL, payload, format="json")
+
+    def order(self, client, *seats):
+        payload = {
+            "tickets": [
+                {"journey": self.journey.id, "cargo": cargo, "seat": seat}
+                for cargo, seat in seats
+            ]
+        }
+        return client.post(ORDER_URL, payload, format="json")
+
+    def test_hold_seats(self):
+        res = self.hold(self.client, (1, 1), (1, 2), minutes=5)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        hold = SeatHold.objects.get(cargo=1, seat=1)
+        self.assertAlmostEqual(
+            hold.expires_at, timezone.now() + timedelta(minutes=5),
+            delta=timedelta(seconds=10),
+        )
+        self.assertEqual(len(self.client.get(SEAT_HOLD_URL).data), 2)
+
+    def test_seat_held_by_other_user_cannot_be_held_or_ordered(self):
+        self.hold(self.client, (1, 1))
+        res = self.hold(self.other_client, (1, 1))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.order(self.other_client, (1, 1))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"][0]["non_field_errors"][0],
+            "This seat is held by another customer.",
+        )
+
+    def test_order_converts_own_hold(self):
+        self.hold(self.client, (1, 1), (1, 2))
+        res = self.order(self.client, (1, 1))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(SeatHold.objects.values_list("cargo", "seat")), [(1, 2)]
+        )
+
+    def test_sold_seat_cannot_be_held(self):
+        self.order(self.other_client, (2, 5))
+        res = self.hold(self.client, (2, 4), (2, 5))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["seats"][0], {})
+        self.assertIn("non_field_errors", res.data["seats"][1])
+
+    def test_expired_hold_is_replaced_lazily_and_swept(self):
+        self.hold(self.client, (1, 1), (1, 2))
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        res = self.hold(self.other_client, (1, 1))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.get(SEAT_HOLD_URL).data, [])
+
+        out = StringIO()
+        call_command("sweep_expired", batch_size=1, stdout=out)
+        self.assertIn(
+            "Deleted 1 expired seat holds and 0 throttle counters.", out.getvalue()
+        )
+        self.assertEqual(SeatHold.objects.get().user, self.other)
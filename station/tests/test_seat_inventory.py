@@ -0,0 +1,220 @@
+import base64
+import threading
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from station.inventory import record_sold_tickets
+from station.models import Journey, Order, Ticket, Train
+from station.seat_map import SeatMap, set_seat_bits
+from station.testing import sample_journey
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+class SeatInventoryTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "inventory@test.com", "samplepass4334"
+        )
+        self.journey = sample_journey(cargo_num=2)
+        self.order = Order.objects.create(user=self.user)
+
+    def sell(self, cargo, seat):
+        return Ticket.objects.create(
+            journey=self.journey, order=self.order, cargo=cargo, seat=seat
+        )
+
+    def test_ticket_writes_update_counter(self):
+        ticket = self.sell(1, 1)
+        self.sell(1, 2)
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 2)
+        self.assertEqual(self.journey.tickets_available, 18)
+
+        ticket.delete()
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 1)
+
+    def test_order_cancellation_releases_seats(self):
+        self.sell(1, 1)
+        self.sell(2, 1)
+        self.order.delete()
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 0)
+
+    def test_journey_edit_keeps_concurrent_sale(self):
+        journey = Journey.objects.get(pk=self.journey.pk)
+        self.sell(1, 4)
+        journey.arrival_time = datetime(2025, 2, 26, 19)
+        journey.save()
+
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 1)
+        self.assertTrue(self.journey.get_seat_map().is_taken(1, 4))
+        self.assertEqual(journey.seats_sold, 1)
+
+    def test_train_save_reads_the_old_row_once(self):
+        self.sell(1, 1)
+        train = Train.objects.get(pk=self.journey.train_id)
+        train.places_in_cargo = 12
+        with CaptureQueriesContext(connection) as queries:
+            train.save()
+
+        reads = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "station_train" WHERE' in query["sql"]
+        ]
+        self.assertEqual(len(reads), 1, reads)
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.tickets_available, 23)
+        self.assertTrue(self.journey.get_seat_map().is_taken(1, 1))
+
+    def test_moving_journey_to_another_layout_rebuilds_seat_map(self):
+        self.sell(2, 1)
+        self.sell(1, 7)
+        # Same byte size as the 2x10 train, different layout.
+        train = Train.objects.create(
+            name="Short cars",
+            train_type=self.journey.train.train_type,
+            cargo_num=4,
+            places_in_cargo=5,
+        )
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_superuser("admin@test.com", "pass4334")
+        )
+
+        res = client.patch(
+            reverse("station:journey-detail", args=[self.journey.pk]),
+            {"train": train.pk},
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.journey.refresh_from_db()
+        seat_map = self.journey.get_seat_map()
+        self.assertTrue(seat_map.is_taken(2, 1))
+        self.assertEqual(seat_map.taken_count(), 1)
+        self.assertEqual(self.journey.seats_sold, 2)
+
+    def test_journey_list_reads_stored_counter(self):
+        self.sell(1, 1)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        res = client.get(JOURNEY_URL)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 19)
+
+    def test_ticket_writes_update_seat_map(self):
+        ticket = self.sell(1, 3)
+        self.sell(2, 10)
+        self.journey.refresh_from_db()
+        seat_map = self.journey.get_seat_map()
+        self.assertTrue(seat_map.is_taken(1, 3))
+        self.assertTrue(seat_map.is_taken(2, 10))
+        self.assertEqual(seat_map.taken_count(), 2)
+
+        ticket.delete()
+        self.journey.refresh_from_db()
+        self.assertFalse(self.journey.get_seat_map().is_taken(1, 3))
+
+    def test_seat_map_endpoint(self):
+        self.sell(1, 1)
+        self.sell(1, 2)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse("station:journey-seat-map", args=[self.journey.id])
+
+        res = client.get(url)
+        self.assertEqual(res.data["encoding"], "bitmap")
+        self.assertEqual(base64.b64decode(res.data["data"]), b"\x03\x00\x00")
+
+        res = client.get(url, {"encoding": "rle"})
+        self.assertEqual(base64.b64decode(res.data["data"]), bytes([0, 2, 18]))
+
+    def test_journey_detail_reads_taken_seats_from_seat_map(self):
+        self.sell(2, 10)
+        self.sell(1, 3)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with self.assertNumQueries(3):
+            res = client.get(reverse("station:journey-detail", args=[self.journey.id]))
+        self.assertEqual(
+            res.data["taken_seats"], [{"cargo": 1, "seat": 3}, {"cargo": 2, "seat": 10}]
+        )
+
+    def test_rle_encoding_of_long_runs(self):
+        seat_map = SeatMap(3, 100)
+        seat_map.take(3, 100)
+        self.assertEqual(seat_map.to_rle(), bytes([0xAB, 0x02, 1]))
+
+    def test_repair_command_fixes_drift(self):
+        self.sell(1, 1)
+        Journey.objects.filter(pk=self.journey.pk).update(
+            seats_sold=7, seat_map=b"\xff"
+        )
+        out = StringIO()
+        call_command("repair_seat_inventory", stdout=out)
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 1)
+        self.assertEqual(self.journey.get_seat_map().to_bytes(), b"\x01\x00\x00")
+        self.assertIn("Repaired 1 journeys.", out.getvalue())
+
+
+class ConcurrentOrdersTest(TransactionTestCase):
+    def test_orders_naming_journeys_in_opposite_order(self):
+        user = get_user_model().objects.create_user("race@test.com", "pass4334")
+        first = sample_journey("First")
+        second = sample_journey("Second")
+        # Hold each order after its first journey update until the other
+        # has made its own, which deadlocks if they lock in ticket order.
+        both_started = threading.Barrier(2, timeout=2)
+        updates = threading.local()
+
+        def wait_for_other(*args):
+            updates.count = getattr(updates, "count", 0) + 1
+            if updates.count == 2:
+                try:
+                    both_started.wait()
+                except threading.BrokenBarrierError:
+                    pass
+            return set_seat_bits(*args)
+
+        errors = []
+
+        def order(journeys):
+            try:
+                with transaction.atomic():
+                    order = Order.objects.create(user=user)
+                    tickets = Ticket.objects.bulk_create(
+                        Ticket(journey=journey, order=order, cargo=1, seat=seat)
+                        for seat, journey in enumerate(journeys, start=1)
+                    )
+                    record_sold_tickets(tickets)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        with mock.patch("station.inventory.set_seat_bits", wait_for_other):
+            threads = [
+                threading.Thread(target=order, args=(journeys,))
+                for journeys in ([first, second], [second, first])
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=20)
+
+        self.assertEqual(errors, [])
+        for journey in (first, second):
+            journey.refresh_from_db()
+            self.assertEqual(journey.seats_sold, 2)
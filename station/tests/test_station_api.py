@@ -101,8 +101,8 @@ class AuthenticatedStationApiTest(TestCase):
         )
         serializer1 = JourneyListSerializer(journey1)
         serializer2 = JourneyListSerializer(journey2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
     
     def test_create_train_forbidden(self):
         train_type = TrainType.objects.create(
@@ -0,0 +1,82 @@
+import math
+import random
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.geo import EARTH_RADIUS_KM, StationIndex, snap_to_station
+from station.models import Station
+
+NEARBY_URL = reverse("station:station-nearby")
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class StationIndexTest(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.points = [
+            (index, rng.uniform(-80, 80), rng.uniform(-180, 180))
+            for index in range(500)
+        ]
+        self.index = StationIndex(self.points)
+
+    def brute_force(self, lat, lon):
+        return sorted(
+            (haversine(lat, lon, p_lat, p_lon), station_id)
+            for station_id, p_lat, p_lon in self.points
+        )
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lon in ((50.45, 30.52), (-33.9, 151.2), (0, 179.9)):
+            expected = self.brute_force(lat, lon)[:5]
+            found = self.index.nearest(lat, lon, k=5)
+            self.assertEqual([s for s, _ in found], [s for _, s in expected])
+            for (_, distance), (expected_distance, _) in zip(found, expected):
+                self.assertAlmostEqual(distance, expected_distance, places=6)
+
+    def test_within_matches_brute_force(self):
+        expected = [s for d, s in self.brute_force(10, 20) if d <= 2000]
+        found = self.index.within(10, 20, 2000)
+        self.assertEqual([s for s, _ in found], expected)
+
+
+class StationNearbyApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("nearby@test.com", "pass4334")
+        )
+        self.kyiv = Station.objects.create(name="Kyiv", latitude=50.45, longitude=30.52)
+        self.lviv = Station.objects.create(name="Lviv", latitude=49.84, longitude=24.03)
+        self.odesa = Station.objects.create(
+            name="Odesa", latitude=46.48, longitude=30.72
+        )
+
+    def test_k_nearest(self):
+        res = self.client.get(NEARBY_URL, {"lat": 50.0, "lon": 30.0, "k": 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([s["name"] for s in res.data], ["Kyiv", "Odesa"])
+        self.assertAlmostEqual(res.data[0]["distance"], 62.2, delta=0.1)
+
+    def test_radius(self):
+        res = self.client.get(NEARBY_URL, {"lat": 50.45, "lon": 30.52, "radius": 450})
+        self.assertEqual([s["name"] for s in res.data], ["Kyiv", "Odesa"])
+
+    def test_index_follows_station_changes(self):
+        self.assertEqual(snap_to_station(49.9, 24.1)[0], self.lviv.id)
+        self.lviv.delete()
+        self.assertEqual(snap_to_station(49.9, 24.1)[0], self.kyiv.id)
+        self.assertIsNone(snap_to_station(49.9, 24.1, max_distance_km=10))
+
+    def test_invalid_coordinates(self):
+        res = self.client.get(NEARBY_URL, {"lat": 120, "lon": 30})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,166 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from station.models import Task
+from station.tasks import (
+    claim_tasks,
+    enqueue,
+    enqueue_on_commit,
+    run_batch,
+    run_task,
+    run_worker,
+)
+
+CALLS = []
+STARTED = threading.Semaphore(0)
+RELEASE = threading.Event()
+
+
+def record_call(*args, **kwargs):
+    CALLS.append((args, kwargs))
+
+
+def fail():
+    raise RuntimeError("boom")
+
+
+def block():
+    STARTED.release()
+    RELEASE.wait(10)
+
+
+@override_settings(TASK_RETRY_DELAY=10, TASK_RETRY_MAX_DELAY=30)
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_on_commit_and_run(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            enqueue_on_commit(record_call, (1, "two"), {"three": 3})
+            self.assertFalse(Task.objects.exists())
+        callbacks[0]()
+        task = Task.objects.get()
+        self.assertEqual(task.name, f"{__name__}.record_call")
+
+        self.assertEqual(run_batch(), 1)
+        self.assertEqual(CALLS, [((1, "two"), {"three": 3})])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failures_are_retried_with_backoff(self):
+        task = enqueue(fail, max_attempts=3)
+
+        delays = []
+        for _ in range(3):
+            Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+            before = timezone.now()
+            with self.assertLogs("station.tasks", "ERROR"):
+                self.assertEqual(run_batch(), 1)
+            task.refresh_from_db()
+            delays.append(round((task.run_at - before).total_seconds()))
+
+        self.assertEqual(delays[:2], [10, 20])
+        self.assertEqual(task.status, Task.Status.FAILED)
+        self.assertEqual(task.attempts, 3)
+        self.assertIn("RuntimeError: boom", task.last_error)
+        self.assertEqual(run_batch(), 0)
+
+    def test_claim_order_delay_and_expired_lease(self):
+        later = enqueue(record_call, delay=timedelta(minutes=5))
+        first, second = enqueue(record_call, (1,)), enqueue(record_call, (2,))
+
+        claimed = claim_tasks(1)
+        self.assertEqual([task.pk for task in claimed], [first.pk])
+        self.assertEqual(claimed[0].attempts, 1)
+        self.assertEqual([task.pk for task in claim_tasks(5)], [second.pk])
+        self.assertEqual(claim_tasks(5), [])
+
+        Task.objects.filter(pk=first.pk).update(locked_until=timezone.now())
+        self.assertEqual([task.pk for task in claim_tasks(5)], [first.pk])
+        self.assertNotIn(later.pk, [task.pk for task in claim_tasks(5)])
+
+    def test_expired_claim_leaves_task_to_new_claim(self):
+        task = enqueue(record_call)
+        stale = claim_tasks(1)[0]
+        Task.objects.filter(pk=task.pk).update(locked_until=timezone.now())
+        current = claim_tasks(1)[0]
+
+        with self.assertLogs("station.tasks", "WARNING"):
+            self.assertTrue(run_task(stale))
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.Status.RUNNING)
+        self.assertEqual(task.locked_until, current.locked_until)
+
+        stale.name = f"{__name__}.fail"
+        with self.assertLogs("station.tasks", "WARNING"):
+            self.assertFalse(run_task(stale))
+        task.refresh_from_db()
+        self.assertEqual(task.last_error, "")
+
+        self.assertTrue(run_task(current))
+        self.assertFalse(Task.objects.exists())
+
+    def test_command(self):
+        for number in range(5):
+            enqueue(record_call, (number,))
+
+        out = StringIO()
+        call_command("run_tasks", "--once", "--concurrency", "1", stdout=out)
+
+        self.assertIn("Ran 5 tasks.", out.getvalue())
+        self.assertEqual(sorted(args for args, _ in CALLS), [(n,) for n in range(5)])
+
+
+class SkipLockedTest(TransactionTestCase):
+    def test_workers_skip_rows_claimed_by_others(self):
+        first, second = enqueue(record_call), enqueue(record_call)
+        claimed = []
+
+        def other_worker():
+            try:
+                claimed.extend(claim_tasks(5))
+            finally:
+                connection.close()
+
+        with transaction.atomic():
+            Task.objects.select_for_update().get(pk=first.pk)
+            thread = threading.Thread(target=other_worker)
+            thread.start()
+            thread.join(timeout=10)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([task.pk for task in claimed], [second.pk])
+
+
+class WorkerPoolTest(TransactionTestCase):
+    def test_tasks_are_claimed_for_idle_threads_only(self):
+        RELEASE.clear()
+        enqueue(block), enqueue(block)
+        waiting = enqueue(record_call)
+        ran = []
+
+        def worker():
+            try:
+                ran.append(run_worker(2, poll_interval=0.05, once=True))
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        try:
+            for _ in range(2):
+                self.assertTrue(STARTED.acquire(timeout=10))
+            # Both threads are busy, so the third task is still queued
+            # rather than claimed and left waiting on its lease.
+            waiting.refresh_from_db()
+            self.assertEqual(waiting.status, Task.Status.QUEUED)
+        finally:
+            RELEASE.set()
+            thread.join(timeout=10)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(ran, [3])
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,92 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.models import ThrottleCounter
+from station.throttling import UserRateThrottle
+
+CREW_URL = reverse("station:crew-list")
+
+
+class SlidingWindowThrottleTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "throttle@test.com", "samplepass4334"
+        )
+        self.client.force_authenticate(self.user)
+        self.now = 6000.0
+        patches = [
+            mock.patch.object(UserRateThrottle, "THROTTLE_RATES", {"user": "3/min"}),
+            mock.patch.object(UserRateThrottle, "timer", lambda throttle: self.now),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def request(self):
+        return self.client.get(CREW_URL).status_code
+
+    def test_limit_is_enforced(self):
+        self.assertEqual(
+            [self.request() for _ in range(4)],
+            [200, 200, 200, status.HTTP_429_TOO_MANY_REQUESTS],
+        )
+        res = self.client.get(CREW_URL)
+        # The 3 hits still count as 2 a third into the next window.
+        self.assertEqual(res["Retry-After"], "80")
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(3):
+            self.request()
+
+        # Half way through the next window the 3 old hits count as 1.5.
+        self.now += 90
+        self.assertEqual(self.request(), status.HTTP_200_OK)
+        self.assertEqual(self.request(), status.HTTP_429_TOO_MANY_REQUESTS)
+
+        # The first window no longer counts at all.
+        self.now += 60
+        self.assertEqual(self.request(), status.HTTP_200_OK)
+
+    def test_retry_after_wait_is_allowed(self):
+        for _ in range(3):
+            self.request()
+        self.now += 30
+        self.assertEqual(self.request(), status.HTTP_429_TOO_MANY_REQUESTS)
+        self.now += float(self.client.get(CREW_URL)["Retry-After"])
+        self.assertEqual(self.request(), status.HTTP_200_OK)
+
+        # In the next window, 1 + 3 * (1 - elapsed / 60) stays above 2
+        # until 40 seconds in.
+        self.now = 6090.0
+        self.assertEqual(self.request(), status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.client.get(CREW_URL)["Retry-After"], "10")
+        self.now += 9
+        self.assertEqual(self.request(), status.HTTP_429_TOO_MANY_REQUESTS)
+        self.now += 1
+        self.assertEqual(self.request(), status.HTTP_200_OK)
+
+    def test_one_counter_row_per_window(self):
+        for _ in range(5):
+            self.request()
+
+        counter = ThrottleCounter.objects.get()
+        self.assertEqual(counter.key, f"throttle_user_{self.user.pk}")
+        # Rejected requests are not counted.
+        self.assertEqual(counter.hits, 3)
+
+    def test_sweep_deletes_expired_counters(self):
+        self.request()
+        ThrottleCounter.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        out = StringIO()
+        call_command("sweep_expired", stdout=out)
+        self.assertIn("1 throttle counters", out.getvalue())
+        self.assertFalse(ThrottleCounter.objects.exists())
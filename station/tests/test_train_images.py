@@ -0,0 +1,121 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+from station.models import Train, TrainType
+from station.tasks import run_batch
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def sample_image(size=(2000, 1000), name="train.png"):
+    buffer = io.BytesIO()
+    Image.new("RGBA", size, (200, 30, 30, 255)).save(buffer, "PNG")
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TrainImageVariantsTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("images@test.com", "pass4334")
+        )
+        self.train = Train.objects.create(
+            name="Hyundai Rotem",
+            train_type=TrainType.objects.create(name="Intercity"),
+            cargo_num=2,
+            places_in_cargo=10,
+        )
+
+    def upload(self, image):
+        url = reverse("station:train-upload-image", args=[self.train.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(url, {"image": image}, format="multipart")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(run_batch(), 1)
+        self.train.refresh_from_db()
+        return res
+
+    def test_image_is_stored_under_content_hash(self):
+        image = sample_image()
+        content_hash = hashlib.sha256(image.getvalue()).hexdigest()[:32]
+        self.upload(image)
+
+        self.assertEqual(
+            self.train.image.name,
+            f"uploads/trains/hyundai-rotem-{content_hash}.png",
+        )
+
+    def test_variants_are_generated(self):
+        self.upload(sample_image())
+
+        self.assertEqual(
+            set(self.train.image_variants),
+            {"thumbnail", "thumbnail_webp", "large_webp"},
+        )
+        stem, _ = os.path.splitext(self.train.image.name)
+        self.assertEqual(self.train.image_variants["thumbnail"], f"{stem}-thumbnail.jpg")
+        with default_storage.open(self.train.image_variants["thumbnail_webp"]) as file:
+            image = Image.open(file)
+            self.assertEqual((image.format, image.size), ("WEBP", (320, 160)))
+        with default_storage.open(self.train.image_variants["large_webp"]) as file:
+            self.assertEqual(Image.open(file).size, (1280, 640))
+
+    def test_variant_urls_are_exposed(self):
+        self.upload(sample_image())
+
+        res = self.client.get(reverse("station:train-detail", args=[self.train.id]))
+        self.assertTrue(
+            res.data["image_variants"]["thumbnail"].endswith("-thumbnail.jpg")
+        )
+        self.assertTrue(res.data["image_variants"]["thumbnail"].startswith("http"))
+
+    def test_new_upload_replaces_variants(self):
+        self.upload(sample_image())
+        first = self.train.image_variants
+
+        self.upload(sample_image(size=(100, 100)))
+        self.assertNotEqual(self.train.image_variants, first)
+        with default_storage.open(self.train.image_variants["large_webp"]) as file:
+            self.assertEqual(Image.open(file).size, (100, 100))
+        for name in first.values():
+            self.assertFalse(default_storage.exists(name), name)
+
+    def test_superseded_variants_are_deleted(self):
+        self.upload(sample_image())
+        first = self.train.image_variants
+        media_dir = os.path.dirname(self.train.image.path)
+        before = set(os.listdir(media_dir))
+        url = reverse("station:train-upload-image", args=[self.train.id])
+        for size in ((300, 300), (100, 100)):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    url, {"image": sample_image(size)}, format="multipart"
+                )
+        # The 300x300 task finds its image replaced and keeps nothing.
+        self.assertEqual(run_batch(), 2)
+        self.train.refresh_from_db()
+
+        added = set(os.listdir(media_dir)) - before
+        self.assertEqual(
+            {name for name in added if "-thumbnail." in name},
+            {os.path.basename(self.train.image_variants["thumbnail"])},
+        )
+        for name in first.values():
+            self.assertFalse(default_storage.exists(name), name)
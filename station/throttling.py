@@ -0,0 +1,55 @@
+from rest_framework import throttling
+
+from station.models import ThrottleCounter
+
+
+class SlidingWindowThrottleMixin:
+    """Sliding window rate limit on shared Postgres counters.
+
+    DRF's throttles keep a list of request timestamps per client in the
+    cache, which is per process with locmem and grows with the rate. This
+    keeps two fixed-window counters per client instead and estimates the
+    sliding window as ``current + previous * (1 - elapsed / duration)``;
+    a check is one atomic upsert whatever the rate or the worker count.
+    Rejected requests are not counted.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        allowed, self.current, self.previous, self.elapsed = (
+            ThrottleCounter.objects.hit(
+                self.key, self.timer(), self.duration, self.num_requests
+            )
+        )
+        return allowed
+
+    def wait(self):
+        """Seconds until ``previous * (1 - elapsed / duration) + current``
+        leaves room for one more request.
+        """
+        room = self.num_requests - 1
+        if room < 0:
+            return None
+        if self.current <= room:
+            if not self.previous:
+                return 0.0
+            # Later in this window, once the previous window weighs less.
+            excess = self.previous - (room - self.current)
+            return max(0.0, self.duration * excess / self.previous - self.elapsed)
+        # In the next window, where this window's hits are the previous.
+        excess = self.current - room
+        return self.duration - self.elapsed + self.duration * excess / self.current
+
+
+class AnonRateThrottle(SlidingWindowThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(SlidingWindowThrottleMixin, throttling.UserRateThrottle):
+    pass
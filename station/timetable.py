@@ -0,0 +1,413 @@
+import csv
+import itertools
+import os
+from collections import Counter, defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from station.cache import bump_versions, invalidate_now_and_on_commit
+from station.geo import great_circle_km, invalidate_station_index
+from station.models import Journey, Route, Station, Train
+from station.occupancy import occupancy_key, record_occupancy
+from station.planner import invalidate_connection_index
+
+StationRow = namedtuple("StationRow", "location name latitude longitude")
+JourneyRow = namedtuple(
+    "JourneyRow",
+    "location source destination train departure_time arrival_time distance",
+)
+
+
+class TimetableError(ValueError):
+    def __init__(self, location, message):
+        super().__init__(f"{location}: {message}")
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def read_csv(path, columns):
+    """Yield ``(location, record)`` for every row of a CSV file with a header."""
+    name = os.path.basename(path)
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        missing = set(columns) - set(reader.fieldnames or ())
+        if missing:
+            raise TimetableError(
+                name, f"missing column(s) {', '.join(sorted(missing))}"
+            )
+        for line, record in enumerate(reader, start=2):
+            yield f"{name} line {line}", record
+
+
+def parse_float(value, location, field):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise TimetableError(location, f"{field} {value!r} is not a number")
+
+
+class CsvTimetable:
+    """A journeys CSV, plus an optional CSV of stations to create.
+
+    journeys: ``source,destination,train,departure_time,arrival_time`` and an
+    optional ``distance`` (km) used when the route has to be created.
+    Datetimes are ISO 8601; naive ones are in the current time zone.
+    stations: ``name,latitude,longitude``.
+    """
+
+    def __init__(self, path, stations_path=None):
+        self.path = path
+        self.stations_path = stations_path
+
+    def stations(self, errors):
+        if self.stations_path is None:
+            return
+        columns = ("name", "latitude", "longitude")
+        for location, record in read_csv(self.stations_path, columns):
+            try:
+                yield StationRow(
+                    location,
+                    record["name"].strip(),
+                    parse_float(record["latitude"], location, "latitude"),
+                    parse_float(record["longitude"], location, "longitude"),
+                )
+            except TimetableError as error:
+                errors.append(error)
+
+    def parse_datetime(self, value, location, field):
+        try:
+            parsed = parse_datetime(value.strip())
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise TimetableError(location, f"{field} {value!r} is not a datetime")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def journeys(self, errors):
+        columns = (
+            "source",
+            "destination",
+            "train",
+            "departure_time",
+            "arrival_time",
+        )
+        for location, record in read_csv(self.path, columns):
+            try:
+                distance = (record.get("distance") or "").strip()
+                yield JourneyRow(
+                    location,
+                    record["source"].strip(),
+                    record["destination"].strip(),
+                    record["train"].strip(),
+                    self.parse_datetime(
+                        record["departure_time"], location, "departure_time"
+                    ),
+                    self.parse_datetime(
+                        record["arrival_time"], location, "arrival_time"
+                    ),
+                    round(parse_float(distance, location, "distance"))
+                    if distance
+                    else None,
+                )
+            except TimetableError as error:
+                errors.append(error)
+
+
+class GtfsTimetable:
+    """The stops, trips and stop times of a GTFS feed directory.
+
+    Every trip becomes one journey from its first to its last stop, on each
+    of ``service_dates`` (calendar.txt is not read). Stops are imported as
+    stations under their parent station's name; the train is the trip's
+    ``trip_short_name``, or its ``route_id`` if that is empty.
+    """
+
+    def __init__(self, directory, service_dates):
+        self.directory = directory
+        self.service_dates = service_dates
+        self._stops = None
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def load_stops(self, errors):
+        stops, parents = {}, {}
+        columns = ("stop_id", "stop_name", "stop_lat", "stop_lon")
+        for location, record in read_csv(self.path("stops.txt"), columns):
+            parent = (record.get("parent_station") or "").strip()
+            if parent:
+                parents[record["stop_id"]] = parent
+                continue
+            try:
+                stops[record["stop_id"]] = StationRow(
+                    location,
+                    record["stop_name"].strip(),
+                    parse_float(record["stop_lat"], location, "stop_lat"),
+                    parse_float(record["stop_lon"], location, "stop_lon"),
+                )
+            except TimetableError as error:
+                errors.append(error)
+        names = {stop_id: stop.name for stop_id, stop in stops.items()}
+        for stop_id, parent in parents.items():
+            if parent in names:
+                names[stop_id] = names[parent]
+        self._stops = stops, names
+
+    def stations(self, errors):
+        if self._stops is None:
+            self.load_stops(errors)
+        yield from self._stops[0].values()
+
+    def parse_time(self, value, location):
+        # GTFS times may pass 24:00:00 for trips running after midnight.
+        try:
+            hours, minutes, seconds = map(int, value.strip().split(":"))
+        except ValueError:
+            raise TimetableError(location, f"time {value!r} is not HH:MM:SS")
+        return timedelta(hours=hours, minutes=minutes, seconds=seconds)
+
+    def trip_ends(self, errors):
+        """Map trip_id to its first departure and last arrival, streaming."""
+        ends = {}
+        columns = (
+            "trip_id",
+            "arrival_time",
+            "departure_time",
+            "stop_id",
+            "stop_sequence",
+        )
+        for location, record in read_csv(self.path("stop_times.txt"), columns):
+            trip_id, stop_id = record["trip_id"], record["stop_id"]
+            # Either time may be empty on a stop; the other one is used.
+            departure = record["departure_time"] or record["arrival_time"]
+            arrival = record["arrival_time"] or record["departure_time"]
+            end = ends.get(trip_id)
+            try:
+                sequence = int(record["stop_sequence"])
+                if end is None or sequence < end[0]:
+                    first = (sequence, stop_id, self.parse_time(departure, location))
+                else:
+                    first = end[:3]
+                if end is None or sequence >= end[3]:
+                    last = (sequence, stop_id, self.parse_time(arrival, location))
+                else:
+                    last = end[3:]
+            except ValueError as error:
+                if not isinstance(error, TimetableError):
+                    error = TimetableError(location, "stop_sequence is not a number")
+                errors.append(error)
+                continue
+            ends[trip_id] = first + last
+        return ends
+
+    def journeys(self, errors):
+        if self._stops is None:
+            self.load_stops(errors)
+        names = self._stops[1]
+        trains = {}
+        trips = read_csv(self.path("trips.txt"), ("route_id", "trip_id"))
+        for location, record in trips:
+            trains[record["trip_id"]] = (
+                record.get("trip_short_name") or record["route_id"]
+            ).strip()
+
+        ends = self.trip_ends(errors)
+        for service_date in self.service_dates:
+            # GTFS times count from noon minus 12 hours, which differs from
+            # midnight on days the clocks change.
+            noon = timezone.make_aware(datetime.combine(service_date, time(12)))
+            start = noon - timedelta(hours=12)
+            for trip_id, end in ends.items():
+                _, source, departure, _, destination, arrival = end
+                location = f"trip {trip_id} on {service_date}"
+                if trip_id not in trains:
+                    errors.append(TimetableError(location, "trip is not in trips.txt"))
+                    continue
+                yield JourneyRow(
+                    location,
+                    names.get(source, source),
+                    names.get(destination, destination),
+                    trains[trip_id],
+                    start + departure,
+                    start + arrival,
+                    None,
+                )
+
+
+class TimetableImporter:
+    """Write a timetable in batches, resolving names through in-memory maps.
+
+    Stations, trains and routes are loaded once as ``name -> id`` maps;
+    missing stations come from the timetable's station rows and missing
+    routes are created per batch. Journeys are written with ``COPY`` when
+    the driver supports it (psycopg 3) and ``bulk_create`` otherwise.
+    Bulk writes send no signals, so the occupancy rollup is updated per
+    batch and versions and indexes are reset at the end. Row errors are
+    collected in ``errors``; the caller decides whether to roll back.
+    """
+
+    def __init__(self, batch_size=5000, method="auto", max_errors=20):
+        self.batch_size = batch_size
+        self.method = method
+        self.max_errors = max_errors
+        self.errors = []
+        self.counts = Counter()
+
+    def load_maps(self):
+        self.stations = {
+            station.name: station
+            for station in Station.objects.only("name", "latitude", "longitude")
+        }
+        self.trains = {}
+        # train id -> (train type id, capacity), for the occupancy rollup.
+        self.train_seats = {}
+        for train in Train.objects.only(
+            "name", "train_type_id", "cargo_num", "places_in_cargo"
+        ):
+            self.trains[train.name] = train.pk
+            self.train_seats[train.pk] = (train.train_type_id, train.capacity)
+        # With duplicate routes the oldest one is used.
+        self.routes = {
+            (source_id, destination_id): pk
+            for source_id, destination_id, pk in Route.objects.order_by(
+                "-pk"
+            ).values_list("source_id", "destination_id", "pk")
+        }
+
+    def supports_copy(self):
+        if connection.vendor != "postgresql":
+            return False
+        with connection.cursor() as cursor:
+            return hasattr(cursor.cursor, "copy")
+
+    def run(self, timetable):
+        if self.method == "auto":
+            self.method = "copy" if self.supports_copy() else "insert"
+        self.load_maps()
+        self.import_stations(timetable.stations(self.errors))
+        journeys = self.resolve(timetable.journeys(self.errors))
+        for batch in batched(journeys, self.batch_size):
+            self.write_journeys(batch)
+
+        invalidate_now_and_on_commit(invalidate_station_index)
+        invalidate_now_and_on_commit(invalidate_connection_index)
+        bump_versions(Journey, Route, Station)
+
+    def import_stations(self, rows):
+        new = {}
+        for row in rows:
+            if row.name not in self.stations and row.name not in new:
+                new[row.name] = Station(
+                    name=row.name, latitude=row.latitude, longitude=row.longitude
+                )
+        for station in Station.objects.bulk_create(
+            new.values(), batch_size=self.batch_size
+        ):
+            self.stations[station.name] = station
+        self.counts["stations"] += len(new)
+
+    def resolve(self, rows):
+        for row in rows:
+            if len(self.errors) >= self.max_errors:
+                return
+            self.counts["rows"] += 1
+            try:
+                yield self.resolve_row(row)
+            except TimetableError as error:
+                self.errors.append(error)
+
+    def resolve_row(self, row):
+        for name in (row.source, row.destination):
+            if name not in self.stations:
+                raise TimetableError(row.location, f"unknown station {name!r}")
+        if row.train not in self.trains:
+            raise TimetableError(row.location, f"unknown train {row.train!r}")
+        if row.source == row.destination:
+            raise TimetableError(row.location, "source and destination are the same")
+        if row.arrival_time <= row.departure_time:
+            raise TimetableError(
+                row.location, "arrival_time is not after departure_time"
+            )
+        return row, self.stations[row.source], self.stations[row.destination]
+
+    def create_routes(self, batch):
+        new = {}
+        for row, source, destination in batch:
+            key = (source.pk, destination.pk)
+            if key not in self.routes and key not in new:
+                new[key] = Route(
+                    source=source,
+                    destination=destination,
+                    distance=row.distance
+                    or max(1, round(great_circle_km(source, destination))),
+                )
+        routes = Route.objects.bulk_create(new.values(), batch_size=self.batch_size)
+        for route in routes:
+            self.routes[(route.source_id, route.destination_id)] = route.pk
+        self.counts["routes"] += len(new)
+
+    def write_journeys(self, batch):
+        self.create_routes(batch)
+        rows = [
+            (
+                self.routes[(source.pk, destination.pk)],
+                self.trains[row.train],
+                row.departure_time,
+                row.arrival_time,
+            )
+            for row, source, destination in batch
+        ]
+        if self.method == "copy":
+            self.copy_journeys(rows)
+        else:
+            Journey.objects.bulk_create(
+                Journey(
+                    route_id=route_id,
+                    train_id=train_id,
+                    departure_time=departure_time,
+                    arrival_time=arrival_time,
+                )
+                for route_id, train_id, departure_time, arrival_time in rows
+            )
+        self.record_occupancy(rows)
+        self.counts["journeys"] += len(rows)
+
+    def record_occupancy(self, rows):
+        changes = defaultdict(lambda: [0, 0, 0])
+        for route_id, train_id, departure_time, _ in rows:
+            train_type_id, capacity = self.train_seats[train_id]
+            delta = changes[occupancy_key(departure_time, route_id, train_type_id)]
+            delta[0] += 1
+            delta[1] += capacity
+        record_occupancy(changes)
+
+    def copy_journeys(self, rows):
+        names = (
+            "route",
+            "train",
+            "departure_time",
+            "arrival_time",
+            "seats_sold",
+            "seat_map",
+            "updated_at",
+        )
+        quote = connection.ops.quote_name
+        columns = ", ".join(
+            quote(Journey._meta.get_field(name).column) for name in names
+        )
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(
+                f"COPY {quote(Journey._meta.db_table)} ({columns}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row + (0, b"", now))
@@ -1,12 +1,19 @@
 from django.urls import path, include
 from rest_framework import routers
+from station.async_views import (AsyncJourneyDetailView,
+                                 AsyncJourneyListView,
+                                 AsyncOrderListView,
+                                 AsyncRouteListView)
 from station.views import (CrewViewSet,
                            StationViewSet,
                            RouteViewSet,
                            TrainTypeViewSet,
                            TrainViewSet,
                            OrderViewSet,
-                           JourneyViewSet)
+                           JourneyViewSet,
+                           SeatHoldViewSet,
+                           OccupancyViewSet,
+                           ResponseCacheStatsViewSet)
 
 router = routers.DefaultRouter()
 router.register("crew", CrewViewSet)
@@ -16,7 +23,24 @@ router.register("train_type", TrainTypeViewSet)
 router.register("train", TrainViewSet)
 router.register("order", OrderViewSet)
 router.register("journey", JourneyViewSet)
+router.register("seat_hold", SeatHoldViewSet)
+router.register("cache_stats", ResponseCacheStatsViewSet, basename="cache-stats")
+router.register("occupancy", OccupancyViewSet, basename="occupancy")
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("", include(router.urls)),
+    path(
+        "async/journey/",
+        AsyncJourneyListView.as_view(),
+        name="async-journey-list",
+    ),
+    path(
+        "async/journey/<int:pk>/",
+        AsyncJourneyDetailView.as_view(),
+        name="async-journey-detail",
+    ),
+    path("async/route/", AsyncRouteListView.as_view(), name="async-route-list"),
+    path("async/order/", AsyncOrderListView.as_view(), name="async-order-list"),
+]
 
 app_name = "station"
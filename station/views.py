@@ -1,15 +1,50 @@
-from datetime import datetime
+from datetime import timedelta
+from django.db.models import Count, Max, Prefetch
+from django.http import StreamingHttpResponse
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from django.db.models import F, Count
 from rest_framework import mixins, viewsets, status
+from station.cache import (
+    CachedListModelMixin,
+    CachedRetrieveModelMixin,
+    response_cache_stats,
+)
+from station.conditional import ConditionalListMixin
+from station.export import EXPORT_FORMATS, buffered, export_rows
+from station.filters import created_window, departure_window, filter_journeys
+from station.geo import get_station_index
+from station.idempotency import IdempotentCreateMixin
+from station.occupancy import occupancy_report
+from station.pagination import JourneyPagination, OrderPagination
 from station.permissions import IsAdminOrIfAuthenticatedReadOnly
+from station.planner import (
+    ConnectionIndex,
+    get_connection_index,
+    invalidate_connection_index,
+)
+from station.read_serializers import (
+    JourneyListValuesSerializer,
+    OrderListValuesSerializer,
+    ValuesListModelMixin,
+)
+from station.schedules import request_journeys_until
 from rest_framework.viewsets import GenericViewSet
-from station.models import TrainType, Train, Order, Journey, Crew, Station, Route
+from station.models import (
+    TrainType,
+    Train,
+    Order,
+    Journey,
+    Crew,
+    Station,
+    Route,
+    SeatHold,
+    Ticket,
+)
+from station.seat_map import SeatMap
 from station.serializers import (
     JourneyDetailSerializer,
     JourneyListSerializer,
@@ -21,34 +56,71 @@ from station.serializers import (
     TrainTypeSerializer,
     TrainSerializer,
     OrderSerializer,
+    OrderAllocateSerializer,
     JourneySerializer,
     RouteSerializer,
     StationSerializer,
     CrewSerializer,
+    SeatHoldSerializer,
+    SeatHoldCreateSerializer,
+    JourneyPlanQuerySerializer,
+    JourneyPlanSerializer,
+    StationNearbyQuerySerializer,
+    StationDistanceSerializer,
+    OccupancyQuerySerializer,
+    OccupancySerializer,
 )
 
 
-class CrewViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, GenericViewSet):
+class CrewViewSet(mixins.CreateModelMixin, CachedListModelMixin, GenericViewSet):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Crew,)
 
 
-class StationViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, GenericViewSet):
+class StationViewSet(mixins.CreateModelMixin, CachedListModelMixin, GenericViewSet):
     queryset = Station.objects.all()
     serializer_class = StationSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Station,)
+
+    @extend_schema(
+        parameters=[StationNearbyQuerySerializer],
+        responses=StationDistanceSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="nearby")
+    def nearby(self, request):
+        query = StationNearbyQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        index = get_station_index()
+        if "radius" in params:
+            found = index.within(params["lat"], params["lon"], params["radius"])
+        else:
+            found = index.nearest(params["lat"], params["lon"], params["k"])
+
+        stations = Station.objects.in_bulk(station_id for station_id, _ in found)
+        nearby = []
+        for station_id, distance in found:
+            if station_id in stations:
+                station = stations[station_id]
+                station.distance = round(distance, 3)
+                nearby.append(station)
+        return Response(StationDistanceSerializer(nearby, many=True).data)
 
 
 class RouteViewSet(
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
-    mixins.RetrieveModelMixin,
+    CachedListModelMixin,
+    CachedRetrieveModelMixin,
     GenericViewSet,
 ):
     queryset = Route.objects.all().select_related()
     serializer_class = RouteSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Route, Station)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -56,20 +128,24 @@ class RouteViewSet(
         return RouteSerializer
 
 
-class TrainTypeViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, GenericViewSet):
+class TrainTypeViewSet(mixins.CreateModelMixin, CachedListModelMixin, GenericViewSet):
     queryset = TrainType.objects.all()
     serializer_class = TrainTypeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (TrainType,)
 
 
 class TrainViewSet(
-    mixins.ListModelMixin,
+    ConditionalListMixin,
+    CachedListModelMixin,
     mixins.CreateModelMixin,
-    mixins.RetrieveModelMixin,
+    CachedRetrieveModelMixin,
     viewsets.GenericViewSet):
     queryset = Train.objects.all().select_related("train_type")
     serializer_class = TrainSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Train, TrainType)
+    conditional_models = (Train, TrainType)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -95,57 +171,197 @@ class TrainViewSet(
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class OrderPagination(PageNumberPagination):
-    page_size = 15
-    max_page_size = 90
+class ResponseCacheStatsViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminUser,)
+    cached_viewsets = (
+        CrewViewSet,
+        StationViewSet,
+        RouteViewSet,
+        TrainTypeViewSet,
+        TrainViewSet,
+    )
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def list(self, request):
+        return Response(
+            response_cache_stats(
+                viewset.get_cache_name() for viewset in self.cached_viewsets
+            )
+        )
+
 
+class OccupancyViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminUser,)
 
-class OrderViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, GenericViewSet):
-    queryset = Order.objects.all().prefetch_related(
-        "tickets__journey__route__source",
-        "tickets__journey__route__destination",
-        "tickets__journey__train__train_type"
+    @extend_schema(
+        parameters=[OccupancyQuerySerializer],
+        responses=OccupancySerializer(many=True),
+    )
+    def list(self, request):
+        """Load factor per departure day, route and/or train type.
+
+        Read from the daily occupancy rollup, which is kept up to date as
+        tickets are sold and rebuilt by the rebuild_occupancy command.
+        """
+        query = OccupancyQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        report = occupancy_report(**query.validated_data)
+        return Response(OccupancySerializer(report, many=True).data)
+
+
+class OrderViewSet(
+    IdempotentCreateMixin,
+    mixins.CreateModelMixin,
+    ValuesListModelMixin,
+    GenericViewSet,
+):
+    queryset = Order.objects.prefetch_related(
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related(
+                "journey__route__source", "journey__route__destination"
+            ).order_by("pk"),
+        )
     )
     serializer_class = OrderSerializer
+    values_serializer_class = OrderListValuesSerializer
     pagination_class = OrderPagination
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        return self.queryset.filter(user_id=self.request.user.id)
     
     def get_serializer_class(self):
         if self.action == "list":
             return OrderListSerializer
+        if self.action == "allocate":
+            return OrderAllocateSerializer
         return OrderSerializer
 
+    def perform_create(self, serializer):
+        serializer.save(user_id=self.request.user.id)
 
-class JourneyViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Journey.objects.select_related("train", "route__source", "route__destination")
-        .prefetch_related("crew")
-        .annotate(
-            tickets_available=(
-                F("train__cargo_num") * F("train__places_in_cargo") - Count("tickets")
+    @extend_schema(responses={201: OrderSerializer})
+    @action(methods=["POST"], detail=False, url_path="allocate")
+    def allocate(self, request):
+        """Order ``seats`` tickets on a journey, with the seats picked here.
+
+        Seats side by side in one cargo are preferred, then as few cargos
+        as possible. Seats held by other customers are skipped.
+        """
+        return self.idempotent(self.allocate_order, request)
+
+    def allocate_order(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = serializer.save(user_id=request.user.id)
+        return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "output",
+                enum=list(EXPORT_FORMATS),
+                default="csv",
+                description="csv or ndjson (one JSON object per line)",
+            ),
+            OpenApiParameter(
+                "created_from",
+                type=OpenApiTypes.DATETIME,
+                description="Orders created at or after this date or datetime",
+            ),
+            OpenApiParameter(
+                "created_to",
+                type=OpenApiTypes.DATETIME,
+                description=(
+                    "Orders created before this datetime, or on or before "
+                    "this date"
+                ),
+            ),
+        ],
+        responses={(200, "text/csv"): OpenApiTypes.STR},
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="export",
+        permission_classes=(IsAdminUser,),
+    )
+    def export(self, request):
+        """Stream every ticket of every user's orders, with its journey.
+
+        Under ASGI, Django buffers sync streaming responses in memory; use
+        the export_orders command there for large exports.
+        """
+        output = request.query_params.get("output", "csv")
+        if output not in EXPORT_FORMATS:
+            raise ValidationError(
+                {"output": f"Expected one of: {', '.join(EXPORT_FORMATS)}."}
             )
+        lines, content_type, extension = EXPORT_FORMATS[output]
+        start, end = created_window(request.query_params)
+
+        response = StreamingHttpResponse(
+            buffered(lines(export_rows(start, end))), content_type=content_type
         )
-    )
-    serializer_class = JourneySerializer
-    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+        response["Content-Disposition"] = f'attachment; filename="orders.{extension}"'
+        return response
+
+
+class SeatHoldViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        departure_date = self.request.query_params.get("date")
-        route_id_str = self.request.query_params.get("route")
+        return SeatHold.objects.active().filter(user_id=self.request.user.id)
 
-        queryset = self.queryset
+    def get_serializer_class(self):
+        if self.action == "create":
+            return SeatHoldCreateSerializer
+        return SeatHoldSerializer
 
-        if departure_date:
-            departure_date = datetime.strptime(departure_date, "%Y-%m-%d").date()
-            queryset = queryset.filter(departure__date=departure_date)
+    @extend_schema(responses=SeatHoldSerializer(many=True))
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        holds = serializer.save(user_id=request.user.id)
+        return Response(
+            SeatHoldSerializer(holds, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
 
-        if route_id_str:
-            queryset = queryset.filter(route_id=int(route_id_str))
 
-        return queryset
+class JourneyViewSet(
+    ConditionalListMixin, ValuesListModelMixin, viewsets.ModelViewSet
+):
+    queryset = (
+        Journey.objects.select_related("train", "route__source", "route__destination")
+        .prefetch_related(Prefetch("crew", queryset=Crew.objects.order_by("pk")))
+    )
+    serializer_class = JourneySerializer
+    values_serializer_class = JourneyListValuesSerializer
+    pagination_class = JourneyPagination
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    # Ticket sales only touch Journey.updated_at, which get_list_marker
+    # reads; crew changes bump the Journey version stamp instead.
+    conditional_models = (Journey, Route, Station, Train, TrainType, Crew)
+
+    def get_queryset(self):
+        if self.action == "seat_map":
+            return Journey.objects.select_related("train")
+        return filter_journeys(self.queryset, self.request.query_params)
+
+    def get_list_marker(self, queryset):
+        state = queryset.order_by().aggregate(
+            last_modified=Max("updated_at"), count=Count("id")
+        )
+        return state["last_modified"], f"{state['count']}:{state['last_modified']}"
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -162,13 +378,115 @@ class JourneyViewSet(viewsets.ModelViewSet):
                 description="Filter by route id (ex. ?route=2)",
             ),
             OpenApiParameter(
-                "departure_date",
+                "date",
                 type=OpenApiTypes.DATE,
                 description=(
-                    "Filter by departure datetime of Journey " "(ex. ?date=2022-10-23)"
+                    "Filter by departure date of Journey in the server "
+                    "time zone (ex. ?date=2022-10-23)"
+                ),
+            ),
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.DATETIME,
+                description=(
+                    "Journeys departing at or after this date or datetime "
+                    "(ex. ?from=2022-10-23T08:00)"
+                ),
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.DATETIME,
+                description=(
+                    "Journeys departing before this datetime, or on or "
+                    "before this date (ex. ?to=2022-10-25)"
                 ),
             ),
         ]
     )
     def list(self, request, *args, **kwargs):
+        request_journeys_until(departure_window(request.query_params)[1])
         return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[JourneyPlanQuerySerializer],
+        responses=JourneyPlanSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="plan")
+    def plan(self, request):
+        query = JourneyPlanQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        request_journeys_until(params["departure"] + timedelta(days=1))
+        for attempt in range(2):
+            itineraries = get_connection_index().plan(
+                params["source"].pk,
+                params["destination"].pk,
+                params["departure"].timestamp(),
+                min_transfer=params["min_transfer"] * 60,
+                limit=params["limit"],
+            )
+            journey_ids = {leg[-1] for legs in itineraries for leg in legs}
+            journeys = self.queryset.in_bulk(journey_ids)
+            current = [
+                legs
+                for legs in itineraries
+                if all(
+                    leg[-1] in journeys
+                    and ConnectionIndex.connection(journeys[leg[-1]]) == leg
+                    for leg in legs
+                )
+            ]
+            if len(current) == len(itineraries) or attempt:
+                break
+            # The timetable changed on another worker since this process
+            # built its index; plan again on a fresh one.
+            invalidate_connection_index()
+
+        plans = []
+        # Itineraries that are still stale are dropped whole, never served
+        # with a gap.
+        for legs in current:
+            legs = [journeys[leg[-1]] for leg in legs]
+            plans.append(
+                {
+                    "departure_time": legs[0].departure_time,
+                    "arrival_time": legs[-1].arrival_time,
+                    "transfers": len(legs) - 1,
+                    "journeys": legs,
+                }
+            )
+        return Response(JourneyPlanSerializer(plans, many=True).data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "encoding",
+                type=OpenApiTypes.STR,
+                enum=SeatMap.ENCODINGS,
+                description=(
+                    "bitmap: one bit per seat, rle: varint run lengths "
+                    "starting with free seats (ex. ?encoding=rle)"
+                ),
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=True, url_path="seat_map")
+    def seat_map(self, request, pk=None):
+        encoding = request.query_params.get("encoding", "bitmap")
+        if encoding not in SeatMap.ENCODINGS:
+            return Response(
+                {"encoding": f"Must be one of: {', '.join(SeatMap.ENCODINGS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        journey = self.get_object()
+        seat_map = journey.get_seat_map()
+        return Response(
+            {
+                "cargo_num": seat_map.cargo_num,
+                "places_in_cargo": seat_map.places_in_cargo,
+                "seats_sold": journey.seats_sold,
+                "encoding": encoding,
+                "data": seat_map.encode(encoding),
+            }
+        )
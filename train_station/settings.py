@@ -133,6 +133,13 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+MEDIA_URL = "/media/"
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", BASE_DIR / "media")
+
+# Larger uploads are streamed to a temporary file in chunks instead of
+# being held in memory.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -141,12 +148,12 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "station.throttling.AnonRateThrottle",
+        "station.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "10000/day", "user": "100000/day"},
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.LazyJWTAuthentication",
     ),
 }
 
@@ -167,4 +174,51 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.TokenObtainPairSerializer",
+}
+
+# How long a process trusts its cached is_active/is_staff of a JWT user.
+JWT_USER_STATE_TTL = 30
+
+SEAT_HOLD_MINUTES = 10
+SEAT_HOLD_MAX_MINUTES = 30
+
+# Largest group one order/allocate/ request may book.
+ORDER_ALLOCATE_MAX_SEATS = 50
+
+# Seconds an order response is kept for retries with its Idempotency-Key.
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+JOURNEY_PLANNER_MIN_TRANSFER_MINUTES = 10
+JOURNEY_PLANNER_INDEX_TTL = 300
+
+STATION_INDEX_TTL = 300
+
+# generate_journeys keeps scheduled journeys this many days ahead; searches
+# further out queue a task that generates them, up to
+# JOURNEY_SCHEDULE_MAX_DAYS. A day is queued at most once per
+# JOURNEY_SCHEDULE_REQUEST_TIMEOUT seconds.
+JOURNEY_SCHEDULE_HORIZON_DAYS = 30
+JOURNEY_SCHEDULE_MAX_DAYS = 366
+JOURNEY_SCHEDULE_REQUEST_TIMEOUT = 60 * 10
+
+STATION_RESPONSE_CACHE_TIMEOUT = 60 * 60
+# Seconds between adding a worker's cache hit/miss counts to the shared ones.
+STATION_RESPONSE_CACHE_STATS_INTERVAL = 60
+
+# name: (longest side in px, Pillow format)
+TRAIN_IMAGE_VARIANTS = {
+    "thumbnail": (320, "JPEG"),
+    "thumbnail_webp": (320, "WEBP"),
+    "large_webp": (1280, "WEBP"),
 }
+TRAIN_IMAGE_QUALITY = 82
+
+# Background tasks (station.tasks, run by `manage.py run_tasks`).
+TASK_WORKER_CONCURRENCY = 4
+TASK_MAX_ATTEMPTS = 5
+# Retries wait TASK_RETRY_DELAY seconds, doubled per attempt, up to the max.
+TASK_RETRY_DELAY = 10
+TASK_RETRY_MAX_DELAY = 3600
+# A running task is handed to another worker after this many seconds.
+TASK_LEASE_SECONDS = 600
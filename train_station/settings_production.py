@@ -0,0 +1,55 @@
+"""
+Production settings for train_station.
+
+Run with DJANGO_SETTINGS_MODULE=train_station.settings_production (the
+entrypoint.sh default). Everything not overridden here comes from
+settings.py.
+"""
+
+import os
+
+from train_station.settings import *  # noqa: F401,F403
+from train_station.settings import BASE_DIR, DATABASES, INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = os.environ.get("DJANGO_DEBUG", "0") == "1"
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "localhost").split(",")
+    if host.strip()
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if not middleware.startswith("debug_toolbar.")
+]
+
+# Django 4.2 has no built-in psycopg pool, so every worker thread keeps
+# its connection open for CONN_MAX_AGE seconds and checks it before reuse.
+# ASGI serves each request on a new thread, which would leak persistent
+# connections, so entrypoint.sh sets DJANGO_CONN_MAX_AGE=0 there.
+DATABASES = {
+    **DATABASES,
+    "default": {
+        **DATABASES["default"],
+        "CONN_MAX_AGE": int(os.environ.get("DJANGO_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+    },
+}
+
+# Response cache versions, throttle counters and cached responses must be
+# shared by all workers; `manage.py createcachetable` creates the table.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    }
+}
+
+STATIC_ROOT = os.environ.get("STATIC_ROOT", BASE_DIR / "staticfiles")
+
+# The API itself uses JWTs; these only cover the admin and browsable API.
+SESSION_COOKIE_SECURE = os.environ.get("DJANGO_SECURE_COOKIES", "1") == "1"
+CSRF_COOKIE_SECURE = SESSION_COOKIE_SECURE
@@ -0,0 +1,124 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserStateCache:
+    """Per-process cache of the user columns authentication depends on.
+
+    Entries live for ``JWT_USER_STATE_TTL`` seconds, so deactivating a user
+    or revoking staff rights reaches every process within that time (and
+    the process that saved the user at once, see ``user_changed``).
+    """
+
+    max_entries = 10_000
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        state = (
+            get_user_model()
+            .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values("is_active", "is_staff", "is_superuser", "password")
+            .first()
+        )
+        if state is not None:
+            state["password"] = get_md5_hash_password(state["password"])
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[user_id] = (now + settings.JWT_USER_STATE_TTL, state)
+        return state
+
+    def forget(self, user_id) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_states = UserStateCache()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    user_states.forget(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+class LazyTokenUser(TokenUser):
+    """User built from token claims; the ``User`` row is loaded on demand.
+
+    ``id``, ``is_authenticated`` and the flags permissions look at are
+    answered from the token and the cached user state. Any other
+    attribute (``email``, ``date_joined``...) loads the full row once.
+    ORM lookups and assignments need ``user_id=request.user.id``.
+    """
+
+    def __init__(self, token, state):
+        super().__init__(token)
+        self.state = state
+
+    @cached_property
+    def is_active(self) -> bool:
+        return self.state["is_active"]
+
+    @cached_property
+    def is_staff(self) -> bool:
+        # Tokens issued before the claim existed fall back to the row.
+        return bool(self.token.get("is_staff", True)) and self.state["is_staff"]
+
+    @cached_property
+    def is_superuser(self) -> bool:
+        return self.state["is_superuser"]
+
+    @cached_property
+    def user(self):
+        return get_user_model().objects.get(**{api_settings.USER_ID_FIELD: self.id})
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+
+class LazyJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` without the per-request ``SELECT`` on the user."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        state = user_states.get(user_id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not state["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        revoke_claim = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+        if api_settings.CHECK_REVOKE_TOKEN and revoke_claim != state["password"]:
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return LazyTokenUser(validated_token, state)
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -19,4 +20,13 @@ class UserSerializer(serializers.ModelSerializer):
             user.set_password(password)
             user.save()
 
-        return user
\ No newline at end of file
+        return user
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # Lets LazyJWTAuthentication answer permission checks from the token.
+        token["is_staff"] = user.is_staff
+        return token
@@ -1,3 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from station.testing import QueryBudgetMixin
+from user.authentication import LazyJWTAuthentication, user_states
+from user.urls import urlpatterns
 
-# Create your tests here.
+# Maximum number of queries per GET endpoint of user/urls.py.
+QUERY_BUDGETS = {
+    "user:manage": 1,
+}
+
+
+class UserQueryBudgetTest(QueryBudgetMixin, TestCase):
+    def build_dataset(self, size):
+        users = [
+            get_user_model().objects.create_user(f"user{number}@test.com", "pass4334")
+            for number in range(size)
+        ]
+        return {"token": str(RefreshToken.for_user(users[0]).access_token)}
+
+    def test_query_budgets(self):
+        client = APIClient()
+
+        def request(context):
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {context['token']}")
+            return client.get(reverse("user:manage"))
+
+        self.assertQueryBudget("user:manage", QUERY_BUDGETS["user:manage"], request)
+
+    def test_every_get_endpoint_has_a_budget(self):
+        names = {
+            f"user:{pattern.name}"
+            for pattern in urlpatterns
+            if hasattr(pattern.callback.view_class, "get")
+        }
+        self.assertFalse(names - set(QUERY_BUDGETS))
+
+
+class LazyJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        user_states.clear()
+        self.user = get_user_model().objects.create_user(
+            "lazy@test.com", "samplepass4334", is_staff=True
+        )
+        self.client = APIClient()
+        res = self.client.post(
+            reverse("user:token_obtain_pair"),
+            {"email": "lazy@test.com", "password": "samplepass4334"},
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.data['access']}")
+        self.url = reverse("station:crew-list")
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        return [q["sql"] for q in queries if '"user_user"' in q["sql"]]
+
+    def test_cached_state_skips_user_query(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+
+    def test_token_carries_staff_claim(self):
+        res = self.client.post(self.url, {"first_name": "A", "last_name": "B"})
+        self.assertEqual(res.status_code, 201)
+
+        self.user.is_staff = False
+        self.user.save()
+        res = self.client.post(self.url, {"first_name": "C", "last_name": "D"})
+        self.assertEqual(res.status_code, 403)
+
+    def test_deactivated_user_is_rejected(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 401)
+
+    def test_full_user_is_loaded_on_demand(self):
+        authenticator = LazyJWTAuthentication()
+        token = authenticator.get_validated_token(
+            str(RefreshToken.for_user(self.user).access_token)
+        )
+        user = authenticator.get_user(token)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(user.id, self.user.id)
+            self.assertTrue(user.is_staff)
+        self.assertEqual(len(queries), 0)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(user.email, "lazy@test.com")
+            self.assertEqual(user.date_joined, self.user.date_joined)
+        self.assertEqual(len(queries), 1)